@@ -4,29 +4,43 @@ MakerScreen Digital Signage Client for Raspberry Pi
 Connects to the MakerScreen server via WebSocket and displays content
 """
 
+# First, so the timeline includes the imports below
+from startup import timeline, MODULE_LOADED_AT
+
 import asyncio
-import websockets
 import json
+import math
 import platform
 import uuid
 import os
+import random
+import re
 import base64
+import hashlib
+import tempfile
 import threading
+import shutil
 import signal
+import sqlite3
+import struct
 import sys
-from datetime import datetime
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 from pathlib import Path
 import logging
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler('/opt/makerscreen/client.log', mode='a')
-    ] if os.path.exists('/opt/makerscreen') else [logging.StreamHandler()]
-)
+from renditions import RenditionCache
+from schedule import ScheduleIndex, slot_duration
+from wire import JsonCodec, available_codecs, get_codec, negotiated_extensions, normalize_envelope
+from metrics import MetricsRegistry, adaptive_interval, system_metrics
+from live_state import STATE_SOCKET, live_state
+from log_store import setup_logging
+
+timeline.record('imports', MODULE_LOADED_AT, time.monotonic())
+
+setup_logging()
 logger = logging.getLogger('MakerScreenClient')
 
 # Configuration
@@ -34,81 +48,778 @@ CONFIG_FILE = '/opt/makerscreen/config.json'
 DEFAULT_SERVER_URL = 'ws://localhost:8443'
 CONTENT_DIR = '/opt/makerscreen/content'
 VERSION = '1.0.0'
+CACHE_DISK_FRACTION = 0.5  # Default cache budget as a share of the SD card
+CACHE_ORPHAN_TTL = 24 * 3600  # Seconds an unreferenced item is kept
+CACHE_GC_INTERVAL = 600  # Seconds between background cache maintenance runs
+TRANSFER_CHUNK_SIZE = 256 * 1024  # Preferred binary chunk size for content transfers
+TRANSFER_ACK_INTERVAL = 4 * 1024 * 1024  # Bytes received between progress acknowledgements
+TRANSFER_FRAME_HEADER = struct.Struct('!16sQ')  # Transfer UUID, byte offset
+INVENTORY_MAX_HASHES = 256  # Above this, the REGISTER inventory is sent as a Bloom filter
+INVENTORY_FALSE_POSITIVE_RATE = 0.01
+PREFETCH_ITEMS = 3  # Upcoming playlist items to keep cached ahead of playback
+PREFETCH_SECONDS = 60  # Upcoming playback time to keep cached ahead of playback
+PREFETCH_CONCURRENCY = 2  # Content requests outstanding at once
+PREFETCH_REQUEST_TIMEOUT = 120  # Seconds before an unanswered request is retried
+INGEST_WORKERS = 2  # Threads for decoding, hashing and writing content
+INGEST_QUEUE_DEPTH = 4  # Content updates waiting for a worker before receiving pauses
+INGEST_OFFLOAD_BYTES = 256 * 1024  # Text messages larger than this are parsed off the event loop
+BASE64_DECODE_CHUNK = 1024 * 1024  # Base64 characters decoded per step (multiple of 4)
+DEFAULT_SCREEN_SIZE = (1920, 1080)  # Rendition size when no display is attached
+IMAGE_CACHE_MB = 64  # Memory budget for decoded images in the display engine
+TRANSITION_FPS = 30  # Target frame rate for crossfade and slide transitions
+CLOCK_SYNC_SAMPLES = 8  # TIME_SYNC round trips per burst
+CLOCK_SYNC_SPACING = 0.25  # Seconds between round trips in a burst
+CLOCK_SYNC_INTERVAL = 60  # Seconds between bursts
+CLOCK_SYNC_WINDOW = 32  # Recent samples the offset is filtered over
+CLOCK_SYNC_RETIME = 0.001  # Offset change (seconds) that moves the playlist timeline
+RECONNECT_BASE_DELAY = 5  # Seconds; reconnect delays grow from here with full jitter
+RECONNECT_MAX_DELAY = 60
+RECONNECT_MAX_EXPONENT = 32  # Backoff doublings counted at most
+SEQ_ACK_EVERY = 16  # Sequenced server messages handled between explicit ACKs
+EMERGENCY_LOG_SIZE = 100  # Displayed emergencies kept with their latency breakdown
+OUTBOUND_CONTROL_DEPTH = 64  # Queued control messages before senders wait for room
+OUTBOUND_TELEMETRY_DEPTH = 16  # Queued telemetry messages before the oldest is dropped
+OUTBOUND_PUT_TIMEOUT = 5  # Seconds a sender waits for room before the oldest control message is dropped
+HEARTBEAT_INTERVAL = 30  # Seconds between heartbeats on a good link
+HEARTBEAT_MAX_INTERVAL = 120  # Longest interval a slow or congested link stretches it to
+DISPLAY_READY_TIMEOUT = 30  # Seconds playback waits for the display engine to come up
+WEB_UI_PORT = 5001
+
+# Outbound message priorities, most urgent first
+PRIORITY_EMERGENCY = 0
+PRIORITY_CONTROL = 1
+PRIORITY_TELEMETRY = 2
+PRIORITY_NAMES = ['emergency', 'control', 'telemetry']
+
+
+def parse_server_time(value):
+    """Unix seconds from a server ISO-8601 timestamp (UTC unless it has an offset), or None"""
+    if not value:
+        return None
+    try:
+        text = str(value).strip()
+        if text[-1:] in ('Z', 'z'):
+            text = text[:-1] + '+00:00'
+        # .NET writes 7 fractional digits; older fromisoformat takes exactly 3 or 6
+        text = re.sub(r'\.(\d+)', lambda m: '.' + m.group(1)[:6].ljust(6, '0'), text, count=1)
+        parsed = datetime.fromisoformat(text)
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        return parsed.timestamp()
+    except ValueError:
+        return None
+
+
+def reconnect_delay(attempt, base=RECONNECT_BASE_DELAY, cap=RECONNECT_MAX_DELAY):
+    """Exponential backoff with full jitter
+
+    A random delay up to ``base * 2**attempt`` (at most ``cap``), so a fleet
+    that lost the server at the same moment does not reconnect in step.
+    """
+    # Past the cap the exponent no longer matters, and a float base overflows
+    exponent = min(attempt, RECONNECT_MAX_EXPONENT)
+    return random.uniform(min(1, base), min(cap, base * 2 ** exponent))
+
+
+class ManifestIndex:
+    """SQLite-backed index of cached content
+
+    Replaces the old manifest.json, which was rewritten in full on every
+    change. Each insert or delete touches a single row, lookups by content
+    ID, file name and digest are indexed, and SQLite's write-ahead log
+    keeps the index consistent across power cuts.
+    """
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS content (
+            content_id TEXT PRIMARY KEY,
+            filename TEXT NOT NULL,
+            sha256 TEXT,
+            size INTEGER,
+            mime_type TEXT,
+            cached_at TEXT,
+            last_access REAL NOT NULL DEFAULT 0,
+            hits INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE INDEX IF NOT EXISTS idx_content_filename ON content(filename);
+        CREATE INDEX IF NOT EXISTS idx_content_sha256 ON content(sha256);
+        CREATE TABLE IF NOT EXISTS transfers (
+            transfer_id TEXT PRIMARY KEY,
+            content_id TEXT NOT NULL,
+            metadata TEXT NOT NULL,
+            acked INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE TABLE IF NOT EXISTS state (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL,
+            updated_at REAL NOT NULL
+        );
+    """
+    COLUMNS = ('filename', 'sha256', 'size', 'mime_type', 'cached_at', 'last_access', 'hits')
+    
+    def __init__(self, db_path):
+        self.db_path = Path(db_path)
+        self._lock = threading.RLock()
+        self._pending_access = {}
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(self.SCHEMA)
+    
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM content').fetchone()[0]
+    
+    def __contains__(self, content_id):
+        return self.get(content_id) is not None
+    
+    def get(self, content_id):
+        """Return the entry for a content ID as a dict, or None"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT * FROM content WHERE content_id = ?', (content_id,)
+            ).fetchone()
+        return dict(row) if row else None
+    
+    def put(self, content_id, entry):
+        """Insert or replace one entry"""
+        values = [entry.get(column) for column in self.COLUMNS]
+        values[5] = values[5] or 0
+        values[6] = values[6] or 0
+        with self._lock:
+            self._pending_access.pop(content_id, None)
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO content (content_id, {', '.join(self.COLUMNS)}) "
+                f"VALUES (?{', ?' * len(self.COLUMNS)})",
+                [content_id, *values]
+            )
+    
+    def put_many(self, entries):
+        """Insert or replace many entries in one transaction"""
+        with self._lock:
+            self._conn.execute('BEGIN')
+            try:
+                for content_id, entry in entries.items():
+                    self.put(content_id, entry)
+                self._conn.execute('COMMIT')
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+    
+    def delete(self, content_ids):
+        with self._lock:
+            for content_id in content_ids:
+                self._pending_access.pop(content_id, None)
+            self._conn.executemany(
+                'DELETE FROM content WHERE content_id = ?',
+                [(content_id,) for content_id in content_ids]
+            )
+    
+    def clear(self):
+        with self._lock:
+            self._pending_access.clear()
+            self._conn.execute('DELETE FROM content')
+    
+    def record_access(self, content_id, timestamp):
+        """Buffer an access; written to disk by :meth:`flush`"""
+        with self._lock:
+            last_access, hits = self._pending_access.get(content_id, (0, 0))
+            self._pending_access[content_id] = (max(last_access, timestamp), hits + 1)
+    
+    def flush(self):
+        """Write buffered access statistics"""
+        with self._lock:
+            if not self._pending_access:
+                return
+            updates = [
+                (last_access, hits, content_id)
+                for content_id, (last_access, hits) in self._pending_access.items()
+            ]
+            self._pending_access.clear()
+            self._conn.executemany(
+                'UPDATE content SET last_access = MAX(last_access, ?), hits = hits + ? '
+                'WHERE content_id = ?',
+                updates
+            )
+    
+    def find_by_sha256(self, digest):
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT * FROM content WHERE sha256 = ? LIMIT 1', (digest,)
+            ).fetchone()
+        return dict(row) if row else None
+    
+    def digests(self):
+        """Map content ID to SHA-256 for entries with a known digest"""
+        with self._lock:
+            return {
+                row[0]: row[1] for row in self._conn.execute(
+                    'SELECT content_id, sha256 FROM content WHERE sha256 IS NOT NULL'
+                )
+            }
+    
+    def totals(self):
+        """(entries, stored files, bytes); content IDs sharing a file count it once"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT (SELECT COUNT(*) FROM content), COUNT(*), COALESCE(SUM(size), 0) '
+                'FROM (SELECT MAX(size) AS size FROM content GROUP BY filename)'
+            ).fetchone()
+        return tuple(row)
+    
+    def filenames(self):
+        with self._lock:
+            return {row[0] for row in self._conn.execute('SELECT DISTINCT filename FROM content')}
+    
+    def filenames_for(self, content_ids):
+        with self._lock:
+            return {
+                row[0] for row in self._conn.execute(
+                    'SELECT filename FROM content WHERE content_id IN '
+                    '(SELECT value FROM json_each(?))',
+                    (json.dumps(list(content_ids)),)
+                )
+            }
+    
+    def blobs(self):
+        """Aggregate entries per stored file"""
+        self.flush()
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT filename, MAX(size) AS size, MAX(last_access) AS last_access, '
+                'SUM(hits) AS hits, json_group_array(content_id) AS content_ids '
+                'FROM content GROUP BY filename'
+            ).fetchall()
+        return {
+            row['filename']: {
+                'size': row['size'],
+                'last_access': row['last_access'],
+                'hits': row['hits'],
+                'content_ids': json.loads(row['content_ids'])
+            }
+            for row in rows
+        }
+    
+    def get_transfer(self, transfer_id):
+        """Return (metadata, acked offset) for an unfinished transfer"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT metadata, acked FROM transfers WHERE transfer_id = ?', (transfer_id,)
+            ).fetchone()
+        return (json.loads(row['metadata']), row['acked']) if row else None
+    
+    def put_transfer(self, transfer_id, metadata, acked=0):
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO transfers (transfer_id, content_id, metadata, acked) '
+                'VALUES (?, ?, ?, ?)',
+                (transfer_id, metadata.get('contentId', ''), json.dumps(metadata), acked)
+            )
+    
+    def update_transfer(self, transfer_id, acked):
+        with self._lock:
+            self._conn.execute(
+                'UPDATE transfers SET acked = ? WHERE transfer_id = ?', (acked, transfer_id)
+            )
+    
+    def delete_transfer(self, transfer_id):
+        with self._lock:
+            self._conn.execute('DELETE FROM transfers WHERE transfer_id = ?', (transfer_id,))
+    
+    def transfers(self):
+        """List unfinished transfers as (transfer_id, metadata, acked)"""
+        with self._lock:
+            rows = self._conn.execute('SELECT transfer_id, metadata, acked FROM transfers').fetchall()
+        return [(row['transfer_id'], json.loads(row['metadata']), row['acked']) for row in rows]
+    
+    def get_state(self, key):
+        """Return a stored JSON value, or None"""
+        with self._lock:
+            row = self._conn.execute('SELECT value FROM state WHERE key = ?', (key,)).fetchone()
+        return json.loads(row['value']) if row else None
+    
+    def put_state(self, key, value):
+        """Store a JSON value; None removes it"""
+        with self._lock:
+            if value is None:
+                self._conn.execute('DELETE FROM state WHERE key = ?', (key,))
+            else:
+                self._conn.execute(
+                    'INSERT OR REPLACE INTO state (key, value, updated_at) VALUES (?, ?, ?)',
+                    (key, json.dumps(value), time.time())
+                )
+    
+    def checkpoint(self):
+        """Fold the write-ahead log back into the database file"""
+        self.flush()
+        with self._lock:
+            self._conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+    
+    def close(self):
+        with self._lock:
+            self.flush()
+            self._conn.close()
+
+
+class BloomFilter:
+    """Compact set-membership summary of SHA-256 digests
+
+    The members are already uniformly distributed digests, so the k probe
+    positions are taken straight from 32-bit slices of the digest rather
+    than from additional hash functions.
+    """
+    
+    def __init__(self, capacity, error_rate=INVENTORY_FALSE_POSITIVE_RATE):
+        capacity = max(capacity, 1)
+        self.size = max(8, int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))))
+        # A SHA-256 digest yields eight 32-bit probe positions
+        self.hash_count = min(8, max(1, round(self.size / capacity * math.log(2))))
+        self.bits = bytearray((self.size + 7) // 8)
+    
+    def _positions(self, digest):
+        raw = bytes.fromhex(digest)
+        for i in range(self.hash_count):
+            yield int.from_bytes(raw[i * 4:i * 4 + 4], 'big') % self.size
+    
+    def add(self, digest):
+        for position in self._positions(digest):
+            self.bits[position // 8] |= 1 << (position % 8)
+    
+    def __contains__(self, digest):
+        return all(self.bits[p // 8] & (1 << (p % 8)) for p in self._positions(digest))
+    
+    def to_dict(self):
+        return {
+            'size': self.size,
+            'hashCount': self.hash_count,
+            'bits': base64.b64encode(bytes(self.bits)).decode('ascii')
+        }
 
 
 class ContentCache:
-    """Manages local content caching"""
+    """Manages local content caching
+
+    Files are stored content-addressed (named by their SHA-256 digest), so
+    the same payload pushed under several content IDs is stored once. Writes
+    go to a temporary file that is fsynced and renamed into place, so a power
+    cut never leaves a truncated file behind a manifest entry.
+
+    The store is kept under a byte budget. When it would be exceeded, the
+    least recently (``lru``) or least frequently (``lfu``) used files are
+    evicted, except those referenced by a pinned playlist.
+    """
+    
+    TEMP_SUFFIX = '.part'
+    MANIFEST_PREFIX = 'manifest.'
+    CHUNK_SIZE = 64 * 1024
+    EVICTION_POLICIES = ('lru', 'lfu')
     
-    def __init__(self, cache_dir):
+    def __init__(self, cache_dir, max_bytes=None, policy='lru', orphan_ttl=CACHE_ORPHAN_TTL):
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(parents=True, exist_ok=True)
-        self.manifest = {}
-        self._load_manifest()
+        self._lock = threading.RLock()
+        self._pins = {}
+        self.hits = 0
+        self.misses = 0
+        if policy not in self.EVICTION_POLICIES:
+            logger.warning(f"Unknown cache eviction policy '{policy}', using lru")
+            policy = 'lru'
+        self.policy = policy
+        self.orphan_ttl = orphan_ttl
+        if not max_bytes:
+            max_bytes = int(shutil.disk_usage(self.cache_dir).total * CACHE_DISK_FRACTION)
+        self.max_bytes = int(max_bytes)
+        self.manifest = ManifestIndex(self.cache_dir / 'manifest.db')
+        self._migrate_json_manifest()
+        self._remove_stale_temp_files()
     
-    def _load_manifest(self):
+    def _migrate_json_manifest(self):
+        """Import a manifest.json written by older clients"""
         manifest_path = self.cache_dir / 'manifest.json'
+        if not manifest_path.exists():
+            return
         try:
-            if manifest_path.exists():
-                with open(manifest_path, 'r') as f:
-                    self.manifest = json.load(f)
+            with open(manifest_path, 'r') as f:
+                legacy = json.load(f)
+            for entry in legacy.values():
+                if entry.get('size') is None:
+                    filepath = self.cache_dir / entry['filename']
+                    entry['size'] = filepath.stat().st_size if filepath.exists() else 0
+            self.manifest.put_many(legacy)
+            manifest_path.rename(manifest_path.with_name('manifest.json.migrated'))
+            logger.info(f"Migrated {len(legacy)} cache manifest entries")
         except Exception as e:
-            logger.error(f"Error loading cache manifest: {e}")
+            logger.error(f"Error migrating cache manifest: {e}")
     
-    def _save_manifest(self):
-        manifest_path = self.cache_dir / 'manifest.json'
-        try:
-            with open(manifest_path, 'w') as f:
-                json.dump(self.manifest, f, indent=2)
-        except Exception as e:
-            logger.error(f"Error saving cache manifest: {e}")
+    def _remove_stale_temp_files(self):
+        """Delete partial writes left behind by an interrupted save"""
+        for filepath in self.cache_dir.glob(f'*{self.TEMP_SUFFIX}'):
+            try:
+                filepath.unlink()
+                logger.info(f"Removed incomplete cache file: {filepath.name}")
+            except OSError as e:
+                logger.error(f"Error removing incomplete cache file: {e}")
     
-    def save_content(self, content_id, data, mime_type):
-        """Save content to cache"""
-        ext = self._get_extension(mime_type)
-        filename = f"{content_id}{ext}"
-        filepath = self.cache_dir / filename
-        
+    def _iter_chunks(self, data):
+        """Yield byte chunks from bytes, a file-like object or an iterable"""
+        if isinstance(data, (bytes, bytearray, memoryview)):
+            view = memoryview(data)
+            for offset in range(0, len(view), self.CHUNK_SIZE):
+                yield view[offset:offset + self.CHUNK_SIZE]
+        elif hasattr(data, 'read'):
+            while True:
+                chunk = data.read(self.CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+        else:
+            yield from data
+    
+    def _blob_filename(self, digest, mime_type):
+        return f"{digest}{self._get_extension(mime_type)}"
+    
+    def find_blob(self, digest, mime_type=None):
+        """Return the path of a stored blob with the given SHA-256, if any"""
+        if not digest or len(digest) != 64:
+            return None
+        digest = digest.lower()
+        if mime_type:
+            filepath = self.cache_dir / self._blob_filename(digest, mime_type)
+            if filepath.exists():
+                return filepath
+        entry = self.manifest.find_by_sha256(digest)
+        if entry:
+            filepath = self.cache_dir / entry['filename']
+            if filepath.exists():
+                return filepath
+        return None
+    
+    def _write_blob(self, data, mime_type, expected_hash=None):
+        """Stream data into the store and return (digest, path, size)
+
+        The data is hashed while it is written to a temporary file. The file
+        is only renamed into place once the digest matches ``expected_hash``.
+        Returns None on mismatch or I/O error.
+        """
+        fd, temp_name = tempfile.mkstemp(dir=self.cache_dir, suffix=self.TEMP_SUFFIX)
+        temp_path = Path(temp_name)
+        hasher = hashlib.sha256()
+        size = 0
         try:
-            with open(filepath, 'wb') as f:
-                f.write(data)
+            with os.fdopen(fd, 'wb') as f:
+                for chunk in self._iter_chunks(data):
+                    hasher.update(chunk)
+                    f.write(chunk)
+                    size += len(chunk)
+                f.flush()
+                os.fsync(f.fileno())
             
-            self.manifest[content_id] = {
-                'filename': filename,
-                'mime_type': mime_type,
-                'cached_at': datetime.utcnow().isoformat()
-            }
-            self._save_manifest()
+            digest = hasher.hexdigest()
+            if expected_hash and digest != expected_hash.lower():
+                logger.error(f"Content hash mismatch: expected {expected_hash}, got {digest}")
+                temp_path.unlink()
+                return None
             
-            logger.info(f"Content cached: {filename}")
-            return str(filepath)
-        except Exception as e:
-            logger.error(f"Error caching content: {e}")
-            return None
+            return digest, self._place_blob(temp_path, digest, mime_type), size
+        except Exception:
+            if temp_path.exists():
+                temp_path.unlink()
+            raise
+    
+    def _place_blob(self, temp_path, digest, mime_type):
+        """Rename a fully written, verified file into the store"""
+        filepath = self.cache_dir / self._blob_filename(digest, mime_type)
+        if filepath.exists():
+            # Identical payload already stored (deduplicated)
+            Path(temp_path).unlink()
+        else:
+            os.replace(temp_path, filepath)
+            self._fsync_dir()
+        return filepath
     
-    def get_content_path(self, content_id):
+    def _fsync_dir(self):
+        """Persist the rename in the directory entry"""
+        try:
+            dir_fd = os.open(self.cache_dir, os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(dir_fd)
+        except OSError:
+            pass
+        finally:
+            os.close(dir_fd)
+    
+    def save_content(self, content_id, data, mime_type, expected_hash=None):
+        """Save content to cache
+
+        ``data`` may be bytes, a binary file object or an iterable of byte
+        chunks. If ``expected_hash`` (hex SHA-256) is given and a blob with
+        that digest is already stored, nothing is written.
+        """
+        with self._lock:
+            try:
+                existing = self.find_blob(expected_hash, mime_type)
+                if existing:
+                    digest, filepath, size = expected_hash.lower(), existing, existing.stat().st_size
+                    logger.info(f"Content already cached: {filepath.name}")
+                else:
+                    if isinstance(data, (bytes, bytearray, memoryview)):
+                        # Make room up front so the write does not fill the card
+                        self._enforce_quota(incoming_bytes=len(data))
+                    result = self._write_blob(data, mime_type, expected_hash)
+                    if result is None:
+                        return None
+                    digest, filepath, size = result
+                    logger.info(f"Content cached: {filepath.name}")
+                
+                return self._record(content_id, filepath, digest, size, mime_type)
+            except Exception as e:
+                logger.error(f"Error caching content: {e}")
+                return None
+    
+    def save_content_file(self, content_id, temp_path, mime_type, digest):
+        """Adopt a fully received and verified file, e.g. from a chunked transfer"""
+        with self._lock:
+            try:
+                size = Path(temp_path).stat().st_size
+                filepath = self._place_blob(temp_path, digest, mime_type)
+                logger.info(f"Content cached: {filepath.name}")
+                return self._record(content_id, filepath, digest, size, mime_type)
+            except Exception as e:
+                logger.error(f"Error caching content: {e}")
+                return None
+    
+    def _record(self, content_id, filepath, digest, size, mime_type):
+        self.manifest.put(content_id, {
+            'filename': filepath.name,
+            'sha256': digest,
+            'size': size,
+            'mime_type': mime_type,
+            'cached_at': datetime.utcnow().isoformat(),
+            'last_access': time.time(),
+            'hits': 0
+        })
+        self._enforce_quota(protect={filepath.name})
+        return str(filepath)
+    
+    def make_room(self, nbytes):
+        """Evict content ahead of a large incoming download"""
+        with self._lock:
+            return self._enforce_quota(incoming_bytes=nbytes)
+    
+    def get_content_path(self, content_id, record_access=True):
         """Get path to cached content"""
-        if content_id in self.manifest:
-            filename = self.manifest[content_id]['filename']
-            filepath = self.cache_dir / filename
+        entry = self.manifest.get(content_id)
+        if entry:
+            filepath = self.cache_dir / entry['filename']
             if filepath.exists():
+                if record_access:
+                    self.hits += 1
+                    self.manifest.record_access(content_id, time.time())
                 return str(filepath)
+        if record_access:
+            self.misses += 1
         return None
     
+    def link_content(self, content_id, digest, mime_type=None):
+        """Point a content ID at an already stored blob without downloading it"""
+        with self._lock:
+            filepath = self.find_blob(digest, mime_type)
+            if not filepath:
+                return None
+            existing = self.manifest.find_by_sha256(digest.lower())
+            mime_type = mime_type or (existing or {}).get('mime_type')
+            return self._record(content_id, filepath, digest.lower(), filepath.stat().st_size, mime_type)
+    
+    def inventory(self):
+        """Summarize cached content for the server
+
+        Small caches are listed in full as content ID to SHA-256. Larger ones
+        are sent as a Bloom filter over the digests. Either way ``digest`` is
+        a hash over the sorted digest set, so the server can skip the sync
+        entirely when it matches what it expects.
+        """
+        digests = self.manifest.digests()
+        unique = sorted(set(digests.values()))
+        summary = {
+            'count': len(unique),
+            'digest': hashlib.sha256(''.join(unique).encode('ascii')).hexdigest()
+        }
+        if len(digests) <= INVENTORY_MAX_HASHES:
+            summary['hashes'] = digests
+        else:
+            bloom = BloomFilter(len(unique))
+            for digest in unique:
+                bloom.add(digest)
+            summary['bloom'] = bloom.to_dict()
+        return summary
+    
+    def missing_content(self, expected):
+        """Return the content IDs from ``expected`` that must be downloaded
+
+        ``expected`` maps content ID to SHA-256 (or None if unknown). Content
+        whose digest is already stored under another ID is linked locally
+        instead of being requested.
+        """
+        missing = []
+        for content_id, digest in expected.items():
+            if digest:
+                if self.get_content_hash(content_id) == digest.lower() and self.has_content(content_id):
+                    continue
+                if self.link_content(content_id, digest):
+                    continue
+            elif self.has_content(content_id):
+                continue
+            missing.append(content_id)
+        return missing
+    
+    def get_content_hash(self, content_id):
+        """Get the SHA-256 digest recorded for cached content"""
+        entry = self.manifest.get(content_id)
+        return entry.get('sha256') if entry else None
+    
+    def get_mime_type(self, content_id):
+        """Get the MIME type recorded for cached content"""
+        entry = self.manifest.get(content_id)
+        return entry.get('mime_type') if entry else None
+    
     def has_content(self, content_id):
         """Check if content is cached"""
-        return self.get_content_path(content_id) is not None
+        entry = self.manifest.get(content_id)
+        return bool(entry) and (self.cache_dir / entry['filename']).exists()
     
-    def clear(self):
-        """Clear all cached content"""
+    def pin(self, name, content_ids):
+        """Protect content from eviction, e.g. 'active' or 'staged' playlist"""
+        with self._lock:
+            self._pins[name] = set(content_ids or ())
+    
+    def unpin(self, name):
+        """Release a pin set"""
+        with self._lock:
+            self._pins.pop(name, None)
+    
+    def _pinned_filenames(self):
+        if not self._pins:
+            return set()
+        return self.manifest.filenames_for(set().union(*self._pins.values()))
+    
+    def _blob_index(self):
+        """Group manifest entries by stored file"""
+        blobs = self.manifest.blobs()
+        for filename, blob in blobs.items():
+            if blob['size'] is None:
+                filepath = self.cache_dir / filename
+                blob['size'] = filepath.stat().st_size if filepath.exists() else 0
+        return blobs
+    
+    def stats(self):
+        """Size against budget, and how often playback found its content cached"""
+        entries, files, size = self.manifest.totals()
+        lookups = self.hits + self.misses
+        return {
+            'entries': entries,
+            'files': files,
+            'bytes': size,
+            'maxBytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hitRate': round(self.hits / lookups, 3) if lookups else 0.0
+        }
+    
+    def _remove_blob(self, filename, content_ids):
         try:
+            (self.cache_dir / filename).unlink()
+        except FileNotFoundError:
+            pass
+        self.manifest.delete(content_ids)
+    
+    def _enforce_quota(self, incoming_bytes=0, protect=()):
+        """Evict unpinned content until usage plus incoming fits the budget"""
+        _, _, used = self.manifest.totals()
+        if used + incoming_bytes <= self.max_bytes:
+            return 0
+        
+        # Over budget: only now is the per-file index worth building
+        blobs = self._blob_index()
+        used = sum(blob['size'] for blob in blobs.values())
+        keep = self._pinned_filenames() | set(protect)
+        if self.policy == 'lfu':
+            order_key = lambda item: (item[1]['hits'], item[1]['last_access'])
+        else:
+            order_key = lambda item: item[1]['last_access']
+        candidates = sorted(
+            (item for item in blobs.items() if item[0] not in keep),
+            key=order_key
+        )
+        
+        freed = 0
+        for filename, blob in candidates:
+            if used + incoming_bytes - freed <= self.max_bytes:
+                break
+            self._remove_blob(filename, blob['content_ids'])
+            freed += blob['size']
+            logger.info(f"Evicted cached content: {filename} ({blob['size']} bytes)")
+        
+        if used + incoming_bytes - freed > self.max_bytes:
+            logger.warning("Content cache over budget; remaining content is pinned")
+        return freed
+    
+    def _is_content_file(self, filepath):
+        return (filepath.is_file()
+                and not filepath.name.startswith(self.MANIFEST_PREFIX)
+                and not filepath.name.endswith(self.TEMP_SUFFIX))
+    
+    def collect_garbage(self):
+        """Remove unreferenced files and stale content no playlist uses
+
+        Files in the cache directory that no manifest entry points to are
+        deleted, as are entries whose file has gone missing. Manifest entries are only collected once a playlist has
+        been pinned, and only after they have gone unused for
+        ``orphan_ttl`` seconds.
+        """
+        with self._lock:
+            removed = 0
+            for filename, blob in self._blob_index().items():
+                if not (self.cache_dir / filename).exists():
+                    # File deleted behind our back, e.g. through the web UI
+                    self.manifest.delete(blob['content_ids'])
+            
+            known = self.manifest.filenames()
             for filepath in self.cache_dir.iterdir():
-                if filepath.is_file():
+                if not self._is_content_file(filepath) or filepath.name in known:
+                    continue
+                try:
                     filepath.unlink()
-            self.manifest = {}
-            self._save_manifest()
-            logger.info("Cache cleared")
-        except Exception as e:
-            logger.error(f"Error clearing cache: {e}")
+                    removed += 1
+                    logger.info(f"Removed orphaned cache file: {filepath.name}")
+                except OSError as e:
+                    logger.error(f"Error removing orphaned cache file: {e}")
+            
+            if self._pins:
+                pinned = self._pinned_filenames()
+                cutoff = time.time() - self.orphan_ttl
+                for filename, blob in self._blob_index().items():
+                    if filename not in pinned and blob['last_access'] < cutoff:
+                        self._remove_blob(filename, blob['content_ids'])
+                        removed += 1
+                        logger.info(f"Removed unused cached content: {filename}")
+            
+            self.manifest.checkpoint()
+            return removed
+    
+    def clear(self):
+        """Clear all cached content"""
+        with self._lock:
+            try:
+                for filepath in self.cache_dir.iterdir():
+                    if self._is_content_file(filepath):
+                        filepath.unlink()
+                self.manifest.clear()
+                logger.info("Cache cleared")
+            except Exception as e:
+                logger.error(f"Error clearing cache: {e}")
     
     def _get_extension(self, mime_type):
         mime_map = {
@@ -116,18 +827,749 @@ class ContentCache:
             'image/jpeg': '.jpg',
             'image/gif': '.gif',
             'video/mp4': '.mp4',
+            'video/webm': '.webm',
             'text/html': '.html'
         }
         return mime_map.get(mime_type, '.bin')
 
 
+class ContentTransfer:
+    """A single binary, chunked content download that can be resumed"""
+    
+    def __init__(self, transfer_id, metadata, path, acked=0):
+        self.transfer_id = transfer_id
+        self.metadata = metadata
+        self.path = Path(path)
+        self.size = int(metadata.get('size', 0))
+        self._hasher = hashlib.sha256()
+        on_disk = self.path.stat().st_size if self.path.exists() else 0
+        # A missing or short partial file restarts from what is really there
+        acked = min(acked, on_disk)
+        mode = 'r+b' if self.path.exists() else 'w+b'
+        self._file = open(self.path, mode)
+        # Anything past the last acknowledged offset may not have hit the disk
+        self._file.truncate(acked)
+        self._rehash_prefix(acked)
+        self.received = acked
+        self.acked = acked
+    
+    def _rehash_prefix(self, length):
+        self._file.seek(0)
+        remaining = length
+        while remaining:
+            chunk = self._file.read(min(ContentCache.CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            self._hasher.update(chunk)
+            remaining -= len(chunk)
+        self._file.seek(length)
+    
+    @property
+    def complete(self):
+        return self.received >= self.size
+    
+    def write(self, offset, payload):
+        """Append a chunk; returns False if it is not the next expected one"""
+        if offset != self.received:
+            return False
+        self._file.write(payload)
+        self._hasher.update(payload)
+        self.received += len(payload)
+        return True
+    
+    def sync(self):
+        """Flush received data to disk so it can be acknowledged"""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.acked = self.received
+    
+    def hexdigest(self):
+        return self._hasher.hexdigest()
+    
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+
+class TransferManager:
+    """Tracks chunked content transfers and their resume state
+
+    Binary frames carry a fixed header (transfer UUID, byte offset) followed
+    by the chunk payload. Chunks are written straight to a partial file under
+    ``incoming/``; only the current chunk is held in memory. Progress is
+    acknowledged after fsync and recorded in the cache index, so an
+    interrupted transfer resumes from the last acknowledged offset, after a
+    reconnect or a restart.
+    """
+    
+    def __init__(self, content_cache):
+        self.content_cache = content_cache
+        self.incoming_dir = content_cache.cache_dir / 'incoming'
+        self.incoming_dir.mkdir(exist_ok=True)
+        self.active = {}
+        self._remove_untracked_partials()
+    
+    def _remove_untracked_partials(self):
+        tracked = {transfer_id for transfer_id, _, _ in self.content_cache.manifest.transfers()}
+        for filepath in self.incoming_dir.iterdir():
+            if filepath.stem not in tracked:
+                filepath.unlink()
+    
+    def pending(self):
+        """Unfinished transfers to report to the server on (re)connect"""
+        return [
+            {'transferId': transfer_id, 'contentId': metadata.get('contentId'), 'offset': acked}
+            for transfer_id, metadata, acked in self.content_cache.manifest.transfers()
+        ]
+    
+    def start(self, metadata):
+        """Open or resume a transfer and return the offset to continue from"""
+        transfer_id = str(uuid.UUID(metadata['transferId']))
+        transfer = self.active.get(transfer_id)
+        if transfer is None:
+            stored = self.content_cache.manifest.get_transfer(transfer_id)
+            acked = stored[1] if stored else 0
+            if not stored:
+                self.content_cache.make_room(int(metadata.get('size', 0)))
+                self.content_cache.manifest.put_transfer(transfer_id, metadata)
+            transfer = ContentTransfer(
+                transfer_id, metadata, self.incoming_dir / f'{transfer_id}.partial', acked
+            )
+            if transfer.acked != acked:
+                logger.warning(f"Partial file for transfer {transfer_id} is short; resuming at {transfer.acked}")
+                self.content_cache.manifest.update_transfer(transfer_id, transfer.acked)
+            self.active[transfer_id] = transfer
+        return transfer
+    
+    def owns(self, frame):
+        """Whether a binary frame is a chunk of an active transfer"""
+        if len(frame) < TRANSFER_FRAME_HEADER.size:
+            return False
+        raw_id, _ = TRANSFER_FRAME_HEADER.unpack_from(frame)
+        return str(uuid.UUID(bytes=raw_id)) in self.active
+    
+    def write_frame(self, frame):
+        """Write one binary frame
+
+        Returns (transfer, ack_due). ``ack_due`` is True when the server
+        should be told the current offset: after every
+        ``TRANSFER_ACK_INTERVAL`` bytes, on completion, or when a chunk
+        arrived out of order and the server must rewind.
+        """
+        if len(frame) < TRANSFER_FRAME_HEADER.size:
+            raise ValueError('Binary frame too short')
+        raw_id, offset = TRANSFER_FRAME_HEADER.unpack_from(frame)
+        transfer = self.active.get(str(uuid.UUID(bytes=raw_id)))
+        if transfer is None:
+            raise KeyError(f'Unknown transfer {uuid.UUID(bytes=raw_id)}')
+        
+        payload = memoryview(frame)[TRANSFER_FRAME_HEADER.size:]
+        if not transfer.write(offset, payload):
+            if offset < transfer.received:
+                return transfer, False  # A duplicate of data already written
+            # A gap: make everything received so far durable, so the server
+            # rewinds to the contiguous offset rather than the last checkpoint
+            self.checkpoint(transfer)
+            return transfer, True
+        if transfer.complete or transfer.received - transfer.acked >= TRANSFER_ACK_INTERVAL:
+            self.checkpoint(transfer)
+            return transfer, True
+        return transfer, False
+    
+    def checkpoint(self, transfer):
+        transfer.sync()
+        self.content_cache.manifest.update_transfer(transfer.transfer_id, transfer.acked)
+    
+    def finish(self, transfer):
+        """Verify a completed transfer and move it into the content cache"""
+        transfer.close()
+        self._forget(transfer.transfer_id)
+        metadata = transfer.metadata
+        digest = transfer.hexdigest()
+        expected = metadata.get('sha256')
+        if expected and digest != expected.lower():
+            logger.error(f"Content hash mismatch: expected {expected}, got {digest}")
+            transfer.path.unlink()
+            return None
+        return self.content_cache.save_content_file(
+            metadata.get('contentId'), transfer.path, metadata.get('mimeType'), digest
+        )
+    
+    def cancel(self, transfer_id):
+        transfer_id = str(uuid.UUID(transfer_id))
+        transfer = self.active.get(transfer_id)
+        if transfer:
+            transfer.close()
+        self._forget(transfer_id)
+        partial = self.incoming_dir / f'{transfer_id}.partial'
+        if partial.exists():
+            partial.unlink()
+    
+    def _forget(self, transfer_id):
+        self.active.pop(transfer_id, None)
+        self.content_cache.manifest.delete_transfer(transfer_id)
+    
+    def suspend(self):
+        """Persist progress and close files when the connection drops"""
+        for transfer in list(self.active.values()):
+            self.checkpoint(transfer)
+            transfer.close()
+        self.active.clear()
+
+
+class IngestPipeline:
+    """Runs content decode, hashing and disk writes off the event loop
+
+    Jobs wait in a bounded queue, so a burst of content updates cannot pile
+    decoded payloads up in memory. Submitting never waits: when the queue is
+    full the job is dropped and its content ID is handed to
+    ``request_again`` once a worker frees up, so the receive loop keeps
+    reading and control or emergency messages are never stuck behind bulk
+    content. The heavy work runs in a thread pool, leaving the event loop
+    free for heartbeats and pings. Time spent in each stage is recorded for
+    monitoring.
+    """
+    
+    STAGES = ('queue', 'parse', 'decode', 'store')
+    
+    def __init__(self, content_cache, request_again=None, workers=INGEST_WORKERS, depth=INGEST_QUEUE_DEPTH):
+        self.content_cache = content_cache
+        self.request_again = request_again
+        self.deferred = []  # Content IDs dropped while the queue was full
+        self.dropped = 0
+        self.workers = max(1, workers)
+        self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='ingest')
+        self.depth = max(1, depth)
+        self.queue = None  # Created on first use, inside the running loop
+        self._tasks = []
+        self._lock = threading.Lock()
+        self._stats = {
+            stage: {'count': 0, 'totalMs': 0.0, 'maxMs': 0.0, 'lastMs': 0.0}
+            for stage in self.STAGES
+        }
+    
+    def record(self, stage, seconds):
+        ms = seconds * 1000
+        with self._lock:
+            stats = self._stats[stage]
+            stats['count'] += 1
+            stats['totalMs'] += ms
+            stats['lastMs'] = ms
+            stats['maxMs'] = max(stats['maxMs'], ms)
+    
+    def stats(self):
+        """Per-stage timing summary plus the current queue depth"""
+        with self._lock:
+            summary = {
+                stage: {
+                    **{key: round(value, 2) for key, value in stats.items()},
+                    'avgMs': round(stats['totalMs'] / stats['count'], 2) if stats['count'] else 0.0
+                }
+                for stage, stats in self._stats.items()
+            }
+        summary['queueDepth'] = self.queue.qsize() if self.queue else 0
+        summary['dropped'] = self.dropped
+        return summary
+    
+    async def run(self, stage, func, *args):
+        """Run blocking work in the pool and record it under ``stage``"""
+        started = time.perf_counter()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+        finally:
+            self.record(stage, time.perf_counter() - started)
+    
+    async def parse(self, data, decode=json.loads):
+        """Decode a message, off the event loop when it is large"""
+        if len(data) < INGEST_OFFLOAD_BYTES:
+            return decode(data)
+        return await self.run('parse', decode, data)
+    
+    def start(self):
+        if self.queue is None:
+            self.queue = asyncio.Queue(maxsize=self.depth)
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+    
+    def submit(self, job, content_id=None):
+        """Queue a coroutine function; returns False if it was dropped because the queue is full"""
+        self.start()
+        try:
+            self.queue.put_nowait((time.perf_counter(), job))
+            return True
+        except asyncio.QueueFull:
+            self.dropped += 1
+            if content_id and content_id not in self.deferred:
+                self.deferred.append(content_id)
+            return False
+    
+    async def _worker(self):
+        while True:
+            queued_at, job = await self.queue.get()
+            self.record('queue', time.perf_counter() - queued_at)
+            try:
+                await job()
+            except Exception as e:
+                logger.error(f'Ingest job failed: {e}')
+            finally:
+                self.queue.task_done()
+            if self.deferred and self.request_again and not self.queue.full():
+                content_ids, self.deferred = self.deferred, []
+                try:
+                    await self.request_again(content_ids)
+                except Exception as e:
+                    logger.error(f'Error requesting dropped content again: {e}')
+    
+    def _decode_chunks(self, text, timing):
+        """Decode base64 in slices so it streams into the cache"""
+        for offset in range(0, len(text), BASE64_DECODE_CHUNK):
+            started = time.perf_counter()
+            chunk = base64.b64decode(text[offset:offset + BASE64_DECODE_CHUNK])
+            timing['decode'] += time.perf_counter() - started
+            yield chunk
+    
+    def _decode_and_store(self, content_id, text, mime_type, expected_hash):
+        timing = {'decode': 0.0}
+        started = time.perf_counter()
+        file_path = self.content_cache.save_content(
+            content_id, self._decode_chunks(text, timing), mime_type, expected_hash=expected_hash
+        )
+        self.record('decode', timing['decode'])
+        self.record('store', time.perf_counter() - started - timing['decode'])
+        return file_path
+    
+    async def store_base64(self, content_id, text, mime_type, expected_hash=None):
+        """Decode, verify and cache base64 content in the thread pool"""
+        if expected_hash and self.content_cache.find_blob(expected_hash, mime_type):
+            # Already stored: skip decoding entirely
+            return self.content_cache.save_content(content_id, b'', mime_type, expected_hash)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor, self._decode_and_store, content_id, text, mime_type, expected_hash
+        )
+
+
+class PlaylistPrefetcher:
+    """Requests content for upcoming playlist items before they are due
+
+    Walks the playlist from the current position until it covers both
+    ``max_items`` items and ``max_seconds`` of playback. Missing content is
+    requested in play order, with at most ``concurrency`` requests in
+    flight. Readiness of the whole playlist is reported whenever it changes.
+    """
+    
+    def __init__(self, content_cache, request_content, report_readiness,
+                 max_items=PREFETCH_ITEMS, max_seconds=PREFETCH_SECONDS,
+                 concurrency=PREFETCH_CONCURRENCY, request_timeout=PREFETCH_REQUEST_TIMEOUT):
+        self.content_cache = content_cache
+        self.request_content = request_content
+        self.report_readiness = report_readiness
+        self.max_items = max_items
+        self.max_seconds = max_seconds
+        self.concurrency = max(1, concurrency)
+        self.request_timeout = request_timeout
+        self.in_flight = {}  # content ID -> monotonic time requested
+        self.queued = []
+        self._last_readiness = None
+    
+    def window(self, items, index):
+        """Return the upcoming items, starting with the one at ``index``"""
+        upcoming = []
+        elapsed = 0
+        for step in range(len(items)):
+            if step >= self.max_items and elapsed >= self.max_seconds:
+                break
+            item = items[(index + step) % len(items)]
+            upcoming.append(item)
+            elapsed += item.get('duration', 10)
+        return upcoming
+    
+    async def update(self, items, index):
+        """Queue downloads for the look-ahead window and report readiness"""
+        if not items:
+            self.content_cache.unpin('staged')
+            return
+        expected = {}
+        for item in self.window(items, index):
+            content_id = item.get('contentId')
+            if content_id and content_id not in expected:
+                expected[content_id] = item.get('sha256')
+        # Keep what is about to play from being evicted to make room for the rest
+        self.content_cache.pin('staged', expected)
+        missing = self.content_cache.missing_content(expected)
+        
+        now = time.monotonic()
+        for content_id, requested_at in list(self.in_flight.items()):
+            if content_id not in missing or now - requested_at > self.request_timeout:
+                del self.in_flight[content_id]
+        
+        self.queued = [content_id for content_id in missing if content_id not in self.in_flight]
+        batch = self.queued[:self.concurrency - len(self.in_flight)]
+        if batch:
+            for content_id in batch:
+                self.in_flight[content_id] = now
+            self.queued = self.queued[len(batch):]
+            await self.request_content(batch)
+        
+        await self._report(items)
+    
+    def content_arrived(self, content_id):
+        """Free the request slot held by content that has been cached"""
+        self.in_flight.pop(content_id, None)
+    
+    def readiness(self, items):
+        content_ids = list(dict.fromkeys(item.get('contentId') for item in items if item.get('contentId')))
+        missing = [content_id for content_id in content_ids if not self.content_cache.has_content(content_id)]
+        if not missing:
+            state = 'ready'
+        elif len(missing) < len(content_ids):
+            state = 'partial'
+        else:
+            state = 'loading'
+        return {
+            'state': state,
+            'ready': len(content_ids) - len(missing),
+            'total': len(content_ids),
+            'missing': missing,
+            'inFlight': len(self.in_flight)
+        }
+    
+    async def _report(self, items):
+        readiness = self.readiness(items)
+        if readiness != self._last_readiness:
+            self._last_readiness = readiness
+            await self.report_readiness(readiness)
+
+
+class PlaylistScheduler:
+    """Owns playlist playback on a single task with absolute deadlines
+
+    Every slot starts at the previous slot's deadline plus its duration on
+    the monotonic clock, so time spent showing, preloading and prefetching
+    never accumulates into drift. Replacing the playlist cancels the running
+    loop and starts the new one in the same step, so two loops never compete
+    for the screen. If playback falls behind (a stalled loop or a resume
+    after an emergency) the slots already past are skipped so the timeline
+    is rejoined where it would have been.
+    """
+    
+    def __init__(self, play_item, clock=time.monotonic):
+        self.play_item = play_item
+        self.clock = clock
+        self.items = []
+        self.index = 0
+        self._deadline = None
+        self._task = None
+        self._wake = None
+        self._joining = False
+        self._stats = {'slots': 0, 'skipped': 0, 'errorTotal': 0.0, 'lastError': 0.0, 'maxError': 0.0}
+    
+    @property
+    def running(self):
+        return self._task is not None and not self._task.done()
+    
+    def _duration(self, index):
+        return slot_duration(self.items[index])
+    
+    def replace(self, items, index=0, start_at=None):
+        """Cancel current playback and play ``items`` from ``index``"""
+        self.stop()
+        self.items = list(items or [])
+        self.index = index % len(self.items) if self.items else 0
+        self._deadline = self.clock() if start_at is None else start_at
+        if self.items:
+            # Joining a timeline that started earlier is not a skip
+            self._catch_up(self.clock(), count=False)
+            self._joining = True
+            self._task = asyncio.create_task(self._run())
+    
+    def stop(self):
+        """Stop the playback loop, keeping the position on the timeline"""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+    
+    def resume(self):
+        """Restart a stopped loop on its original timeline"""
+        if self.items and not self.running:
+            self._joining = True
+            self._task = asyncio.create_task(self._run())
+    
+    def shift(self, delta):
+        """Move the timeline by ``delta`` seconds, e.g. after a clock correction"""
+        if self._deadline is None:
+            return
+        self._deadline += delta
+        if self._wake is not None:
+            self._wake.set()
+    
+    def _catch_up(self, now, count=True):
+        """Skip slots that ended while playback was stopped or stalled"""
+        skipped = 0
+        cycle = sum(self._duration(i) for i in range(len(self.items)))
+        behind = now - self._deadline
+        if behind > cycle:
+            loops = int(behind // cycle)
+            self._deadline += loops * cycle
+            skipped += loops * len(self.items)
+        while now >= self._deadline + self._duration(self.index):
+            self._deadline += self._duration(self.index)
+            self.index = (self.index + 1) % len(self.items)
+            skipped += 1
+        if count:
+            self._stats['skipped'] += skipped
+    
+    async def _sleep_until_deadline(self):
+        """Wait for the next deadline; False if the timeline moved meanwhile"""
+        delay = self._deadline - self.clock()
+        if delay <= 0:
+            return True
+        if self._wake is None:
+            self._wake = asyncio.Event()
+        self._wake.clear()
+        try:
+            await asyncio.wait_for(self._wake.wait(), delay)
+            return False
+        except asyncio.TimeoutError:
+            return True
+    
+    async def _run(self):
+        while self.items:
+            self._catch_up(self.clock())
+            if not await self._sleep_until_deadline():
+                continue
+            if self._joining:
+                # A slot joined part-way through is not late
+                self._joining = False
+            else:
+                self._record(self.clock() - self._deadline)
+            try:
+                await self.play_item(self.items, self.index)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error playing playlist item: {e}")
+            self._deadline += self._duration(self.index)
+            self.index = (self.index + 1) % len(self.items)
+    
+    def _record(self, error):
+        self._stats['slots'] += 1
+        self._stats['errorTotal'] += abs(error)
+        self._stats['lastError'] = error
+        self._stats['maxError'] = max(self._stats['maxError'], abs(error))
+    
+    def stats(self):
+        """Slot start lateness against the schedule, in milliseconds"""
+        slots = self._stats['slots']
+        return {
+            'slots': slots,
+            'skipped': self._stats['skipped'],
+            'lastErrorMs': round(self._stats['lastError'] * 1000, 2),
+            'meanErrorMs': round(self._stats['errorTotal'] / slots * 1000, 2) if slots else 0.0,
+            'maxErrorMs': round(self._stats['maxError'] * 1000, 2)
+        }
+
+
+class ClockSync:
+    """Estimates the server clock from TIME_SYNC round trips, NTP style
+
+    Each round trip gives client send/receive times (t0, t3) and server
+    receive/send times (t1, t2). Offset is ((t1 - t0) + (t2 - t3)) / 2 and
+    the network delay is (t3 - t0) - (t2 - t1). Of the recent samples, the
+    one with the lowest delay is used, since it suffered the least queueing
+    and therefore the least path asymmetry; half its delay bounds the error.
+
+    Local time is a monotonic clock anchored to the wall clock once, so
+    NTP steps on the Pi itself cannot move the playlist timeline.
+    """
+    
+    def __init__(self, window=CLOCK_SYNC_WINDOW):
+        self._anchor_wall = time.time()
+        self._anchor_mono = time.monotonic()
+        self.samples = deque(maxlen=window)
+        self.offset = 0.0
+        self.delay = None
+    
+    @property
+    def synced(self):
+        return self.delay is not None
+    
+    def local_time(self):
+        """Seconds since the Unix epoch by this client's steady clock"""
+        return self._anchor_wall + time.monotonic() - self._anchor_mono
+    
+    def server_time(self):
+        return self.local_time() + self.offset
+    
+    def to_monotonic(self, server_ts):
+        """Convert a server timestamp (Unix seconds) to time.monotonic()"""
+        return server_ts - self.offset - self._anchor_wall + self._anchor_mono
+    
+    def add_sample(self, t0, t1, t2, t3):
+        """Record one round trip (all in seconds); returns the offset change"""
+        delay = (t3 - t0) - (t2 - t1)
+        if delay < 0:
+            return 0.0
+        self.samples.append((delay, ((t1 - t0) + (t2 - t3)) / 2))
+        previous = self.offset
+        self.delay, self.offset = min(self.samples)
+        return self.offset - previous
+    
+    def status(self):
+        """Current offset estimate and its error bound, in milliseconds"""
+        return {
+            'synced': self.synced,
+            'offsetMs': round(self.offset * 1000, 2),
+            'rttMs': round(self.delay * 1000, 2) if self.synced else None,
+            'errorMs': round(self.delay * 500, 2) if self.synced else None,
+            'samples': len(self.samples)
+        }
+
+
+class OutboundQueue:
+    """Priority queue feeding the single WebSocket writer
+
+    Emergency traffic is always sent first, then control messages (acks,
+    requests, command results), then telemetry (heartbeats and status
+    snapshots). Telemetry with the same coalesce key replaces the queued
+    copy, and when the telemetry queue is full its oldest entry is dropped.
+    Control senders wait for room, up to ``put_timeout``, after which the
+    oldest control message is dropped. Emergency messages and replay ACKs
+    are never dropped. Time spent queued is measured per priority.
+    """
+    
+    NEVER_DROPPED = ('ACK',)  # Control message types kept even when the queue overflows
+    
+    def __init__(self, control_depth=OUTBOUND_CONTROL_DEPTH, telemetry_depth=OUTBOUND_TELEMETRY_DEPTH,
+                 put_timeout=OUTBOUND_PUT_TIMEOUT):
+        self.depths = {PRIORITY_CONTROL: control_depth, PRIORITY_TELEMETRY: telemetry_depth}
+        self.put_timeout = put_timeout
+        self.queues = [deque() for _ in PRIORITY_NAMES]
+        self.pending = {}  # coalesce key -> queued entry
+        self._condition = None
+        self._stats = [{'sent': 0, 'dropped': 0, 'coalesced': 0, 'waitTotal': 0.0, 'waitMax': 0.0}
+                       for _ in PRIORITY_NAMES]
+    
+    @property
+    def condition(self):
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+    
+    @staticmethod
+    def classify(message):
+        """Default (priority, coalesce key) for a message"""
+        msg_type = message.get('type')
+        data = message.get('data') or {}
+        if msg_type == 'HEARTBEAT':
+            return PRIORITY_TELEMETRY, 'HEARTBEAT'
+        if msg_type == 'STATUS':
+            status = str(data.get('status', ''))
+            if status.startswith('emergency'):
+                return PRIORITY_EMERGENCY, None
+            if 'contentId' in data or 'broadcastId' in data:
+                # Acknowledgements of a specific item are not snapshots
+                return PRIORITY_CONTROL, None
+            return PRIORITY_TELEMETRY, f'STATUS:{status}'
+        return PRIORITY_CONTROL, None
+    
+    def _drop_oldest(self, priority):
+        queue = self.queues[priority]
+        for entry in queue:
+            if entry[0].get('type') not in self.NEVER_DROPPED:
+                break
+        else:
+            return  # Only messages that must go out; let the queue grow
+        queue.remove(entry)
+        if entry[2] and self.pending.get(entry[2]) is entry:
+            del self.pending[entry[2]]
+        self._stats[priority]['dropped'] += 1
+    
+    async def put(self, message, priority=None, key=None):
+        """Queue a message; returns once it is queued, not once it is sent"""
+        if priority is None:
+            priority, key = self.classify(message)
+        async with self.condition:
+            if key is not None and key in self.pending:
+                self.pending[key][0] = message
+                self._stats[priority]['coalesced'] += 1
+                return
+            queue = self.queues[priority]
+            if priority == PRIORITY_TELEMETRY and len(queue) >= self.depths[priority]:
+                self._drop_oldest(priority)
+            elif priority == PRIORITY_CONTROL and len(queue) >= self.depths[priority]:
+                try:
+                    await asyncio.wait_for(
+                        self.condition.wait_for(lambda: len(queue) < self.depths[priority]),
+                        self.put_timeout
+                    )
+                except asyncio.TimeoutError:
+                    self._drop_oldest(priority)
+            entry = [message, time.monotonic(), key, priority]
+            queue.append(entry)
+            if key is not None:
+                self.pending[key] = entry
+            self.condition.notify_all()
+    
+    async def get(self):
+        """Wait for the most urgent queued message"""
+        async with self.condition:
+            await self.condition.wait_for(lambda: any(self.queues))
+            for queue in self.queues:
+                if queue:
+                    message, queued_at, key, priority = queue.popleft()
+                    break
+            if key is not None:
+                self.pending.pop(key, None)
+            waited = time.monotonic() - queued_at
+            stats = self._stats[priority]
+            stats['sent'] += 1
+            stats['waitTotal'] += waited
+            stats['waitMax'] = max(stats['waitMax'], waited)
+            self.condition.notify_all()
+            return message
+    
+    def discard(self, *priorities):
+        """Forget queued messages, e.g. session-bound ones after a disconnect"""
+        for priority in priorities:
+            for entry in self.queues[priority]:
+                if entry[2] is not None:
+                    self.pending.pop(entry[2], None)
+            self.queues[priority].clear()
+    
+    def stats(self):
+        """Queue depth, drops and wait times per priority"""
+        result = {}
+        for priority, name in enumerate(PRIORITY_NAMES):
+            stats = self._stats[priority]
+            result[name] = {
+                'depth': len(self.queues[priority]),
+                'sent': stats['sent'],
+                'dropped': stats['dropped'],
+                'coalesced': stats['coalesced'],
+                'meanWaitMs': round(stats['waitTotal'] / stats['sent'] * 1000, 2) if stats['sent'] else 0.0,
+                'maxWaitMs': round(stats['waitMax'] * 1000, 2)
+            }
+        return result
+
+
 class DisplayManager:
-    """Manages display integration"""
+    """Manages display integration
+
+    PyQt5 is imported, and the window built, on the display thread itself,
+    so the import overlaps with connecting to the server and Qt objects live
+    on the thread that runs their event loop. ``ready`` is set once the
+    window exists, or once it is clear there will be none.
+    """
     
-    def __init__(self):
+    def __init__(self, image_cache_mb=IMAGE_CACHE_MB, transition_fps=TRANSITION_FPS):
+        self.image_cache_bytes = int(image_cache_mb * 1024 * 1024)
+        self.transition_fps = transition_fps
         self.display = None
         self.app = None
         self.display_thread = None
+        self.screen_size = None
+        self.ready = threading.Event()
         self._initialized = False
     
     def initialize(self):
@@ -139,7 +1581,9 @@ class DisplayManager:
             # Only import PyQt5 if we're going to use it
             if os.environ.get('DISPLAY') or os.path.exists('/dev/fb0'):
                 from display_engine import create_display
-                self.app, self.display = create_display()
+                self.app, self.display = create_display(self.image_cache_bytes, self.transition_fps)
+                geometry = self.app.primaryScreen().size()
+                self.screen_size = (geometry.width(), geometry.height())
                 self._initialized = True
                 logger.info("Display engine initialized")
             else:
@@ -148,18 +1592,24 @@ class DisplayManager:
             logger.error(f"Could not initialize display: {e}")
     
     def start(self):
-        """Start the display in a separate thread"""
-        if not self._initialized:
-            return
-        
+        """Initialize and run the display on its own thread"""
         def run_display():
             try:
-                self.display.show_fullscreen()
-                self.app.exec_()
+                with timeline.phase('display'):
+                    self.initialize()
+                    if self._initialized:
+                        self.display.show_fullscreen()
             except Exception as e:
                 logger.error(f"Display error: {e}")
+            finally:
+                self.ready.set()
+            if self._initialized:
+                try:
+                    self.app.exec_()
+                except Exception as e:
+                    logger.error(f"Display error: {e}")
         
-        self.display_thread = threading.Thread(target=run_display, daemon=True)
+        self.display_thread = threading.Thread(target=run_display, name='display', daemon=True)
         self.display_thread.start()
     
     def show_content(self, content_data):
@@ -167,6 +1617,29 @@ class DisplayManager:
         if self._initialized and self.display:
             self.display.signals.content_update.emit(content_data)
     
+    def preload_content(self, content_data):
+        """Decode upcoming content ahead of time"""
+        if self._initialized and self.display:
+            self.display.signals.preload_content.emit(content_data)
+    
+    def image_cache_stats(self):
+        """Hit/miss counters of the decoded image cache"""
+        if self._initialized and self.display:
+            return self.display.image_cache.stats()
+        return None
+    
+    def transition_stats(self):
+        """Frame pacing measured during transitions"""
+        if self._initialized and self.display:
+            return self.display.content_display.pacing_stats()
+        return None
+    
+    def video_stats(self):
+        """Preroll times and dropped frames of video playback"""
+        if self._initialized and self.display:
+            return self.display.video_engine.stats()
+        return None
+    
     def show_overlay(self, overlay_data):
         """Show overlay"""
         if self._initialized and self.display:
@@ -203,16 +1676,97 @@ class MakerScreenClient:
         self.server_url = self.config.get('serverUrl', DEFAULT_SERVER_URL)
         self.client_id = self.get_client_id()
         self.client_name = self.config.get('displayName') or platform.node()
-        self.content_cache = ContentCache(CONTENT_DIR)
-        self.display_manager = DisplayManager()
+        self.content_cache = ContentCache(
+            CONTENT_DIR,
+            max_bytes=self.config.get('cacheMaxBytes'),
+            policy=self.config.get('cacheEvictionPolicy', 'lru'),
+            orphan_ttl=self.config.get('cacheOrphanTtl', CACHE_ORPHAN_TTL)
+        )
+        self.transfers = TransferManager(self.content_cache)
+        self.ingest = IngestPipeline(self.content_cache, self.request_content)
+        self.prefetcher = PlaylistPrefetcher(
+            self.content_cache,
+            self.request_content,
+            lambda readiness: self.send_status('playlist_readiness', readiness),
+            max_items=self.config.get('prefetchItems', PREFETCH_ITEMS),
+            max_seconds=self.config.get('prefetchSeconds', PREFETCH_SECONDS),
+            concurrency=self.config.get('prefetchConcurrency', PREFETCH_CONCURRENCY)
+        )
+        self.display_manager = DisplayManager(
+            self.config.get('imageCacheMb', IMAGE_CACHE_MB),
+            self.config.get('transitionFps', TRANSITION_FPS)
+        )
         self.current_playlist = None
-        self.playlist_index = 0
+        self.schedule = None
+        self.schedule_data = None  # Campaigns the schedule was compiled from
+        self.overlays = {}  # Overlay ID -> latest OVERLAY_UPDATE data
+        self.playlist_source = None  # 'cache' until the server sends a playlist
+        self.first_frame = None  # Time-to-first-frame, once something is on screen
+        self._schedule_timer = None
+        self.scheduler = PlaylistScheduler(self.play_item)
+        self.clock_sync = ClockSync()
+        self.wire_codecs = [name for name in self.config.get('wireCodecs', available_codecs())
+                            if name in available_codecs()]
+        self.codec = JsonCodec
+        self.outbound = OutboundQueue()
         self.connected = False
         self.active_emergency = None  # Track active emergency broadcast
+        self.emergency_log = deque(maxlen=EMERGENCY_LOG_SIZE)
+        self.last_received_at = None  # (monotonic, local epoch) of the latest message
+        self.resume_token = None  # Server session to resume on reconnect
+        self.last_seq = 0  # Highest sequence number handled in that session
+        self.acked_seq = 0
+        self._memory_mb = None
+        self.connected_once = False
+        self.state_server = None
+        self.metrics = MetricsRegistry()
+        self.register_metrics()
+        self.register_live_state()
         
-        # Initialize display if available
-        self.display_manager.initialize()
+        # Sized for the configured or default screen until the display is up
+        self.renditions = RenditionCache(
+            CONTENT_DIR,
+            self.get_rendition_size(),
+            workers=self.config.get('renditionWorkers')
+        )
         
+    def register_metrics(self):
+        """Collectors sent, as deltas, in every heartbeat"""
+        self.metrics.register('system', lambda: system_metrics(CONTENT_DIR))
+        self.metrics.register('cache', self.content_cache.stats)
+        self.metrics.register('imageCache', self.display_manager.image_cache_stats)
+        self.metrics.register('ingest', self.ingest.stats)
+        self.metrics.register('transitions', self.display_manager.transition_stats)
+        self.metrics.register('video', self.display_manager.video_stats)
+        self.metrics.register('playback', self.scheduler.stats)
+        self.metrics.register('clock', self.clock_sync.status)
+        self.metrics.register('outbound', self.outbound.stats)
+        self.metrics.register('startup', self.startup_report)
+    
+    def register_live_state(self):
+        """What the web UI can see of this client"""
+        live_state.publish(
+            clientId=self.client_id,
+            clientName=self.client_name,
+            serverUrl=self.server_url,
+            version=VERSION,
+            startedAt=time.time() - (time.monotonic() - timeline.started_at),
+            connected=False,
+            currentItem=None
+        )
+        live_state.provide('playlist', lambda: {
+            'source': self.playlist_source,
+            'items': len(self.scheduler.items),
+            'scheduled': self.schedule is not None
+        })
+        live_state.provide('emergency', lambda: self.active_emergency and {
+            key: self.active_emergency.get(key) for key in ('id', 'title', 'type', 'priority')
+        })
+        # The same collectors as the heartbeat, run only when someone looks.
+        # System readings come from the web UI's sampler; reading psutil's CPU
+        # counter here would also cut short the heartbeat's measurement window.
+        live_state.provide('metrics', lambda: self.metrics.collect(exclude=('system',)))
+    
     def load_config(self):
         """Load configuration from file"""
         try:
@@ -236,6 +1790,17 @@ class MakerScreenClient:
             logger.error(f"Error saving config: {e}")
             return False
     
+    def get_rendition_size(self):
+        """Resolution images are pre-scaled to: config, attached screen, or default"""
+        configured = self.config.get('renditionSize')
+        if configured:
+            try:
+                width, height = (int(value) for value in str(configured).lower().split('x'))
+                return width, height
+            except ValueError:
+                logger.warning(f"Invalid renditionSize '{configured}', expected WIDTHxHEIGHT")
+        return self.display_manager.screen_size or DEFAULT_SCREEN_SIZE
+    
     def get_client_id(self):
         """Get unique client ID based on MAC address"""
         mac = uuid.getnode()
@@ -244,30 +1809,49 @@ class MakerScreenClient:
     async def connect(self):
         """Connect to the WebSocket server"""
         logger.info(f'Connecting to {self.server_url}...')
-        self.display_manager.show_message(f"Connecting to\n{self.server_url}")
+        self.show_connection_message(f"Connecting to\n{self.server_url}")
         
         try:
+            # Imported here so the display thread can start while it loads
+            import websockets
+            
+            self.codec = JsonCodec
             self.websocket = await websockets.connect(
                 self.server_url,
                 ping_interval=20,
                 ping_timeout=30,
-                close_timeout=10
+                close_timeout=10,
+                compression='deflate' if self.config.get('wireCompression', True) else None
             )
             await self.register()
             self.connected = True
+            live_state.publish(connected=True, connectedAt=time.time(), connectionError=None)
             logger.info('Connected successfully!')
-            self.display_manager.show_message("Connected!\nWaiting for content...")
+            self.show_connection_message("Connected!\nWaiting for content...")
             return True
         except Exception as e:
             logger.error(f'Connection failed: {e}')
             self.connected = False
-            self.display_manager.show_message(f"Connection failed\n{str(e)[:50]}")
+            live_state.publish(connected=False, connectionError=str(e))
+            self.show_connection_message(f"Connection failed\n{str(e)[:50]}")
             return False
     
+    def show_connection_message(self, message):
+        """Show connection progress unless cached content is playing"""
+        if self.first_frame is None and not self.scheduler.running:
+            self.display_manager.show_message(message)
+    
+    def memory_mb(self):
+        """Physical memory in MiB, read once"""
+        if self._memory_mb is None:
+            try:
+                self._memory_mb = os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES') // (1024 * 1024)
+            except (ValueError, OSError):
+                self._memory_mb = 0
+        return self._memory_mb
+    
     async def register(self):
         """Register this client with the server"""
-        import psutil
-        
         registration = {
             'type': 'REGISTER',
             'clientId': self.client_id,
@@ -279,44 +1863,144 @@ class MakerScreenClient:
                 'platformVersion': platform.release(),
                 'machine': platform.machine(),
                 'cpuCount': os.cpu_count(),
-                'memoryMb': psutil.virtual_memory().total // (1024 * 1024) if 'psutil' in sys.modules else 0
+                'memoryMb': self.memory_mb(),
+                'capabilities': {
+                    'binaryTransfer': {'chunkSize': TRANSFER_CHUNK_SIZE},
+                    'codecs': self.wire_codecs,
+                    'compression': negotiated_extensions(self.websocket)
+                },
+                'pendingTransfers': self.transfers.pending(),
+                'inventory': self.content_cache.inventory()
             },
             'timestamp': datetime.utcnow().isoformat()
         }
+        if self.resume_token:
+            # Ask the server to replay what was sent while we were away
+            registration['data']['resume'] = {'token': self.resume_token, 'lastSeq': self.last_seq}
         
+        # Always JSON: the server picks a codec for the rest of the session
         await self.websocket.send(json.dumps(registration))
         response = await self.websocket.recv()
-        response_data = json.loads(response)
+        response_data = normalize_envelope(json.loads(response))
         logger.info(f'Registration response: {response_data}')
+        
+        reply = response_data.get('data') or {}
+        if not reply.get('resumed'):
+            # A new session: its sequence numbers start again
+            self.last_seq = self.acked_seq = 0
+        self.resume_token = reply.get('resumeToken')
+        
+        codec_name = reply.get('codec')
+        if codec_name in self.wire_codecs:
+            self.codec = get_codec(codec_name)
+        logger.info(f'Wire codec: {self.codec.name}, extensions: {negotiated_extensions(self.websocket)}')
+    
+    async def send_message(self, message, priority=None, key=None):
+        """Queue a message for the outbound writer"""
+        await self.outbound.put(message, priority, key)
+    
+    async def outbound_writer(self):
+        """The only task that writes to the WebSocket, most urgent first"""
+        while self.running and self.connected:
+            message = await self.outbound.get()
+            if message.get('type') == 'TIME_SYNC':
+                # Stamp at send time so queueing does not count as network delay
+                message['data']['t0'] = self.clock_sync.local_time() * 1000
+            try:
+                await self.websocket.send(self.codec.encode(message))
+            except Exception as e:
+                logger.error(f'Error sending {message.get("type")}: {e}')
+                break
     
     async def send_heartbeat(self):
         """Send periodic heartbeat to server"""
+        base_interval = self.config.get('heartbeatInterval', HEARTBEAT_INTERVAL)
+        max_interval = self.config.get('heartbeatMaxInterval', HEARTBEAT_MAX_INTERVAL)
         while self.running and self.connected:
             try:
+                # A heartbeat still queued means the link is not keeping up
+                backlog = bool(self.outbound.queues[PRIORITY_TELEMETRY])
+                interval = adaptive_interval(
+                    base_interval, self.clock_sync.status().get('rttMs'), backlog, max_interval
+                )
+                metrics = self.metrics.encode()
                 heartbeat = {
                     'type': 'HEARTBEAT',
                     'clientId': self.client_id,
                     'data': {
                         'status': 'online',
-                        'uptime': int(datetime.utcnow().timestamp())
+                        'uptime': int(time.monotonic() - timeline.started_at),
+                        'interval': interval,
+                        'metrics': metrics,
+                        'ackSeq': self.last_seq
                     },
                     'timestamp': datetime.utcnow().isoformat()
                 }
-                await self.websocket.send(json.dumps(heartbeat))
-                logger.debug('Heartbeat sent')
-                await asyncio.sleep(30)  # Send heartbeat every 30 seconds
+                await self.send_message(heartbeat)
+                logger.debug(f"Heartbeat sent ({len(metrics['values'])} metrics changed)")
+                await asyncio.sleep(interval)
             except Exception as e:
                 logger.error(f'Heartbeat error: {e}')
                 break
     
+    async def handle_heartbeat_ack(self, message):
+        """The server has applied a metrics snapshot, or lost track of ours"""
+        data = message.get('data', {})
+        if data.get('resync'):
+            self.metrics.reset()
+        elif data.get('metricsId') is not None:
+            self.metrics.acknowledge(data['metricsId'])
+    
+    async def sync_clock(self):
+        """Send bursts of TIME_SYNC requests to track the server clock"""
+        while self.running and self.connected:
+            try:
+                for _ in range(CLOCK_SYNC_SAMPLES):
+                    message = {
+                        'type': 'TIME_SYNC',
+                        'clientId': self.client_id,
+                        'data': {'t0': self.clock_sync.local_time() * 1000}
+                    }
+                    await self.send_message(message)
+                    await asyncio.sleep(CLOCK_SYNC_SPACING)
+                await asyncio.sleep(CLOCK_SYNC_INTERVAL)
+            except Exception as e:
+                logger.error(f'Clock sync error: {e}')
+                break
+    
+    async def handle_time_sync(self, message):
+        """Fold a TIME_SYNC reply into the clock offset estimate"""
+        t3 = self.clock_sync.local_time()
+        try:
+            data = message.get('data', {})
+            change = self.clock_sync.add_sample(
+                data['t0'] / 1000, data['t1'] / 1000, data['t2'] / 1000, t3
+            )
+            if abs(change) >= CLOCK_SYNC_RETIME:
+                # Timeline deadlines are server times mapped to monotonic
+                self.scheduler.shift(-change)
+                if self.schedule:
+                    self._arm_schedule_timer(self.clock_sync.server_time())
+        except (KeyError, TypeError) as e:
+            logger.error(f'Invalid TIME_SYNC reply: {e}')
+    
     async def receive_messages(self):
         """Receive and process messages from server"""
+        from websockets.exceptions import ConnectionClosed
+        
         while self.running and self.connected:
             try:
                 message = await self.websocket.recv()
-                data = json.loads(message)
-                await self.handle_message(data)
-            except websockets.exceptions.ConnectionClosed:
+                self.last_received_at = (time.monotonic(), self.clock_sync.local_time())
+                if isinstance(message, bytes):
+                    if not self.codec.binary or self.transfers.owns(message):
+                        await self.handle_binary_frame(message)
+                        continue
+                    data = await self.ingest.parse(message, self.codec.decode)
+                else:
+                    data = await self.ingest.parse(message)
+                await self.handle_message(normalize_envelope(data))
+            except ConnectionClosed:
                 logger.warning('Connection closed by server')
                 self.connected = False
                 break
@@ -329,14 +2013,30 @@ class MakerScreenClient:
         msg_type = message.get('type')
         logger.info(f'Received message: {msg_type}')
         
+        seq = message.get('seq')
+        if seq is not None:
+            if seq <= self.last_seq:
+                logger.debug(f'Skipping replayed message {seq}')
+                return
+            if seq > self.last_seq + 1:
+                logger.warning(f'Missed server messages {self.last_seq + 1}-{seq - 1}')
+            self.last_seq = seq
+            if seq - self.acked_seq >= SEQ_ACK_EVERY:
+                await self.send_ack()
+        
         handlers = {
             'CONTENT_UPDATE': self.handle_content_update,
+            'CONTENT_TRANSFER_START': self.handle_transfer_start,
+            'CONTENT_TRANSFER_CANCEL': self.handle_transfer_cancel,
+            'SYNC_MANIFEST': self.handle_sync_manifest,
             'COMMAND': self.handle_command,
             'REGISTER': lambda m: logger.info('Registration confirmed'),
             'PLAYLIST_UPDATE': self.handle_playlist_update,
             'OVERLAY_UPDATE': self.handle_overlay_update,
             'EMERGENCY_BROADCAST': self.handle_emergency_broadcast,
-            'EMERGENCY_CLEAR': self.handle_emergency_clear
+            'EMERGENCY_CLEAR': self.handle_emergency_clear,
+            'TIME_SYNC': self.handle_time_sync,
+            'HEARTBEAT_ACK': self.handle_heartbeat_ack
         }
         
         handler = handlers.get(msg_type)
@@ -345,6 +2045,14 @@ class MakerScreenClient:
         else:
             logger.warning(f'Unknown message type: {msg_type}')
     
+    async def send_ack(self):
+        """Tell the server which messages it no longer needs to keep for replay"""
+        self.acked_seq = self.last_seq
+        await self.send_message(
+            {'type': 'ACK', 'clientId': self.client_id, 'data': {'seq': self.last_seq}},
+            PRIORITY_CONTROL
+        )
+    
     async def handle_content_update(self, message):
         """Handle content update from server"""
         try:
@@ -353,58 +2061,230 @@ class MakerScreenClient:
             content_name = data.get('name')
             content_type = data.get('type')
             mime_type = data.get('mimeType')
+            content_hash = data.get('sha256')
             content_data = data.get('data')
             
             logger.info(f'Receiving content: {content_name} ({content_type})')
             
-            # Decode base64 content
-            if content_data:
-                decoded_data = base64.b64decode(content_data)
-                
-                # Save to cache
-                file_path = self.content_cache.save_content(content_id, decoded_data, mime_type)
-                
-                if file_path:
-                    logger.info(f'Content saved to {file_path}')
+            async def ingest():
+                # Decode base64 content and save to cache in the ingest pool
+                if content_data:
+                    file_path = await self.ingest.store_base64(
+                        content_id, content_data, mime_type, expected_hash=content_hash
+                    )
                     
-                    # Display the content
-                    self.display_manager.show_content({
-                        'type': content_type,
-                        'path': file_path,
-                        'data': content_data
-                    })
+                    if file_path:
+                        logger.info(f'Content saved to {file_path}')
+                        await self._content_cached(content_id)
+                        
+                        # Display the screen-sized rendition
+                        self.display_manager.show_content({
+                            'type': self.display_type(content_id),
+                            'path': await self.renditions.ensure(file_path)
+                        })
+                
+                # Send acknowledgment
+                await self.send_status('content_received', {'contentId': content_id})
             
-            # Send acknowledgment
-            await self.send_status('content_received', {'contentId': content_id})
+            if not self.ingest.submit(ingest, content_id):
+                # The payload is dropped; the ingest pipeline asks for it again once it has room
+                logger.warning(f'Ingest queue full, deferring content {content_id}')
             
         except Exception as e:
             logger.error(f'Error handling content update: {e}')
     
+    async def handle_transfer_start(self, message):
+        """Handle the announcement of a binary, chunked content transfer"""
+        try:
+            data = message.get('data', {})
+            transfer = await self.ingest.run('store', self.transfers.start, data)
+            logger.info(
+                f"Receiving content: {data.get('name')} ({data.get('size')} bytes, "
+                f"resuming at {transfer.received})"
+            )
+            # Tells the server where to start (0 for a new transfer)
+            await self.send_transfer_ack(transfer)
+            if transfer.complete:
+                await self._complete_transfer(transfer)
+        except Exception as e:
+            logger.error(f'Error starting content transfer: {e}')
+            await self.send_transfer_ack(None, transfer_id=message.get('data', {}).get('transferId'),
+                                         error=str(e))
+    
+    async def handle_binary_frame(self, frame):
+        """Handle one chunk of a content transfer"""
+        try:
+            transfer, ack_due = await self.ingest.run('store', self.transfers.write_frame, frame)
+            if transfer.complete:
+                await self._complete_transfer(transfer)
+            elif ack_due:
+                await self.send_transfer_ack(transfer)
+        except Exception as e:
+            logger.error(f'Error writing content chunk: {e}')
+    
+    async def _complete_transfer(self, transfer):
+        file_path = await self.ingest.run('store', self.transfers.finish, transfer)
+        content_id = transfer.metadata.get('contentId')
+        if not file_path:
+            await self.send_transfer_ack(transfer, error='verification failed')
+            return
+        
+        logger.info(f'Content saved to {file_path}')
+        await self.send_transfer_ack(transfer)
+        await self._content_cached(content_id)
+        self.display_manager.show_content({
+            'type': transfer.metadata.get('type'),
+            'path': await self.renditions.ensure(file_path)
+        })
+        await self.send_status('content_received', {'contentId': content_id})
+    
+    async def handle_transfer_cancel(self, message):
+        """Handle the server abandoning a chunked transfer"""
+        try:
+            transfer_id = message.get('data', {}).get('transferId')
+            self.transfers.cancel(transfer_id)
+            logger.info(f'Content transfer {transfer_id} cancelled')
+        except Exception as e:
+            logger.error(f'Error cancelling content transfer: {e}')
+    
+    async def send_transfer_ack(self, transfer, transfer_id=None, error=None):
+        """Acknowledge the offset up to which a transfer is safely on disk"""
+        try:
+            data = {'transferId': transfer.transfer_id if transfer else transfer_id}
+            if transfer:
+                data['offset'] = transfer.acked
+                data['complete'] = transfer.complete and error is None
+            if error:
+                data['error'] = error
+            message = {
+                'type': 'CONTENT_TRANSFER_ACK',
+                'clientId': self.client_id,
+                'data': data,
+                'timestamp': datetime.utcnow().isoformat()
+            }
+            await self.send_message(message)
+        except Exception as e:
+            logger.error(f"Error sending transfer acknowledgment: {e}")
+    
     async def handle_playlist_update(self, message):
         """Handle playlist update from server"""
         try:
             data = message.get('data', {})
-            self.current_playlist = data.get('playlist', {})
-            self.playlist_index = 0
+            playlist = data.get('playlist', {})
+            schedule = data.get('schedule') or None
+            unchanged = (playlist == self.current_playlist and schedule == self.schedule_data
+                         and self.scheduler.items)
+            self.playlist_source = 'server'
             
-            logger.info(f"Playlist updated: {len(self.current_playlist.get('items', []))} items")
+            if unchanged:
+                # Typically the reply to a reconnect while the cached copy plays on
+                logger.info('Playlist unchanged, playback continues')
+            else:
+                self.apply_playlist(playlist, schedule)
+                self.content_cache.manifest.put_state('playlist', {'playlist': playlist, 'schedule': schedule})
+                logger.info(f"Playlist updated: {len(playlist.get('items', []))} items")
+                # Replace whatever is playing
+                self.play_playlist()
             
-            # Start playlist playback
-            asyncio.create_task(self.play_playlist())
+            await self.prefetch_upcoming()
             
         except Exception as e:
             logger.error(f"Error handling playlist update: {e}")
     
+    def apply_playlist(self, playlist, schedule):
+        """Make ``playlist`` (and ``schedule``, if any) current and pin their content"""
+        self.current_playlist = playlist
+        self.schedule_data = schedule
+        
+        # Dayparted campaigns, decided locally from the compiled index
+        self.schedule = None
+        if schedule:
+            self.schedule = ScheduleIndex(schedule, self.clock_sync.server_time())
+            self.content_cache.pin('active', self.schedule.content_ids())
+        else:
+            self.content_cache.pin('active', [
+                item.get('contentId') for item in playlist.get('items', [])
+            ])
+    
+    def restore_state(self):
+        """Resume the last playlist and overlays from the cache, before connecting"""
+        try:
+            saved = self.content_cache.manifest.get_state('playlist')
+            if saved:
+                self.apply_playlist(saved.get('playlist') or {}, saved.get('schedule'))
+                self.playlist_source = 'cache'
+                logger.info(f"Restored cached playlist: {len(self.current_playlist.get('items', []))} items"
+                            f"{', with schedule' if self.schedule else ''}")
+                self.play_playlist()
+            
+            self.overlays = self.content_cache.manifest.get_state('overlays') or {}
+            for overlay in self.overlays.values():
+                self.display_manager.show_overlay(overlay)
+        except Exception as e:
+            logger.error(f"Error restoring cached playlist: {e}")
+    
+    async def handle_sync_manifest(self, message):
+        """Handle the server's list of content this client should hold"""
+        try:
+            items = message.get('data', {}).get('items', [])
+            await self.sync_content({
+                item.get('contentId'): item.get('sha256')
+                for item in items if item.get('contentId')
+            })
+        except Exception as e:
+            logger.error(f"Error handling sync manifest: {e}")
+    
+    async def sync_content(self, expected):
+        """Request only the content that is missing or stale in the cache"""
+        missing = self.content_cache.missing_content(expected)
+        if not missing:
+            logger.info(f'Content in sync ({len(expected)} items cached)')
+            return
+        
+        logger.info(f'Requesting {len(missing)} of {len(expected)} items from server')
+        await self.request_content(missing)
+    
+    async def request_content(self, content_ids):
+        """Ask the server to send the given content"""
+        try:
+            message = {
+                'type': 'CONTENT_REQUEST',
+                'clientId': self.client_id,
+                'data': {'contentIds': list(content_ids)},
+                'timestamp': datetime.utcnow().isoformat()
+            }
+            await self.send_message(message)
+        except Exception as e:
+            logger.error(f"Error requesting content: {e}")
+    
+    async def _content_cached(self, content_id):
+        """Let the prefetcher move on once requested content has arrived"""
+        self.prefetcher.content_arrived(content_id)
+        await self.prefetch_upcoming()
+    
+    async def prefetch_upcoming(self):
+        """Queue downloads for the items due next, across daypart changes"""
+        if self.schedule:
+            upcoming = self.schedule.upcoming(
+                self.clock_sync.server_time(), self.prefetcher.max_items, self.prefetcher.max_seconds
+            )
+            await self.prefetcher.update(upcoming, 0)
+        elif self.scheduler.items:
+            await self.prefetcher.update(self.scheduler.items, self.scheduler.index)
+    
     async def handle_overlay_update(self, message):
         """Handle overlay update from server"""
         try:
             data = message.get('data', {})
             self.display_manager.show_overlay(data)
+            self.overlays[str(data.get('id'))] = data
+            self.content_cache.manifest.put_state('overlays', self.overlays)
         except Exception as e:
             logger.error(f"Error handling overlay update: {e}")
     
     async def handle_emergency_broadcast(self, message):
         """Handle emergency broadcast from server - highest priority"""
+        received_at, received_local = self.last_received_at or (time.monotonic(), self.clock_sync.local_time())
         try:
             data = message.get('data', {})
             broadcast_id = data.get('id')
@@ -427,18 +2307,71 @@ class MakerScreenClient:
             }
             
             # Display emergency message (interrupts all content)
+            self.scheduler.stop()
+            loop = asyncio.get_running_loop()
+            timing = {
+                'broadcastId': broadcast_id,
+                'receivedAt': received_at,
+                'serverLatency': self._server_latency(message, received_local)
+            }
+            
+            def displayed(painted):
+                # Called on the display thread once the first frame is painted
+                loop.call_soon_threadsafe(self._emergency_displayed, timing, painted)
+            
+            timing['emittedAt'] = time.monotonic()
             self.display_manager.show_emergency({
                 'title': title,
                 'message': msg,
-                'style': style
+                'type': emergency_type,
+                'style': style,
+                'onDisplayed': displayed
             })
             
+            duration = (style or {}).get('displayDuration') or 0
+            if duration > 0:
+                loop.call_later(duration, lambda: asyncio.create_task(
+                    self.handle_emergency_clear({'data': {'broadcastId': broadcast_id}})
+                ))
+            
             # Send acknowledgment
             await self.send_status('emergency_received', {'broadcastId': broadcast_id})
             
         except Exception as e:
             logger.error(f"Error handling emergency broadcast: {e}")
     
+    def _server_latency(self, message, received_local):
+        """Seconds from the server stamping a message to its receipt, if the clocks are synced"""
+        sent = parse_server_time(message.get('timestamp'))
+        if sent is None or not self.clock_sync.synced:
+            return None
+        return received_local + self.clock_sync.offset - sent
+    
+    def _emergency_displayed(self, timing, painted):
+        """Record how long an emergency took from receipt to pixels and report it"""
+        received = timing['receivedAt']
+        latency = {
+            'receiveToEmitMs': round((timing['emittedAt'] - received) * 1000, 1),
+            'emitToDisplayThreadMs': round((painted['deliveredAt'] - timing['emittedAt']) * 1000, 1),
+            'renderMs': round((painted['paintedAt'] - painted['deliveredAt']) * 1000, 1),
+            'receiveToScreenMs': round((painted['paintedAt'] - received) * 1000, 1)
+        }
+        if timing['serverLatency'] is not None:
+            latency['serverToReceiveMs'] = round(timing['serverLatency'] * 1000, 1)
+            latency['serverToScreenMs'] = round(latency['serverToReceiveMs'] + latency['receiveToScreenMs'], 1)
+        
+        self.emergency_log.append({
+            'broadcastId': timing['broadcastId'],
+            'displayedAt': datetime.utcnow().isoformat(),
+            **latency
+        })
+        logger.warning(f"Emergency {timing['broadcastId']} on screen "
+                       f"{latency['receiveToScreenMs']} ms after receipt")
+        asyncio.create_task(self.send_status('emergency_displayed', {
+            'broadcastId': timing['broadcastId'],
+            'latency': latency
+        }))
+    
     async def handle_emergency_clear(self, message):
         """Handle emergency clear from server"""
         try:
@@ -457,9 +2390,9 @@ class MakerScreenClient:
             # Clear emergency display
             self.display_manager.clear_emergency()
             
-            # Resume normal content
-            if self.current_playlist:
-                asyncio.create_task(self.play_playlist())
+            # Resume normal content where the schedule has got to
+            if not self.active_emergency:
+                self.scheduler.resume()
             
         except Exception as e:
             logger.error(f"Error handling emergency clear: {e}")
@@ -529,27 +2462,151 @@ class MakerScreenClient:
         logger.info('Screenshot requested')
         # Capture and send screenshot
     
-    async def play_playlist(self):
-        """Play through the current playlist"""
-        if not self.current_playlist:
+    def play_playlist(self):
+        """Join the current playlist's timeline at the item due now
+
+        The timeline starts at the playlist's ``startEpoch`` (server Unix
+        time, default 0), so every screen with the same playlist and a
+        synchronized clock shows the same item at the same moment. With a
+        schedule, the campaign due now plays from its daypart start and
+        playback is re-evaluated at the next daypart change.
+        """
+        if self._schedule_timer is not None:
+            self._schedule_timer.cancel()
+            self._schedule_timer = None
+        
+        if self.schedule:
+            now = self.clock_sync.server_time()
+            if now >= self.schedule.valid_until - 86400:
+                self.schedule.compile(now)
+            segment = self.schedule.segment_at(now)
+            if segment:
+                self.scheduler.replace(segment.items, start_at=self.clock_sync.to_monotonic(segment.anchor))
+            else:
+                self.scheduler.replace([])
+            self._arm_schedule_timer(now)
+        elif self.current_playlist:
+            start_at = self.clock_sync.to_monotonic(self.current_playlist.get('startEpoch', 0))
+            self.scheduler.replace(self.current_playlist.get('items', []), start_at=start_at)
+        else:
             return
         
-        items = self.current_playlist.get('items', [])
-        while self.running and items:
-            item = items[self.playlist_index]
-            content_id = item.get('contentId')
-            duration = item.get('duration', 10)
-            
-            # Get content from cache or request it
-            content_path = self.content_cache.get_content_path(content_id)
-            if content_path:
-                self.display_manager.show_content({
-                    'type': 'image',
-                    'path': content_path
-                })
-            
-            await asyncio.sleep(duration)
-            self.playlist_index = (self.playlist_index + 1) % len(items)
+        if self.active_emergency:
+            # Keep the timeline running, but leave the emergency on screen
+            self.scheduler.stop()
+    
+    def _arm_schedule_timer(self, now):
+        """Call play_playlist again at the next daypart change"""
+        if self._schedule_timer is not None:
+            self._schedule_timer.cancel()
+        change_at = self.clock_sync.to_monotonic(self.schedule.next_change(now))
+        self._schedule_timer = asyncio.get_running_loop().call_later(
+            max(change_at - time.monotonic(), 0), self.play_playlist
+        )
+    
+    async def play_item(self, items, index):
+        """Show one playlist item; called by the scheduler at its deadline"""
+        item = items[index]
+        content_path = self.resolve_display_path(item.get('contentId'))
+        if content_path:
+            content_type = self.display_type(item.get('contentId'))
+            self.display_manager.show_content({
+                'type': content_type,
+                'path': content_path,
+                'transition': item.get('transition'),
+                'transitionDuration': item.get('transitionDuration', 0)
+            })
+            if self.first_frame is None:
+                self._record_first_frame()
+            live_state.publish(currentItem={
+                'contentId': item.get('contentId'),
+                'index': index,
+                'count': len(items),
+                'type': content_type,
+                'duration': slot_duration(item),
+                'startedAt': time.time()
+            })
+        
+        # Decode (or preroll) the next item while this one is on screen
+        next_id = items[(index + 1) % len(items)].get('contentId')
+        next_path = self.resolve_display_path(next_id, record_access=False)
+        if next_path:
+            self.display_manager.preload_content({
+                'type': self.display_type(next_id),
+                'path': next_path
+            })
+        
+        await self.prefetcher.update(items, (index + 1) % len(items))
+    
+    def _record_first_frame(self):
+        """Note how long after process start the first item went on screen"""
+        self.first_frame = {
+            'timeToFirstFrameMs': timeline.mark('firstFrame'),
+            'source': self.playlist_source,
+            'connected': self.connected
+        }
+        logger.info(f"First frame after {self.first_frame['timeToFirstFrameMs']} ms "
+                    f"(playlist from {self.playlist_source})")
+    
+    def startup_report(self):
+        """The start-up timeline with time-to-first-frame"""
+        return {**timeline.report(), 'firstFrame': self.first_frame}
+    
+    def display_type(self, content_id):
+        """'video' or 'image', from the MIME type of cached content"""
+        mime_type = self.content_cache.get_mime_type(content_id) or ''
+        return 'video' if mime_type.startswith('video/') else 'image'
+    
+    def resolve_display_path(self, content_id, record_access=True):
+        """Path to show for cached content, preferring its rendition"""
+        content_path = self.content_cache.get_content_path(content_id, record_access=record_access)
+        if not content_path:
+            return None
+        rendition = self.renditions.lookup(content_path)
+        if rendition:
+            return rendition
+        if self.renditions.supports(content_path):
+            # Cached before renditions existed; build it for the next loop
+            asyncio.create_task(self.renditions.ensure(content_path))
+        return content_path
+    
+    async def serve_live_state(self):
+        """Expose live state on a Unix socket for a web UI running as its own process"""
+        if not os.path.isdir(os.path.dirname(STATE_SOCKET)):
+            return
+        try:
+            self.state_server = await live_state.serve(STATE_SOCKET)
+        except OSError as e:
+            logger.warning(f'Could not serve live state on {STATE_SOCKET}: {e}')
+    
+    async def start_playback(self):
+        """Once the display is up, resume cached playback and start the web UI"""
+        await asyncio.to_thread(self.display_manager.ready.wait, DISPLAY_READY_TIMEOUT)
+        if not self.display_manager.ready.is_set():
+            logger.warning('Display engine is slow to start; playing without it')
+        if self.display_manager.screen_size and not self.config.get('renditionSize'):
+            self.renditions.resize(self.display_manager.screen_size)
+        
+        # Play the last known playlist from the cache; the server reconciles later
+        with timeline.phase('restore'):
+            self.restore_state()
+        
+        # Not needed for the first frame, so it does not compete with the display for the CPU
+        run_web_ui(self)
+    
+    async def cache_maintenance(self):
+        """Periodically garbage-collect the content cache off the event loop"""
+        while self.running:
+            await asyncio.sleep(CACHE_GC_INTERVAL)
+            try:
+                removed = await asyncio.to_thread(self.content_cache.collect_garbage)
+                removed += await asyncio.to_thread(
+                    self.renditions.collect_garbage, self.content_cache.manifest.filenames()
+                )
+                if removed:
+                    logger.info(f'Cache maintenance removed {removed} item(s)')
+            except Exception as e:
+                logger.error(f'Cache maintenance error: {e}')
     
     async def send_status(self, status, data=None):
         """Send status update to server"""
@@ -563,7 +2620,7 @@ class MakerScreenClient:
                 },
                 'timestamp': datetime.utcnow().isoformat()
             }
-            await self.websocket.send(json.dumps(message))
+            await self.send_message(message)
         except Exception as e:
             logger.error(f"Error sending status: {e}")
     
@@ -579,51 +2636,86 @@ class MakerScreenClient:
         logger.info(f'Version: {VERSION}')
         logger.info('===========================================')
         
-        # Start display
+        # The display comes up on its own thread while we connect
         self.display_manager.start()
+        live_state.attach(asyncio.get_running_loop())
+        await self.serve_live_state()
+        display_ready = asyncio.create_task(self.start_playback())
+        
+        # Keep the content cache within budget in the background
+        self.maintenance_task = asyncio.create_task(self.cache_maintenance())
         
-        reconnect_delay = 5
-        max_reconnect_delay = 60
+        base_delay = self.config.get('reconnectInterval', RECONNECT_BASE_DELAY)
+        max_delay = self.config.get('reconnectMaxInterval', RECONNECT_MAX_DELAY)
+        attempt = 0
         
         while self.running:
+            started = time.monotonic()
             if await self.connect():
-                reconnect_delay = 5  # Reset delay on successful connection
+                if not self.connected_once:
+                    # The handshake and REGISTER of the first successful attempt
+                    timeline.record('connect', started, time.monotonic())
+                    self.connected_once = True
+                attempt = 0  # Reset backoff on successful connection
+                # Server messages may change the screen, so it must exist first
+                await display_ready
+                writer = asyncio.create_task(self.outbound_writer())
+                # Heartbeat and clock sync run alongside the receiver; a lost
+                # connection ends the receiver, which stops them at once rather
+                # than after their next sleep
+                periodic = [
+                    asyncio.create_task(self.send_heartbeat()),
+                    asyncio.create_task(self.sync_clock())
+                ]
                 try:
-                    # Run heartbeat and message receiver concurrently
-                    await asyncio.gather(
-                        self.send_heartbeat(),
-                        self.receive_messages()
-                    )
+                    await self.receive_messages()
                 except Exception as e:
                     logger.error(f'Error during operation: {e}')
+                finally:
+                    writer.cancel()
+                    for task in periodic:
+                        task.cancel()
             
+            if self.connected_once:
+                live_state.publish(connected=False, disconnectedAt=time.time())
             self.connected = False
+            # Acks and telemetry belong to the lost session; emergency acks are kept
+            self.outbound.discard(PRIORITY_CONTROL, PRIORITY_TELEMETRY)
+            self.transfers.suspend()
             
             # Reconnect with exponential backoff
             if self.running:
-                logger.info(f'Connection lost, reconnecting in {reconnect_delay} seconds...')
-                self.display_manager.show_message(f"Reconnecting in\n{reconnect_delay} seconds...")
-                await asyncio.sleep(reconnect_delay)
-                reconnect_delay = min(reconnect_delay * 2, max_reconnect_delay)
+                delay = reconnect_delay(attempt, base_delay, max_delay)
+                attempt += 1
+                logger.info(f'Connection lost, reconnecting in {delay:.1f} seconds...')
+                self.show_connection_message(f"Reconnecting in\n{delay:.0f} seconds...")
+                await asyncio.sleep(delay)
     
     def stop(self):
         """Stop the client"""
         logger.info('Stopping client...')
         self.running = False
+        self.scheduler.stop()
+        self.renditions.shutdown()
 
 
 def run_web_ui(client):
-    """Run the web UI in a separate thread"""
-    try:
-        from web_ui import run_webui
-        threading.Thread(target=run_webui, args=(5001,), daemon=True).start()
-        logger.info("Web UI started on port 5001")
-    except Exception as e:
-        logger.warning(f"Could not start web UI: {e}")
+    """Import and run the web UI on its own thread"""
+    def serve():
+        try:
+            with timeline.phase('webui'):
+                from web_ui import run_webui
+            logger.info(f"Web UI started on port {WEB_UI_PORT}")
+            run_webui(WEB_UI_PORT)
+        except Exception as e:
+            logger.warning(f"Could not start web UI: {e}")
+    
+    threading.Thread(target=serve, name='webui', daemon=True).start()
 
 
 def main():
-    client = MakerScreenClient()
+    with timeline.phase('init'):
+        client = MakerScreenClient()
     
     # Setup signal handlers
     def signal_handler(sig, frame):
@@ -634,9 +2726,6 @@ def main():
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
     
-    # Start web UI
-    run_web_ui(client)
-    
     # Run main client loop
     try:
         asyncio.run(client.run())
@@ -6,24 +6,165 @@ Displays content on the screen with support for images, videos, and overlays
 
 import sys
 import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QLabel, QWidget, 
-    QVBoxLayout, QStackedWidget, QGraphicsOpacityEffect
+    QVBoxLayout, QStackedWidget
 )
-from PyQt5.QtCore import Qt, QTimer, QPropertyAnimation, pyqtSignal, QObject
-from PyQt5.QtGui import QPixmap, QFont, QColor, QPalette, QImage
+from PyQt5.QtCore import Qt, QTimer, QSize, pyqtSignal, QObject
+from PyQt5.QtGui import QPixmap, QFont, QColor, QPalette, QImage, QPainter
 from PIL import Image
 import io
 import logging
+from video_player import VideoEngine
 
 logger = logging.getLogger('DisplayEngine')
 
+DEFAULT_IMAGE_CACHE_BYTES = 64 * 1024 * 1024
+DEFAULT_TRANSITION_FPS = 30
+EMERGENCY_FLASH_MS = 500
+PRELOAD_WAIT_MS = 20  # Longest the GUI thread waits for a preload still decoding
+EMERGENCY_SURFACE_LIMIT = 8  # Emergency surfaces kept, including the prebuilt ones
+
+# EmergencyType values with the server's default EmergencyStyle
+EMERGENCY_TYPES = ['Info', 'Alert', 'Warning', 'Emergency', 'Evacuation']
+DEFAULT_EMERGENCY_STYLE = {
+    'backgroundColor': '#FF0000',
+    'textColor': '#FFFFFF',
+    'fontFamily': 'Arial',
+    'fontSize': 48
+}
+
+# Playlist TransitionType values, by name or enum ordinal
+TRANSITIONS = ['none', 'fade', 'slideleft', 'slideright', 'slideup', 'slidedown', 'zoom']
+
 
 class SignalBridge(QObject):
     """Bridge for thread-safe signals"""
     content_update = pyqtSignal(dict)
     overlay_update = pyqtSignal(dict)
     show_message = pyqtSignal(str)
+    preload_content = pyqtSignal(dict)
+    emergency_broadcast = pyqtSignal(object)
+    emergency_clear = pyqtSignal()
+
+
+class ImageCache:
+    """Decoded, display-scaled images kept within a memory budget
+
+    Entries are keyed by file path and target size and evicted least
+    recently used first. ``preload`` decodes and scales an image on a worker
+    thread ahead of its slot, so showing it only costs a pixmap upload.
+    Only QImage is used off the GUI thread; QPixmap is created on show.
+    Lookups that find a preload still decoding are counted as ``pending``,
+    neither hit nor miss.
+    """
+    
+    def __init__(self, max_bytes=DEFAULT_IMAGE_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._images = OrderedDict()
+        self._pending = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='decode')
+        self.hits = 0
+        self.pending = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    @staticmethod
+    def _decode(path, size):
+        """Decode and letterbox ``path`` into a black frame of ``size``"""
+        image = QImage(path)
+        if image.isNull() or not size:
+            return image
+        scaled = image.scaled(QSize(*size), Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        frame = QImage(QSize(*size), QImage.Format_RGB32)
+        frame.fill(Qt.black)
+        painter = QPainter(frame)
+        painter.drawImage((size[0] - scaled.width()) // 2, (size[1] - scaled.height()) // 2, scaled)
+        painter.end()
+        return frame
+    
+    def _store(self, key, image):
+        cost = image.sizeInBytes()
+        if image.isNull() or cost > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._images:
+                return
+            self._images[key] = image
+            self._bytes += cost
+            while self._bytes > self.max_bytes:
+                _, evicted = self._images.popitem(last=False)
+                self._bytes -= evicted.sizeInBytes()
+                self.evictions += 1
+    
+    def preload(self, path, size=None):
+        """Start decoding ``path`` on the worker thread if not cached"""
+        key = (path, size)
+        with self._lock:
+            if key in self._images or key in self._pending:
+                return
+            future = self._executor.submit(self._decode, path, size)
+            self._pending[key] = future
+        future.add_done_callback(lambda done: self._preloaded(key, done))
+    
+    def _preloaded(self, key, future):
+        with self._lock:
+            self._pending.pop(key, None)
+        if future.exception() is None:
+            self._store(key, future.result())
+    
+    def get(self, path, size=None, on_ready=None):
+        """Return the decoded image
+
+        A preload in progress is waited on for at most ``PRELOAD_WAIT_MS``.
+        If it is still decoding after that, None is returned and
+        ``on_ready`` is called with the image from the worker thread.
+        """
+        key = (path, size)
+        with self._lock:
+            image = self._images.get(key)
+            if image is not None:
+                self._images.move_to_end(key)
+                self.hits += 1
+                return image
+            future = self._pending.get(key)
+            if future is not None:
+                self.pending += 1
+            else:
+                self.misses += 1
+        if future is not None:
+            try:
+                return future.result(timeout=PRELOAD_WAIT_MS / 1000)
+            except FutureTimeout:
+                if on_ready:
+                    def decoded(done):
+                        if done.exception() is None:
+                            on_ready(done.result())
+                    future.add_done_callback(decoded)
+                return None
+        image = self._decode(path, size)
+        self._store(key, image)
+        return image
+    
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.pending + self.misses
+            return {
+                'hits': self.hits,
+                'pending': self.pending,
+                'misses': self.misses,
+                'hitRate': round(self.hits / lookups, 3) if lookups else 0.0,
+                'evictions': self.evictions,
+                'entries': len(self._images),
+                'bytes': self._bytes,
+                'maxBytes': self.max_bytes
+            }
 
 
 class OverlayWidget(QLabel):
@@ -62,23 +203,290 @@ class OverlayWidget(QLabel):
         self.setText(content)
 
 
+class EmergencyOverlay(QWidget):
+    """Full-screen emergency broadcast, drawn over everything else
+
+    The background and type heading of each emergency type are rendered to
+    a screen-sized pixmap at startup (and the fonts loaded with them), so
+    showing a broadcast only paints the title and message on top. It is a
+    native window so it also covers the mpv video surfaces.
+    """
+    
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.setAttribute(Qt.WA_NativeWindow)
+        self.setAttribute(Qt.WA_OpaquePaintEvent)
+        self.surfaces = OrderedDict()
+        self.current = None
+        self.inverted = False
+        self._on_painted = None
+        self.flash_timer = QTimer(self)
+        self.flash_timer.timeout.connect(self._flash)
+        self.hide()
+    
+    @staticmethod
+    def _style_key(emergency_type, style):
+        merged = {**DEFAULT_EMERGENCY_STYLE, **{k: v for k, v in (style or {}).items() if v}}
+        return (
+            str(emergency_type or 'Alert'),
+            merged['backgroundColor'],
+            merged['textColor'],
+            merged['fontFamily'],
+            int(merged['fontSize'])
+        )
+    
+    def prebuild(self, size):
+        """Render the surfaces of every emergency type in the default style"""
+        started = time.monotonic()
+        for emergency_type in EMERGENCY_TYPES:
+            self._surface(self._style_key(emergency_type, None), size)
+        logger.info(f"Prebuilt {len(EMERGENCY_TYPES)} emergency surfaces in "
+                    f"{(time.monotonic() - started) * 1000:.0f} ms")
+    
+    def _surface(self, key, size):
+        """Screen-sized background with the type heading, cached per style"""
+        if key in self.surfaces and self.surfaces[key].size() == size:
+            self.surfaces.move_to_end(key)
+            return self.surfaces[key]
+        
+        emergency_type, background, text_color, family, font_size = key
+        pixmap = QPixmap(size)
+        pixmap.fill(QColor(background))
+        painter = QPainter(pixmap)
+        painter.setPen(QColor(text_color))
+        painter.setFont(QFont(family, font_size, QFont.Bold))
+        band = pixmap.rect().adjusted(0, 0, 0, -pixmap.height() * 3 // 4)
+        painter.drawText(band, Qt.AlignCenter, f"\u26a0  {emergency_type.upper()}  \u26a0")
+        painter.drawLine(size.width() // 10, band.bottom(), size.width() * 9 // 10, band.bottom())
+        # Load the faces used for the title and message now rather than on show
+        painter.setFont(QFont(family, int(font_size * 1.25), QFont.Bold))
+        painter.fontMetrics().boundingRect('Title')
+        painter.setFont(QFont(family, font_size))
+        painter.fontMetrics().boundingRect('Message')
+        painter.end()
+        
+        self.surfaces[key] = pixmap
+        while len(self.surfaces) > EMERGENCY_SURFACE_LIMIT:
+            self.surfaces.popitem(last=False)
+        return pixmap
+    
+    def show_emergency(self, emergency, on_painted=None):
+        """Show a broadcast; ``on_painted`` gets the monotonic time its first frame was painted"""
+        style = emergency.get('style') or {}
+        key = self._style_key(emergency.get('type'), style)
+        self.current = {
+            'key': key,
+            'surface': self._surface(key, self.size()),
+            'title': emergency.get('title', ''),
+            'message': emergency.get('message', '')
+        }
+        self.inverted = False
+        self._on_painted = on_painted
+        if style.get('showFlashing', True):
+            self.flash_timer.start(EMERGENCY_FLASH_MS)
+        else:
+            self.flash_timer.stop()
+        self.show()
+        self.raise_()
+        self.repaint()
+    
+    def clear(self):
+        self.flash_timer.stop()
+        self.current = None
+        self._on_painted = None
+        self.hide()
+    
+    def _flash(self):
+        self.inverted = not self.inverted
+        self.update()
+    
+    def paintEvent(self, event):
+        if not self.current:
+            return
+        _, _, text_color, family, font_size = self.current['key']
+        painter = QPainter(self)
+        painter.drawPixmap(0, 0, self.current['surface'])
+        
+        painter.setPen(QColor(text_color))
+        body = self.rect().adjusted(self.width() // 12, self.height() // 4, -self.width() // 12, 0)
+        painter.setFont(QFont(family, int(font_size * 1.25), QFont.Bold))
+        title_height = painter.fontMetrics().height() * 2
+        painter.drawText(body.adjusted(0, 0, 0, -(body.height() - title_height)),
+                         Qt.AlignCenter | Qt.TextWordWrap, self.current['title'])
+        painter.setFont(QFont(family, font_size))
+        painter.drawText(body.adjusted(0, title_height, 0, 0),
+                         Qt.AlignHCenter | Qt.AlignTop | Qt.TextWordWrap, self.current['message'])
+        
+        if self.inverted:
+            painter.setCompositionMode(QPainter.RasterOp_SourceXorDestination)
+            painter.fillRect(self.rect(), QColor('#FFFFFF'))
+        painter.end()
+        
+        if self._on_painted:
+            # Taken once the frame is drawn, not when the repaint was asked for
+            on_painted, self._on_painted = self._on_painted, None
+            on_painted(time.monotonic())
+
+
+def transition_kind(value):
+    """Normalize a playlist transition (name or ordinal) to a TRANSITIONS name"""
+    if isinstance(value, int) and 0 <= value < len(TRANSITIONS):
+        return TRANSITIONS[value]
+    kind = str(value or 'none').lower()
+    return kind if kind in TRANSITIONS else 'none'
+
+
+class Transition:
+    """A timed blend between two pre-rendered, full-frame pixmaps"""
+    
+    def __init__(self, outgoing, incoming, kind, duration_ms):
+        self.outgoing = outgoing
+        self.incoming = incoming
+        self.kind = kind
+        self.duration = max(duration_ms, 1) / 1000
+        self.started = time.monotonic()
+    
+    def progress(self):
+        return min((time.monotonic() - self.started) / self.duration, 1.0)
+    
+    def paint(self, painter, width, height, progress):
+        if self.kind.startswith('slide'):
+            dx, dy = {
+                'slideleft': (-width, 0),
+                'slideright': (width, 0),
+                'slideup': (0, -height),
+                'slidedown': (0, height)
+            }[self.kind]
+            painter.drawPixmap(int(dx * progress), int(dy * progress), self.outgoing)
+            painter.drawPixmap(int(-dx * (1 - progress)), int(-dy * (1 - progress)), self.incoming)
+        else:
+            # Fade (and Zoom, which software rendering cannot afford) crossfade
+            painter.drawPixmap(0, 0, self.outgoing)
+            painter.setOpacity(progress)
+            painter.drawPixmap(0, 0, self.incoming)
+
+
 class ContentDisplay(QLabel):
-    """Widget for displaying main content (images/videos)"""
+    """Widget for displaying main content (images/videos)
+
+    Frames are double-buffered: the incoming image is decoded and
+    letterboxed off-screen (ahead of time when preloaded), then a timer
+    paints the transition between the two buffers at ``transition_fps``.
+    If the preload is still decoding, the previous frame stays up and the
+    new one is swapped in when it is ready.
+    Frame intervals during transitions are measured to check pacing.
+    """
     
-    def __init__(self):
+    image_ready = pyqtSignal(str, object)
+    
+    def __init__(self, image_cache=None, transition_fps=DEFAULT_TRANSITION_FPS):
         super().__init__()
+        self.image_cache = image_cache or ImageCache()
+        self.transition_fps = transition_fps
+        self.image_ready.connect(self._image_ready)
+        self._waiting = None  # (path, transition, duration_ms) of an image still decoding
+        self._frame = None
+        self._transition = None
+        self._last_paint = None
+        self._pacing = {'transitions': 0, 'frames': 0, 'late': 0, 'maxIntervalMs': 0.0, 'totalMs': 0.0}
+        self._transition_timer = QTimer(self)
+        self._transition_timer.setTimerType(Qt.PreciseTimer)
+        self._transition_timer.timeout.connect(self.update)
         self.setAlignment(Qt.AlignCenter)
         self.setScaledContents(True)
         self.setStyleSheet("background-color: black;")
     
-    def show_image(self, image_data):
-        """Display image from bytes"""
+    def _set_frame(self, pixmap, transition=None, duration_ms=0):
+        kind = transition_kind(transition)
+        self._finish_transition()
+        if kind == 'none' or duration_ms <= 0 or self._frame is None or self._frame.size() != pixmap.size():
+            self._frame = pixmap
+            self.setPixmap(pixmap)
+            return
+        self._transition = Transition(self._frame, pixmap, kind, duration_ms)
+        self._frame = pixmap
+        self._last_paint = None
+        self._pacing['transitions'] += 1
+        self._transition_timer.start(max(1, int(1000 / self.transition_fps)))
+    
+    def _finish_transition(self):
+        if self._transition is not None:
+            self._transition_timer.stop()
+            self._transition = None
+            self.setPixmap(self._frame)
+    
+    def paintEvent(self, event):
+        if self._transition is None:
+            return super().paintEvent(event)
+        
+        now = time.monotonic()
+        if self._last_paint is not None:
+            interval_ms = (now - self._last_paint) * 1000
+            self._pacing['frames'] += 1
+            self._pacing['totalMs'] += interval_ms
+            self._pacing['maxIntervalMs'] = max(self._pacing['maxIntervalMs'], interval_ms)
+            if interval_ms > 1500 / self.transition_fps:
+                self._pacing['late'] += 1
+        self._last_paint = now
+        
+        progress = self._transition.progress()
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), Qt.black)
+        self._transition.paint(painter, self.width(), self.height(), progress)
+        painter.end()
+        if progress >= 1.0:
+            self._finish_transition()
+    
+    def pacing_stats(self):
+        """Frame pacing measured during transitions"""
+        stats = dict(self._pacing)
+        frames = stats.pop('totalMs')
+        stats['avgFps'] = round(1000 * stats['frames'] / frames, 1) if frames else 0.0
+        stats['targetFps'] = self.transition_fps
+        stats['maxIntervalMs'] = round(stats['maxIntervalMs'], 1)
+        return stats
+    
+    def _target_size(self):
+        return (self.width(), self.height())
+    
+    def preload_image(self, path):
+        """Decode an upcoming image ahead of its slot"""
+        if path and os.path.exists(path):
+            self.image_cache.preload(path, self._target_size())
+    
+    def _image_ready(self, path, image):
+        """Swap in an image whose preload finished after its slot started"""
+        if self._waiting is None or self._waiting[0] != path:
+            return  # Something else has been shown since
+        _, transition, transition_ms = self._waiting
+        self._waiting = None
+        if not image.isNull():
+            self._set_frame(QPixmap.fromImage(image), transition, transition_ms)
+            logger.info("Image displayed successfully")
+    
+    def show_image(self, image_data, transition=None, transition_ms=0):
+        """Display image from bytes or a file path"""
+        self._waiting = None
         try:
+            if isinstance(image_data, str) and os.path.exists(image_data):
+                # Already letterboxed to the widget by the cache. Set before
+                # the lookup, as on_ready may run before get returns
+                self._waiting = (image_data, transition, transition_ms)
+                image = self.image_cache.get(
+                    image_data, self._target_size(),
+                    on_ready=lambda ready: self.image_ready.emit(image_data, ready)
+                )
+                if image is None:
+                    return  # Keep the previous frame until the preload finishes
+                self._waiting = None
+                if not image.isNull():
+                    self._set_frame(QPixmap.fromImage(image), transition, transition_ms)
+                    logger.info("Image displayed successfully")
+                return
+            
             image = QImage()
             if isinstance(image_data, bytes):
                 image.loadFromData(image_data)
-            elif isinstance(image_data, str) and os.path.exists(image_data):
-                image.load(image_data)
             
             if not image.isNull():
                 pixmap = QPixmap.fromImage(image)
@@ -87,6 +495,8 @@ class ContentDisplay(QLabel):
                     Qt.KeepAspectRatio,
                     Qt.SmoothTransformation
                 )
+                self._finish_transition()
+                self._frame = None
                 self.setPixmap(scaled)
                 logger.info("Image displayed successfully")
         except Exception as e:
@@ -94,6 +504,9 @@ class ContentDisplay(QLabel):
     
     def show_message(self, message):
         """Display text message"""
+        self._waiting = None
+        self._finish_transition()
+        self._frame = None
         self.clear()
         self.setText(message)
         self.setStyleSheet("""
@@ -106,55 +519,25 @@ class ContentDisplay(QLabel):
         """)
 
 
-class PlaylistManager:
-    """Manages playlist playback"""
-    
-    def __init__(self, display_callback):
-        self.playlist = []
-        self.current_index = 0
-        self.timer = QTimer()
-        self.timer.timeout.connect(self._next_item)
-        self.display_callback = display_callback
-    
-    def set_playlist(self, playlist_data):
-        """Set playlist items"""
-        self.playlist = playlist_data.get('items', [])
-        self.current_index = 0
-        logger.info(f"Playlist set with {len(self.playlist)} items")
-    
-    def start(self):
-        """Start playlist playback"""
-        if self.playlist:
-            self._show_current()
-    
-    def stop(self):
-        """Stop playlist playback"""
-        self.timer.stop()
-    
-    def _show_current(self):
-        """Show current playlist item"""
-        if not self.playlist:
-            return
-        
-        item = self.playlist[self.current_index]
-        duration = item.get('duration', 10) * 1000  # Convert to milliseconds
-        
-        self.display_callback(item)
-        self.timer.start(duration)
-    
-    def _next_item(self):
-        """Move to next playlist item"""
-        self.current_index = (self.current_index + 1) % len(self.playlist)
-        self._show_current()
+class VideoSurface(QWidget):
+    """Native child window that an mpv player renders into"""
+
+    def __init__(self):
+        super().__init__()
+        self.setAttribute(Qt.WA_NativeWindow)
+        self.setAttribute(Qt.WA_DontCreateNativeAncestors)
+        self.setStyleSheet("background-color: black;")
 
 
 class MainWindow(QMainWindow):
     """Main display window"""
     
-    def __init__(self):
+    def __init__(self, image_cache_bytes=DEFAULT_IMAGE_CACHE_BYTES, transition_fps=DEFAULT_TRANSITION_FPS):
         super().__init__()
         self.signals = SignalBridge()
         self.overlays = {}
+        self.image_cache = ImageCache(image_cache_bytes)
+        self.transition_fps = transition_fps
         self.setup_ui()
         self.connect_signals()
     
@@ -170,12 +553,20 @@ class MainWindow(QMainWindow):
         layout = QVBoxLayout(central)
         layout.setContentsMargins(0, 0, 0, 0)
         
-        # Content display
-        self.content_display = ContentDisplay()
-        layout.addWidget(self.content_display)
+        # Content display, with two video surfaces stacked behind it so the
+        # next clip can be prerolled off screen
+        self.stack = QStackedWidget()
+        self.content_display = ContentDisplay(self.image_cache, self.transition_fps)
+        self.stack.addWidget(self.content_display)
+        self.video_surfaces = [VideoSurface(), VideoSurface()]
+        for surface in self.video_surfaces:
+            self.stack.addWidget(surface)
+        layout.addWidget(self.stack)
+        self.video_engine = VideoEngine(self.video_surfaces, self.stack.setCurrentWidget)
         
-        # Playlist manager
-        self.playlist_manager = PlaylistManager(self._display_playlist_item)
+        # Emergency surfaces are built now so an alert never waits on rendering
+        self.emergency_overlay = EmergencyOverlay(self)
+        self.emergency_overlay.prebuild(self._screen_size())
         
         # Show initial message
         self.content_display.show_message("MakerScreen\nConnecting to server...")
@@ -184,22 +575,73 @@ class MainWindow(QMainWindow):
         """Connect thread-safe signals"""
         self.signals.content_update.connect(self._handle_content_update)
         self.signals.overlay_update.connect(self._handle_overlay_update)
-        self.signals.show_message.connect(self.content_display.show_message)
+        self.signals.show_message.connect(self._handle_message)
+        self.signals.preload_content.connect(self._handle_preload)
+        self.signals.emergency_broadcast.connect(self._handle_emergency)
+        self.signals.emergency_clear.connect(self._handle_emergency_clear)
     
     def _handle_content_update(self, content):
         """Handle content update from server"""
         content_type = content.get('type', 'image')
         
         if content_type.lower() == 'image':
+            self._show_image_layer()
             if 'data' in content:
                 import base64
                 image_data = base64.b64decode(content['data'])
                 self.content_display.show_image(image_data)
             elif 'path' in content:
-                self.content_display.show_image(content['path'])
-        elif content_type.lower() == 'playlist':
-            self.playlist_manager.set_playlist(content)
-            self.playlist_manager.start()
+                self.content_display.show_image(
+                    content['path'],
+                    content.get('transition'),
+                    content.get('transitionDuration', 0)
+                )
+        elif content_type.lower() == 'video':
+            if not self.video_engine.play(content['path']):
+                self._show_image_layer()
+    
+    def _handle_preload(self, content):
+        """Decode the next playlist item before its slot starts"""
+        content_type = content.get('type', 'image').lower()
+        if content_type == 'image':
+            self.content_display.preload_image(content.get('path'))
+        elif content_type == 'video':
+            self.video_engine.preroll(content.get('path'))
+    
+    def _show_image_layer(self):
+        """Bring the image display to the front, stopping any video"""
+        self.video_engine.stop()
+        self.stack.setCurrentWidget(self.content_display)
+    
+    def _handle_message(self, message):
+        self._show_image_layer()
+        self.content_display.show_message(message)
+    
+    def _screen_size(self):
+        screen = QApplication.primaryScreen()
+        return screen.size() if screen else QSize(1920, 1080)
+    
+    def _handle_emergency(self, emergency):
+        """Show an emergency broadcast over all content and report when it was painted"""
+        delivered = time.monotonic()
+        # Silence video; the overlay covers its surfaces regardless
+        self._show_image_layer()
+        self.emergency_overlay.setGeometry(self.rect())
+        on_displayed = emergency.get('onDisplayed')
+        
+        def painted(painted_at):
+            if on_displayed:
+                on_displayed({'deliveredAt': delivered, 'paintedAt': painted_at})
+        
+        self.emergency_overlay.show_emergency(emergency, painted)
+    
+    def _handle_emergency_clear(self):
+        self.emergency_overlay.clear()
+    
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        if self.emergency_overlay.isVisible():
+            self.emergency_overlay.setGeometry(self.rect())
     
     def _handle_overlay_update(self, overlay_config):
         """Handle overlay update from server"""
@@ -213,17 +655,19 @@ class MainWindow(QMainWindow):
             overlay.update_content(overlay_config.get('content', ''))
             overlay.show()
             self.overlays[overlay_id] = overlay
-    
-    def _display_playlist_item(self, item):
-        """Display a playlist item"""
-        content_id = item.get('contentId')
-        logger.info(f"Displaying playlist item: {content_id}")
-        # Content would be loaded from cache or requested from server
+            if self.emergency_overlay.isVisible():
+                self.emergency_overlay.raise_()
     
     def show_fullscreen(self):
         """Show window in fullscreen mode"""
         self.showFullScreen()
         self.setCursor(Qt.BlankCursor)
+        # Spawn mpv now, in the background, so the first video does not wait for it
+        self.video_engine.start()
+    
+    def closeEvent(self, event):
+        self.video_engine.shutdown()
+        super().closeEvent(event)
     
     def keyPressEvent(self, event):
         """Handle key press events"""
@@ -237,13 +681,13 @@ class MainWindow(QMainWindow):
                 self.show_fullscreen()
 
 
-def create_display():
+def create_display(image_cache_bytes=DEFAULT_IMAGE_CACHE_BYTES, transition_fps=DEFAULT_TRANSITION_FPS):
     """Create and return the display application"""
     app = QApplication.instance()
     if app is None:
         app = QApplication(sys.argv)
     
-    window = MainWindow()
+    window = MainWindow(image_cache_bytes, transition_fps)
     return app, window
 
 
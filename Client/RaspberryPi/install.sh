@@ -29,6 +29,15 @@ sudo chown -R $USER:$USER "$INSTALL_DIR"
 # Copy files
 echo "Copying client files..."
 cp "$SCRIPT_DIR/client.py" "$INSTALL_DIR/"
+cp "$SCRIPT_DIR/renditions.py" "$INSTALL_DIR/"
+cp "$SCRIPT_DIR/video_player.py" "$INSTALL_DIR/"
+cp "$SCRIPT_DIR/schedule.py" "$INSTALL_DIR/"
+cp "$SCRIPT_DIR/wire.py" "$INSTALL_DIR/"
+cp "$SCRIPT_DIR/startup.py" "$INSTALL_DIR/"
+cp "$SCRIPT_DIR/metrics.py" "$INSTALL_DIR/"
+cp "$SCRIPT_DIR/live_state.py" "$INSTALL_DIR/"
+cp "$SCRIPT_DIR/sampler.py" "$INSTALL_DIR/"
+cp "$SCRIPT_DIR/log_store.py" "$INSTALL_DIR/"
 cp "$SCRIPT_DIR/requirements.txt" "$INSTALL_DIR/"
 
 # Copy optional files if they exist
@@ -51,7 +60,7 @@ echo "Updating package list..."
 sudo apt-get update -qq
 
 echo "Installing system dependencies..."
-sudo apt-get install -y python3 python3-pip python3-venv python3-pyqt5 2>&1 | grep -i "error\|failed" || {
+sudo apt-get install -y python3 python3-pip python3-venv python3-pyqt5 mpv 2>&1 | grep -i "error\|failed" || {
     echo "System dependencies installed (some optional packages may not be available)."
 }
 
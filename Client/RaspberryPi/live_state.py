@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+MakerScreen Live State
+What the running client is doing, shared with the web UI: in-process when
+the web UI runs inside the client, over a Unix socket when it runs alone
+"""
+
+import asyncio
+import json
+import os
+import socket
+import threading
+import logging
+
+logger = logging.getLogger('LiveState')
+
+STATE_SOCKET = os.environ.get('MAKERSCREEN_STATE_SOCKET', '/opt/makerscreen/state.sock')
+STATE_READ_TIMEOUT = 2  # Seconds to wait for the client to answer
+
+
+class LiveState:
+    """Published values plus providers evaluated only when someone reads
+
+    The client publishes cheap, event-driven values (connection state, the
+    item on screen) as they change, and registers providers for statistics
+    that cost something to compute. Providers run on the client's event
+    loop, whichever thread asks, so they may read client state without
+    locks; nothing is computed while nobody is looking.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values = {}
+        self._providers = {}
+        self._loop = None
+        self.version = 0
+
+    @property
+    def attached(self):
+        """True inside a process whose client has attached its event loop"""
+        return self._loop is not None and not self._loop.is_closed()
+
+    def attach(self, loop):
+        self._loop = loop
+
+    def publish(self, **values):
+        """Set values; readers see them on their next snapshot"""
+        with self._lock:
+            self._values.update(values)
+            self.version += 1
+
+    def provide(self, name, provider):
+        """Register ``provider``, called for ``name`` on each snapshot"""
+        self._providers[name] = provider
+
+    def _collect(self):
+        with self._lock:
+            state = dict(self._values)
+            state['stateVersion'] = self.version
+        for name, provider in self._providers.items():
+            try:
+                state[name] = provider()
+            except Exception as e:
+                logger.error(f"Error reading live state {name}: {e}")
+                state[name] = None
+        return state
+
+    def snapshot(self, timeout=STATE_READ_TIMEOUT):
+        """Published values and provider results, collected on the client's loop"""
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return self._collect()
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            return self._collect()
+
+        async def collect():
+            return self._collect()
+
+        return asyncio.run_coroutine_threadsafe(collect(), loop).result(timeout)
+
+    async def serve(self, path=STATE_SOCKET):
+        """Answer each connection on a Unix socket with one JSON snapshot"""
+        async def answer(reader, writer):
+            try:
+                writer.write(json.dumps(self._collect(), default=str).encode('utf-8'))
+                await writer.drain()
+            except Exception as e:
+                logger.error(f"Error serving live state: {e}")
+            finally:
+                writer.close()
+
+        if os.path.exists(path):
+            os.remove(path)
+        server = await asyncio.start_unix_server(answer, path=path)
+        os.chmod(path, 0o660)
+        logger.info(f"Live state available on {path}")
+        return server
+
+
+def read_state(path=STATE_SOCKET, timeout=STATE_READ_TIMEOUT):
+    """The client's state from its socket, or None if no client answers"""
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(path)
+            chunks = []
+            while True:
+                chunk = sock.recv(65536)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+        return json.loads(b''.join(chunks))
+    except (OSError, ValueError):
+        return None
+
+
+def current_state():
+    """The client's state: in-process if it runs here, otherwise over the socket"""
+    if live_state.attached:
+        try:
+            return live_state.snapshot()
+        except Exception as e:
+            logger.error(f"Error reading live state: {e}")
+            return None
+    return read_state()
+
+
+# Shared by the client and the web UI when they run in the same process
+live_state = LiveState()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+MakerScreen Log Store
+Client log records kept in a bounded in-memory ring for the web UI, plus a
+size-capped rotating log file
+"""
+
+import os
+import re
+import threading
+import logging
+from collections import deque
+from logging.handlers import RotatingFileHandler
+
+LOG_DIR = '/opt/makerscreen'
+LOG_FILE = os.path.join(LOG_DIR, 'client.log')
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+LOG_RING_SIZE = 2000  # Records kept in memory for the web UI
+LOG_MAX_BYTES = 2 * 1024 * 1024  # Log file size at which it is rotated
+LOG_BACKUPS = 3  # Rotated files kept next to it (client.log.1 ...)
+LOG_QUERY_LIMIT = 500  # Records returned by one query at most
+LOG_TAIL_BYTES = 256 * 1024  # How far back a log file is read when there is no ring
+LOG_LEVELS = ('DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL')
+
+# One line written with LOG_FORMAT; lines that do not match continue the previous record
+LOG_LINE = re.compile(r'^(\d{4}-\d\d-\d\d \d\d:\d\d:\d\d,\d{3}) - (\S+) - ([A-Z]+) - (.*)$')
+
+
+def matches(entry, level=None, text=None):
+    """True if ``entry`` is at ``level`` or above and contains ``text`` (any case)"""
+    if level and entry['levelno'] < logging.getLevelName(level.upper()):
+        return False
+    if text:
+        text = text.lower()
+        return text in entry['message'].lower() or text in entry['logger'].lower()
+    return True
+
+
+class LogRing(logging.Handler):
+    """The most recent log records as dicts, numbered in order
+
+    Each record gets a sequence number, so a reader can ask for everything
+    after the last one it saw and block until there is more. Old records
+    fall off the end; memory is bounded by the ring size.
+    """
+
+    def __init__(self, capacity=LOG_RING_SIZE):
+        super().__init__()
+        self.records = deque(maxlen=capacity)
+        self.seq = 0
+        self._condition = threading.Condition()
+        self._formatter = logging.Formatter()
+
+    @property
+    def installed(self):
+        """True if this process logs into the ring"""
+        return self in logging.getLogger().handlers
+
+    def emit(self, record):
+        try:
+            message = record.getMessage()
+            if record.exc_info:
+                message += '\n' + self._formatter.formatException(record.exc_info)
+            entry = {
+                'time': self._formatter.formatTime(record),
+                'level': record.levelname,
+                'levelno': record.levelno,
+                'logger': record.name,
+                'message': message
+            }
+        except Exception:
+            self.handleError(record)
+            return
+        with self._condition:
+            self.seq += 1
+            entry['seq'] = self.seq
+            self.records.append(entry)
+            self._condition.notify_all()
+
+    def query(self, since=0, level=None, text=None, limit=LOG_QUERY_LIMIT):
+        """Up to ``limit`` of the newest matching records after ``since``, and the cursor"""
+        with self._condition:
+            entries = [entry for entry in self.records if entry['seq'] > since]
+            cursor = self.seq
+        entries = [entry for entry in entries if matches(entry, level, text)]
+        return entries[-limit:], cursor
+
+    def wait(self, since, timeout):
+        """Block until there are records after ``since`` or ``timeout`` passes"""
+        with self._condition:
+            if self.seq <= since:
+                self._condition.wait(timeout)
+            return self.seq > since
+
+    def clear(self):
+        with self._condition:
+            self.records.clear()
+
+
+def read_log_file(path=LOG_FILE, since=0, level=None, text=None, limit=LOG_QUERY_LIMIT):
+    """Records appended to the log file after byte offset ``since``, and the new offset
+
+    For a web UI running without the client in its process. Reads at most
+    LOG_TAIL_BYTES from the end; if the file is shorter than ``since`` it
+    was rotated, and reading starts again from its tail.
+    """
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        return [], 0
+    if since > size:
+        since = 0
+    start = max(since, size - LOG_TAIL_BYTES)
+    entries = []
+    with open(path, 'rb') as f:
+        f.seek(start)
+        if start and start != since:
+            f.readline()  # Skip the partial line the tail starts in
+        offset = f.tell()
+        for raw in f:
+            if not raw.endswith(b'\n'):
+                break  # Still being written
+            offset += len(raw)
+            line = raw.decode('utf-8', 'replace').rstrip('\n')
+            match = LOG_LINE.match(line)
+            if match:
+                timestamp, name, levelname, message = match.groups()
+                levelno = logging.getLevelName(levelname)
+                entries.append({
+                    'seq': offset,
+                    'time': timestamp,
+                    'level': levelname,
+                    'levelno': levelno if isinstance(levelno, int) else 0,
+                    'logger': name,
+                    'message': message
+                })
+            elif entries:
+                entries[-1]['message'] += '\n' + line
+                entries[-1]['seq'] = offset
+    entries = [entry for entry in entries if matches(entry, level, text)]
+    return entries[-limit:], offset
+
+
+def setup_logging(level=logging.INFO, path=LOG_FILE):
+    """Log to stderr, the in-memory ring and, where the install directory exists, a rotating file"""
+    handlers = [logging.StreamHandler(), log_ring]
+    if os.path.isdir(os.path.dirname(path)):
+        handlers.append(RotatingFileHandler(path, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS))
+    logging.basicConfig(level=level, format=LOG_FORMAT, handlers=handlers)
+
+
+# Filled by the client's logging; read by the web UI in the same process
+log_ring = LogRing()
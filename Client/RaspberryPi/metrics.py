@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+MakerScreen Metrics
+A registry of client metrics that the heartbeat sends as deltas against the
+last snapshot the server acknowledged
+"""
+
+import os
+from collections import OrderedDict
+import logging
+
+logger = logging.getLogger('Metrics')
+
+METRICS_PENDING = 8  # Unacknowledged snapshots remembered for a late ack
+LINK_FAIR_RTT_MS = 150  # Round trips above this double the heartbeat interval
+LINK_POOR_RTT_MS = 500  # Round trips above this quadruple it
+THERMAL_ZONE = '/sys/class/thermal/thermal_zone0/temp'
+
+
+def flatten(values, prefix=''):
+    """Nested dicts as one level of dotted keys; lists and scalars are leaves"""
+    flat = {}
+    for key, value in values.items():
+        name = f'{prefix}{key}'
+        if isinstance(value, dict) and value:
+            flat.update(flatten(value, f'{name}.'))
+        else:
+            flat[name] = value
+    return flat
+
+
+def system_metrics(path='/'):
+    """CPU, memory, temperature and disk readings for ``path``'s filesystem"""
+    metrics = {'loadAvg1': round(os.getloadavg()[0], 2)}
+    try:
+        with open(THERMAL_ZONE) as f:
+            metrics['temperatureC'] = round(int(f.read()) / 1000, 1)
+    except (OSError, ValueError):
+        pass
+    try:
+        import psutil
+    except ImportError:
+        return metrics
+    memory = psutil.virtual_memory()
+    # Since the previous call, so one reading per heartbeat interval
+    metrics['cpuPercent'] = psutil.cpu_percent(interval=None)
+    metrics['memoryPercent'] = round(memory.percent, 1)
+    metrics['memoryAvailableMb'] = memory.available // (1024 * 1024)
+    metrics['diskPercent'] = round(psutil.disk_usage(path).percent, 1)
+    return metrics
+
+
+def adaptive_interval(base, rtt_ms, backlog, maximum):
+    """Heartbeat interval for the current link
+
+    Slow round trips stretch the interval, and so does a heartbeat still
+    waiting in the send queue when the next one is due.
+    """
+    factor = 1
+    if rtt_ms is not None and rtt_ms > LINK_POOR_RTT_MS:
+        factor = 4
+    elif rtt_ms is not None and rtt_ms > LINK_FAIR_RTT_MS:
+        factor = 2
+    if backlog:
+        factor *= 2
+    return min(base * factor, maximum)
+
+
+class MetricsRegistry:
+    """Named collectors, encoded as deltas against an acknowledged snapshot
+
+    Each :meth:`encode` takes a snapshot of every collector, flattened to
+    dotted keys, and returns only the keys that differ from the snapshot
+    the server last acknowledged (all of them until it has acknowledged
+    one). Deltas are always taken against the acknowledged snapshot, not the
+    previous one sent, so a lost or superseded heartbeat loses nothing.
+    """
+
+    def __init__(self, max_pending=METRICS_PENDING):
+        self._collectors = OrderedDict()
+        self._pending = OrderedDict()  # snapshot id -> flat values, sent but not acknowledged
+        self._max_pending = max_pending
+        self._next_id = 1
+        self.acked_id = None
+        self._acked = {}
+        self._stats = {'snapshots': 0, 'full': 0, 'keysSent': 0, 'keysTotal': 0}
+
+    def register(self, name, collector):
+        """Add ``collector``, a callable returning a dict (or None to skip)"""
+        self._collectors[name] = collector
+
+    def collect(self, exclude=()):
+        """Current values of every collector (except ``exclude``), by collector name"""
+        values = {}
+        for name, collector in self._collectors.items():
+            if name in exclude:
+                continue
+            try:
+                value = collector()
+            except Exception as e:
+                logger.error(f"Error collecting {name} metrics: {e}")
+                continue
+            if value is not None:
+                values[name] = value
+        return values
+
+    def encode(self):
+        """A snapshot as ``{id, base, values, removed}``; ``base`` None means complete"""
+        flat = flatten(self.collect())
+        snapshot_id = self._next_id
+        self._next_id += 1
+        self._pending[snapshot_id] = flat
+        while len(self._pending) > self._max_pending:
+            self._pending.popitem(last=False)
+
+        if self.acked_id is None:
+            changed, removed = flat, []
+            self._stats['full'] += 1
+        else:
+            changed = {key: value for key, value in flat.items()
+                       if key not in self._acked or self._acked[key] != value}
+            removed = [key for key in self._acked if key not in flat]
+        self._stats['snapshots'] += 1
+        self._stats['keysSent'] += len(changed)
+        self._stats['keysTotal'] += len(flat)
+        return {'id': snapshot_id, 'base': self.acked_id, 'values': changed, 'removed': removed}
+
+    def acknowledge(self, snapshot_id):
+        """The server has applied ``snapshot_id``; later deltas build on it"""
+        flat = self._pending.get(snapshot_id)
+        if flat is None:
+            return
+        self.acked_id = snapshot_id
+        self._acked = flat
+        for pending_id in [pending_id for pending_id in self._pending if pending_id <= snapshot_id]:
+            del self._pending[pending_id]
+
+    def reset(self):
+        """Forget the acknowledged snapshot, so the next one is sent complete"""
+        self.acked_id = None
+        self._acked = {}
+
+    def stats(self):
+        """Share of metric keys actually sent"""
+        stats = dict(self._stats)
+        total = stats.pop('keysTotal')
+        stats['sentRatio'] = round(stats['keysSent'] / total, 3) if total else 0.0
+        return stats
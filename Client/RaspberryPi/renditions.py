@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+MakerScreen Rendition Cache
+Pre-scales cached images to the display resolution at ingest time so the
+display only ever decodes screen-sized files
+"""
+
+import asyncio
+import multiprocessing
+import os
+import tempfile
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+logger = logging.getLogger('Renditions')
+
+RENDITION_EXTENSIONS = {'.jpg', '.jpeg', '.png'}
+JPEG_QUALITY = 90
+
+
+def render(source, target, width, height):
+    """Write a copy of ``source`` scaled to fit within width x height
+
+    Runs in a worker process. JPEGs are opened in draft mode, so the decoder
+    only produces the smallest DCT scale that still covers the target size
+    instead of the full-resolution image. Images that already fit are
+    linked rather than copied. Returns the path to display.
+    """
+    from PIL import Image
+
+    with Image.open(source) as image:
+        if image.width <= width and image.height <= height:
+            if not os.path.lexists(target):
+                os.symlink(os.path.abspath(source), target)
+            return target
+
+        if image.format == 'JPEG':
+            image.draft('RGB', (width, height))
+        image.thumbnail((width, height), Image.LANCZOS)
+
+        fd, temp_name = tempfile.mkstemp(dir=os.path.dirname(target), suffix='.part')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                if Path(target).suffix == '.png':
+                    image.save(f, format='PNG')
+                else:
+                    image.convert('RGB').save(f, format='JPEG', quality=JPEG_QUALITY)
+            os.replace(temp_name, target)
+        except Exception:
+            if os.path.exists(temp_name):
+                os.remove(temp_name)
+            raise
+    return target
+
+
+class RenditionCache:
+    """Screen-resolution copies of cached images, built by a process pool"""
+
+    def __init__(self, cache_dir, size, workers=None):
+        self.rendition_dir = Path(cache_dir) / 'renditions'
+        self.rendition_dir.mkdir(parents=True, exist_ok=True)
+        self.width, self.height = size
+        self.workers = workers or min(4, os.cpu_count() or 1)
+        self._pool = None
+        self._pending = {}
+
+    @property
+    def pool(self):
+        if self._pool is None:
+            # forkserver: never fork the multi-threaded client process itself
+            context = multiprocessing.get_context('forkserver')
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+        return self._pool
+
+    def resize(self, size):
+        """Build renditions for a new screen size from now on"""
+        self.width, self.height = size
+
+    def _suffix(self):
+        return f'_{self.width}x{self.height}'
+
+    def target_path(self, source):
+        source = Path(source)
+        return self.rendition_dir / f'{source.stem}{self._suffix()}{source.suffix}'
+
+    def supports(self, source):
+        return Path(source).suffix.lower() in RENDITION_EXTENSIONS
+
+    def lookup(self, source):
+        """Return the rendition for ``source`` if one has been built"""
+        if not self.supports(source):
+            return None
+        target = self.target_path(source)
+        return str(target) if target.exists() else None
+
+    async def ensure(self, source):
+        """Build the rendition for ``source`` if needed and return the path to display"""
+        if not self.supports(source):
+            return source
+        existing = self.lookup(source)
+        if existing:
+            return existing
+
+        target = str(self.target_path(source))
+        future = self._pending.get(target)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(
+                self.pool, render, str(source), target, self.width, self.height
+            )
+            self._pending[target] = future
+            future.add_done_callback(lambda _: self._pending.pop(target, None))
+        try:
+            return await asyncio.shield(future)
+        except BrokenProcessPool:
+            logger.error("Rendition worker died; restarting the pool")
+            self._pool = None
+            return source
+        except Exception as e:
+            logger.error(f"Error building rendition for {Path(source).name}: {e}")
+            return source
+
+    def collect_garbage(self, source_names):
+        """Delete renditions of evicted content or for another resolution"""
+        keep = {Path(name).stem + self._suffix() for name in source_names}
+        removed = 0
+        for filepath in self.rendition_dir.iterdir():
+            if filepath.suffix != '.part' and filepath.stem not in keep:
+                filepath.unlink()
+                removed += 1
+        return removed
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
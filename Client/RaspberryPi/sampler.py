@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+MakerScreen System Sampler
+Samples CPU, memory, disk, temperature and load on a background thread into
+a fixed-size history ring, so web requests only read what is already there
+"""
+
+import os
+import socket
+import threading
+import time
+import logging
+from array import array
+
+logger = logging.getLogger('Sampler')
+
+SAMPLE_INTERVAL = 5  # Seconds between samples
+HISTORY_SECONDS = 24 * 3600  # History kept in the ring
+NETWORK_REFRESH = 60  # Seconds between hostname/IP lookups
+THERMAL_ZONE = '/sys/class/thermal/thermal_zone0/temp'
+
+# Sampled fields, each stored as a float32 column of the ring
+FIELDS = ('cpuPercent', 'memoryPercent', 'diskPercent', 'temperatureC', 'loadAvg1')
+
+
+def mac_address():
+    """MAC address of the first interface that has one"""
+    try:
+        import netifaces
+        for iface in netifaces.interfaces():
+            addrs = netifaces.ifaddresses(iface)
+            if netifaces.AF_LINK in addrs:
+                mac = addrs[netifaces.AF_LINK][0].get('addr', '')
+                if mac and mac != '00:00:00:00:00:00':
+                    return mac
+    except Exception:
+        pass
+    return 'Unknown'
+
+
+class HistoryRing:
+    """Fixed-capacity columns of float32 samples with uint32 timestamps
+
+    One preallocated array per field, written round-robin, so memory stays
+    constant (about 24 bytes per sample for five fields) and nothing is
+    allocated per sample. Missing readings are stored as NaN.
+    """
+
+    def __init__(self, fields=FIELDS, capacity=HISTORY_SECONDS // SAMPLE_INTERVAL):
+        self.fields = fields
+        self.capacity = capacity
+        self.timestamps = array('I', bytes(4 * capacity))
+        self.columns = {field: array('f', bytes(4 * capacity)) for field in fields}
+        self.count = 0
+        self.next = 0
+        self._lock = threading.Lock()
+
+    def append(self, timestamp, values):
+        with self._lock:
+            i = self.next
+            self.timestamps[i] = int(timestamp)
+            for field in self.fields:
+                value = values.get(field)
+                self.columns[field][i] = float('nan') if value is None else value
+            self.next = (i + 1) % self.capacity
+            self.count = min(self.count + 1, self.capacity)
+
+    def _indices(self):
+        """Ring positions from oldest to newest"""
+        start = (self.next - self.count) % self.capacity
+        return [(start + offset) % self.capacity for offset in range(self.count)]
+
+    def query(self, since=0, until=None, step=SAMPLE_INTERVAL, fields=None):
+        """Samples in [since, until], averaged into buckets of ``step`` seconds
+
+        Returns columns: ``timestamps`` (bucket starts) and one list per
+        field, with None where a bucket had no valid reading.
+        """
+        fields = [field for field in (fields or self.fields) if field in self.columns]
+        until = until if until is not None else time.time()
+        step = max(int(step), 1)
+        buckets = {}
+        with self._lock:
+            for i in self._indices():
+                t = self.timestamps[i]
+                if t < since or t > until:
+                    continue
+                bucket = buckets.setdefault(t - t % step, [[0.0, 0] for _ in fields])
+                for sums, field in zip(bucket, fields):
+                    value = self.columns[field][i]
+                    if value == value:  # Not NaN
+                        sums[0] += value
+                        sums[1] += 1
+        starts = sorted(buckets)
+        result = {'step': step, 'timestamps': starts}
+        for n, field in enumerate(fields):
+            result[field] = [
+                round(buckets[t][n][0] / buckets[t][n][1], 2) if buckets[t][n][1] else None
+                for t in starts
+            ]
+        return result
+
+    def nbytes(self):
+        return self.timestamps.itemsize * self.capacity + sum(
+            column.itemsize * self.capacity for column in self.columns.values()
+        )
+
+
+class SystemSampler:
+    """Background thread that keeps the latest readings and their history
+
+    CPU usage is computed from /proc/stat deltas between samples, so it
+    neither blocks a request nor shares psutil's per-process
+    ``cpu_percent`` window with the heartbeat metrics.
+    """
+
+    def __init__(self, path='/', interval=SAMPLE_INTERVAL):
+        self.path = path
+        self.interval = interval
+        self.history = HistoryRing()
+        self.latest = {}
+        self.network = {'hostname': 'Unknown', 'ip_address': 'Unknown'}  # Refreshed every NETWORK_REFRESH
+        self.version = 0
+        self._cpu_times = None
+        self._network_at = 0
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def start(self):
+        """Take a first sample and keep sampling in the background; idempotent"""
+        with self._start_lock:
+            if self._thread is not None:
+                return
+            self.sample()
+            self._thread = threading.Thread(target=self._run, name='sampler', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.sample()
+            except Exception as e:
+                logger.error(f"Error sampling system state: {e}")
+
+    def _cpu_percent(self):
+        with open('/proc/stat') as f:
+            values = [int(value) for value in f.readline().split()[1:]]
+        idle = values[3] + (values[4] if len(values) > 4 else 0)  # idle + iowait
+        total = sum(values[:8])
+        previous, self._cpu_times = self._cpu_times, (idle, total)
+        if previous is None or total == previous[1]:
+            return None
+        return round(100 * (1 - (idle - previous[0]) / (total - previous[1])), 1)
+
+    def _refresh_network(self, now):
+        if now - self._network_at < NETWORK_REFRESH:
+            return
+        self._network_at = now
+        network = dict(self.network)
+        if 'mac_address' not in network:
+            network['mac_address'] = mac_address()
+        try:
+            network['hostname'] = socket.gethostname()
+            network['ip_address'] = socket.gethostbyname(network['hostname'])
+        except OSError as e:
+            logger.warning(f"Could not resolve host address: {e}")
+        self.network = network
+
+    def sample(self):
+        """Take one reading of every field"""
+        now = time.time()
+        values = {'loadAvg1': round(os.getloadavg()[0], 2)}
+        try:
+            values['cpuPercent'] = self._cpu_percent()
+        except (OSError, ValueError, IndexError):
+            pass
+        try:
+            with open(THERMAL_ZONE) as f:
+                values['temperatureC'] = round(int(f.read()) / 1000, 1)
+        except (OSError, ValueError):
+            pass
+        try:
+            import psutil
+            values['memoryPercent'] = round(psutil.virtual_memory().percent, 1)
+            values['diskPercent'] = round(psutil.disk_usage(self.path).percent, 1)
+        except (ImportError, OSError):
+            pass
+        self._refresh_network(now)
+
+        self.history.append(now, values)
+        self.latest = {**values, 'sampledAt': now}
+        self.version += 1
+
+
+# Shared by every web UI request in this process
+sampler = SystemSampler()
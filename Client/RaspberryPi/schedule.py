@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+MakerScreen Schedule Index
+Compiles dayparted campaigns into a sorted interval index so the client can
+decide locally what plays at any moment
+"""
+
+import heapq
+from bisect import bisect_right
+from datetime import date, datetime, time, timedelta
+import logging
+
+logger = logging.getLogger('Schedule')
+
+SCHEDULE_HORIZON_DAYS = 2  # Days ahead compiled into the index
+DEFAULT_SLOT_SECONDS = 10
+MIN_SLOT_SECONDS = 1  # Shortest playlist slot the scheduler will honour
+
+# SchedulePriority names used by the server
+PRIORITIES = {'low': 0, 'normal': 50, 'high': 100, 'emergency': 1000}
+
+# Server DayOfWeek ordinals start at Sunday; Python weekdays start at Monday
+DAY_NAMES = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+
+
+def slot_duration(item, minimum=MIN_SLOT_SECONDS):
+    """Seconds a playlist item stays on screen
+
+    Never less than ``minimum``, so a cycle of zero or missing durations
+    still advances.
+    """
+    duration = item.get('duration')
+    if duration is None:
+        duration = DEFAULT_SLOT_SECONDS
+    return max(float(duration), minimum)
+
+
+def weighted_cycle(items):
+    """Expand items by their integer ``weight`` into one play cycle
+
+    Uses smooth weighted round-robin, so heavier items are spread through
+    the cycle rather than played back to back. With all weights at 1 the
+    original order is kept.
+    """
+    weighted = [(item, int(item.get('weight', 1))) for item in items]
+    weighted = [(item, weight) for item, weight in weighted if weight > 0]
+    total = sum(weight for _, weight in weighted)
+    current = [0] * len(weighted)
+    cycle = []
+    for _ in range(total):
+        for i, (_, weight) in enumerate(weighted):
+            current[i] += weight
+        best = max(range(len(weighted)), key=lambda i: current[i])
+        current[best] -= total
+        cycle.append(weighted[best][0])
+    return cycle
+
+
+def _parse_date(value):
+    return date.fromisoformat(value[:10]) if value else None
+
+
+def _parse_time(value):
+    if value is None:
+        return None
+    hours, minutes, *rest = str(value).split(':')
+    seconds = float(rest[0]) if rest else 0
+    return time(int(hours) % 24, int(minutes), int(seconds))
+
+
+def _parse_days(values):
+    if not values:
+        return None
+    days = set()
+    for value in values:
+        if isinstance(value, int):
+            days.add((value - 1) % 7)
+        else:
+            days.add(DAY_NAMES.index(str(value).lower()))
+    return days
+
+
+def _camel_keys(data):
+    """Copy of ``data`` with PascalCase keys (C# default serialization) in camelCase"""
+    return {key[:1].lower() + key[1:]: value for key, value in data.items()}
+
+
+def campaign_fields(data):
+    """Campaign settings from either the documented shape or a server Playlist
+
+    A serialized Playlist carries its daypart in a nested ``schedule``
+    (PlaylistSchedule), where the days are ``activeDays``. Keys may be in
+    PascalCase or camelCase; items are normalized the same way.
+    """
+    fields = _camel_keys(data)
+    schedule = fields.pop('schedule', None)
+    if isinstance(schedule, dict):
+        for key, value in _camel_keys(schedule).items():
+            fields.setdefault(key, value)
+    if 'days' not in fields and 'activeDays' in fields:
+        fields['days'] = fields['activeDays']
+    fields['items'] = [_camel_keys(item) for item in fields.get('items') or []]
+    return fields
+
+
+def _parse_priority(value):
+    if isinstance(value, str):
+        return PRIORITIES.get(value.lower(), 0)
+    return int(value or 0)
+
+
+class Campaign:
+    """A set of items with the dayparts and date range it may play in"""
+
+    def __init__(self, data, order):
+        data = campaign_fields(data)
+        self.id = data.get('id') or f'campaign-{order}'
+        self.order = order
+        self.priority = _parse_priority(data.get('priority'))
+        self.items = weighted_cycle(data.get('items', []))
+        self.start_date = _parse_date(data.get('startDate'))
+        self.end_date = _parse_date(data.get('endDate'))
+        self.start_time = _parse_time(data.get('startTime'))
+        self.end_time = _parse_time(data.get('endTime'))
+        self.days = _parse_days(data.get('days'))
+
+    def window(self, day):
+        """(start, end) Unix times of this campaign's daypart on ``day``, or None"""
+        if self.start_date and day < self.start_date:
+            return None
+        if self.end_date and day > self.end_date:
+            return None
+        if self.days is not None and day.weekday() not in self.days:
+            return None
+        start_time = self.start_time or time(0)
+        end_day = day
+        if self.end_time is None or self.end_time <= start_time:
+            end_day = day + timedelta(days=1)
+        start = datetime.combine(day, start_time).timestamp()
+        end = datetime.combine(end_day, self.end_time or time(0)).timestamp()
+        return start, end
+
+
+class Segment:
+    """An interval in which one campaign plays, timed from ``anchor``"""
+
+    __slots__ = ('start', 'end', 'campaign', 'anchor')
+
+    def __init__(self, start, end, campaign, anchor):
+        self.start = start
+        self.end = end
+        self.campaign = campaign
+        self.anchor = anchor
+
+    @property
+    def items(self):
+        return self.campaign.items
+
+
+class ScheduleIndex:
+    """Campaign dayparts compiled into sorted, non-overlapping segments
+
+    Where dayparts overlap, the campaign with the highest priority plays
+    (ties go to the one listed first). Each segment keeps the start of its
+    campaign's daypart as the timeline anchor, so a campaign that is
+    interrupted, or a screen that reboots, rejoins at the slot it would
+    have reached. Lookups are a bisect over segment starts.
+    """
+
+    def __init__(self, campaigns, now, horizon_days=SCHEDULE_HORIZON_DAYS):
+        self.campaigns = [Campaign(data, order) for order, data in enumerate(campaigns or [])]
+        self.campaigns = [campaign for campaign in self.campaigns if campaign.items]
+        self.horizon_days = horizon_days
+        self.segments = []
+        self.starts = []
+        self.valid_until = 0
+        self.compile(now)
+
+    def compile(self, now):
+        """Rebuild the index from the day before ``now`` through the horizon"""
+        first_day = datetime.fromtimestamp(now).date() - timedelta(days=1)
+        windows = []
+        for offset in range(self.horizon_days + 2):
+            day = first_day + timedelta(days=offset)
+            for campaign in self.campaigns:
+                window = campaign.window(day)
+                if window and window[1] > window[0]:
+                    windows.append((window[0], window[1], campaign))
+        windows.sort(key=lambda window: window[0])
+
+        boundaries = sorted({t for start, end, _ in windows for t in (start, end)})
+        segments = []
+        active = []
+        next_window = 0
+        for i, t in enumerate(boundaries[:-1]):
+            while next_window < len(windows) and windows[next_window][0] <= t:
+                start, end, campaign = windows[next_window]
+                heapq.heappush(active, (-campaign.priority, campaign.order, start, end, campaign))
+                next_window += 1
+            while active and active[0][3] <= t:
+                heapq.heappop(active)
+            if not active:
+                continue
+            _, _, anchor, _, campaign = active[0]
+            end = boundaries[i + 1]
+            previous = segments[-1] if segments else None
+            if previous and previous.end == t and previous.campaign is campaign and previous.anchor == anchor:
+                previous.end = end
+            else:
+                segments.append(Segment(t, end, campaign, anchor))
+
+        self.segments = segments
+        self.starts = [segment.start for segment in segments]
+        last_day = first_day + timedelta(days=self.horizon_days + 1)
+        self.valid_until = datetime.combine(last_day, time(0)).timestamp()
+        logger.info(f"Schedule compiled: {len(self.campaigns)} campaigns, {len(segments)} segments")
+
+    def content_ids(self):
+        """Every content ID any campaign can play"""
+        return {item.get('contentId') for campaign in self.campaigns
+                for item in campaign.items if item.get('contentId')}
+
+    def segment_at(self, t):
+        """The segment playing at Unix time ``t``, or None"""
+        i = bisect_right(self.starts, t) - 1
+        if i >= 0 and t < self.segments[i].end:
+            return self.segments[i]
+        return None
+
+    def next_change(self, t):
+        """Unix time after ``t`` at which the playing campaign next changes"""
+        segment = self.segment_at(t)
+        if segment:
+            return segment.end
+        i = bisect_right(self.starts, t)
+        return self.starts[i] if i < len(self.starts) else self.valid_until
+
+    def item_at(self, t):
+        """(item, slot start, slot end) playing at ``t``, or None"""
+        segment = self.segment_at(t)
+        if not segment:
+            return None
+        index, slot_start = self._position(segment, t)
+        item = segment.items[index]
+        return item, slot_start, min(slot_start + slot_duration(item), segment.end)
+
+    def _position(self, segment, t):
+        """Index of the slot containing ``t`` and when that slot started"""
+        items = segment.items
+        cycle = sum(slot_duration(item) for item in items)
+        slot_start = segment.anchor + ((t - segment.anchor) // cycle) * cycle
+        index = 0
+        while slot_start + slot_duration(items[index]) <= t:
+            slot_start += slot_duration(items[index])
+            index = (index + 1) % len(items)
+        return index, slot_start
+
+    def upcoming(self, t, max_items, max_seconds):
+        """Items due from ``t`` onwards in play order, across segment changes"""
+        upcoming = []
+        horizon = t + max_seconds
+        while t < self.valid_until and (len(upcoming) < max_items or t < horizon):
+            segment = self.segment_at(t)
+            if not segment:
+                t = self.next_change(t)
+                continue
+            index, slot_start = self._position(segment, t)
+            while slot_start < segment.end and (len(upcoming) < max_items or slot_start < horizon):
+                upcoming.append(segment.items[index])
+                slot_start += slot_duration(segment.items[index])
+                index = (index + 1) % len(segment.items)
+            t = segment.end
+        return upcoming
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+MakerScreen Startup Timeline
+Records how long each phase of client start-up takes, measured from process
+start, so slow boots can be traced to a phase
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+MODULE_LOADED_AT = time.monotonic()
+
+
+def process_started_at():
+    """Monotonic time at which this process started
+
+    Read from /proc so interpreter start-up and imports are included; falls
+    back to when this module was loaded.
+    """
+    try:
+        with open('/proc/self/stat') as f:
+            # Fields after the parenthesised command name; starttime is field 22
+            fields = f.read().rsplit(')', 1)[1].split()
+        started = int(fields[19]) / os.sysconf('SC_CLK_TCK')
+        with open('/proc/uptime') as f:
+            uptime = float(f.read().split()[0])
+        return min(time.monotonic() - (uptime - started), MODULE_LOADED_AT)
+    except (OSError, ValueError, IndexError):
+        return MODULE_LOADED_AT
+
+
+class StartupTimeline:
+    """Start and end of each start-up phase, relative to process start
+
+    Phases may run concurrently on different threads (display, web UI and
+    network start together), so each one records its own thread. Milestones
+    such as the first frame are recorded with :meth:`mark`.
+    """
+
+    def __init__(self):
+        self.started_at = process_started_at()
+        self._lock = threading.Lock()
+        self._phases = []
+        self._marks = {}
+
+    def _ms(self, t):
+        return round((t - self.started_at) * 1000, 1)
+
+    @contextmanager
+    def phase(self, name):
+        """Time the enclosed block as phase ``name``"""
+        start = time.monotonic()
+        error = None
+        try:
+            yield
+        except BaseException as e:
+            error = type(e).__name__
+            raise
+        finally:
+            self.record(name, start, time.monotonic(), error)
+
+    def record(self, name, start, end, error=None):
+        """Add a phase measured elsewhere (monotonic start and end times)"""
+        phase = {
+            'name': name,
+            'startMs': self._ms(start),
+            'durationMs': round((end - start) * 1000, 1),
+            'thread': threading.current_thread().name
+        }
+        if error:
+            phase['error'] = error
+        with self._lock:
+            self._phases.append(phase)
+
+    def mark(self, name):
+        """Note that milestone ``name`` was reached now; the first time counts"""
+        with self._lock:
+            self._marks.setdefault(name, self._ms(time.monotonic()))
+        return self._marks[name]
+
+    def report(self):
+        """Phases in start order and milestones, in milliseconds since process start"""
+        with self._lock:
+            phases = sorted(self._phases, key=lambda phase: phase['startMs'])
+            marks = dict(self._marks)
+        return {
+            'interpreterMs': self._ms(MODULE_LOADED_AT),
+            'phases': phases,
+            'marks': marks
+        }
+
+
+# Shared by the client and the web UI, which run in the same process
+timeline = StartupTimeline()
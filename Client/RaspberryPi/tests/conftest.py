@@ -0,0 +1,66 @@
+"""Shared fixtures for the Raspberry Pi client tests"""
+
+import asyncio
+import json
+import os
+import sys
+from datetime import datetime
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import client  # noqa: E402
+
+
+def server_frame(message_type, data=None, seq=None, client_id=''):
+    """A message as the C# server serializes WebSocketMessage (default property names)"""
+    return json.dumps({
+        'Type': message_type,
+        'ClientId': client_id,
+        'Data': data,
+        'Seq': seq,
+        'Timestamp': datetime.utcnow().isoformat() + 'Z'
+    })
+
+
+def client_message(frame):
+    """A client frame read the way the server reads it (property names in any case)"""
+    message = json.loads(frame)
+    return {key[0].lower() + key[1:]: value for key, value in message.items()}
+
+
+@pytest.fixture
+def make_client(tmp_path, monkeypatch):
+    """Build a headless MakerScreenClient whose cache lives in a temporary directory"""
+    monkeypatch.setattr(client, 'CONTENT_DIR', str(tmp_path / 'content'))
+    monkeypatch.setattr(client, 'CONFIG_FILE', str(tmp_path / 'config.json'))
+    created = []
+
+    def make(server_url='ws://127.0.0.1:1'):
+        instance = client.MakerScreenClient()
+        instance.server_url = server_url
+        instance.running = True
+        created.append(instance)
+        return instance
+
+    yield make
+    for instance in created:
+        instance.renditions.shutdown()
+
+
+async def run_session(instance, *background):
+    """Connect once and process messages until the server closes the connection
+
+    ``background`` are client coroutine methods run alongside, e.g.
+    ``instance.sync_clock``.
+    """
+    assert await instance.connect()
+    tasks = [asyncio.create_task(task()) for task in (instance.outbound_writer,) + background]
+    try:
+        await instance.receive_messages()
+    finally:
+        for task in tasks:
+            task.cancel()
+        instance.connected = False
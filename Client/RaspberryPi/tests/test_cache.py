@@ -0,0 +1,131 @@
+"""Content cache: content-addressed storage, quota, pinning and the prefetcher's staged set"""
+
+import asyncio
+import hashlib
+import json
+
+import pytest
+
+import client
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return client.ContentCache(tmp_path / 'content', max_bytes=2500)
+
+
+def payload(fill, size=1000):
+    return bytes([fill]) * size
+
+
+def sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def test_blobs_are_named_by_digest_and_shared_across_ids(cache):
+    data = payload(7)
+
+    first = cache.save_content('a', data, 'image/png', sha256(data))
+    second = cache.save_content('b', iter([data[:300], data[300:]]), 'image/png')
+
+    assert first == second
+    assert first.endswith(f'{sha256(data)}.png')
+    assert cache.stats()['entries'] == 2 and cache.stats()['files'] == 1
+
+
+def test_hash_mismatch_leaves_nothing_behind(cache):
+    assert cache.save_content('a', payload(1), 'image/png', sha256(payload(2))) is None
+
+    assert not cache.has_content('a')
+    assert [path.name for path in cache.cache_dir.iterdir() if not path.name.startswith('manifest.')] == []
+
+
+def test_interrupted_write_is_discarded_on_restart(tmp_path):
+    cache_dir = tmp_path / 'content'
+    client.ContentCache(cache_dir, max_bytes=2500)
+    (cache_dir / f'tmpabc{client.ContentCache.TEMP_SUFFIX}').write_bytes(b'half a file')
+
+    cache = client.ContentCache(cache_dir, max_bytes=2500)
+
+    assert not list(cache_dir.glob(f'*{client.ContentCache.TEMP_SUFFIX}'))
+    assert cache.stats()['files'] == 0
+
+
+def test_known_digest_is_linked_not_downloaded(cache):
+    data = payload(3)
+    cache.save_content('a', data, 'image/png')
+
+    missing = cache.missing_content({'b': sha256(data), 'c': sha256(payload(4))})
+
+    assert missing == ['c']
+    assert cache.get_content_path('b') == cache.get_content_path('a')
+
+
+def test_inventory_switches_to_bloom_filter(cache, monkeypatch):
+    monkeypatch.setattr(client, 'INVENTORY_MAX_HASHES', 2)
+    cache.max_bytes = 10 ** 6
+    for fill in range(2):
+        cache.save_content(f'id-{fill}', payload(fill, 10), 'image/png')
+    assert set(cache.inventory()['hashes']) == {'id-0', 'id-1'}
+
+    cache.save_content('id-2', payload(2, 10), 'image/png')
+    inventory = cache.inventory()
+
+    assert 'hashes' not in inventory and inventory['count'] == 3
+    bloom = client.BloomFilter(3)
+    assert set(inventory['bloom']) == set(bloom.to_dict())
+    assert len(json.dumps(inventory)) < 1024
+
+
+def test_under_budget_save_skips_blob_scan(cache, monkeypatch):
+    def no_scan():
+        raise AssertionError('blob index built while under budget')
+    monkeypatch.setattr(cache.manifest, 'blobs', no_scan)
+
+    assert cache.save_content('a', payload(1), 'image/png')
+    assert cache.save_content('b', payload(2), 'image/png')
+
+
+def test_over_budget_evicts_least_recently_used(cache):
+    cache.save_content('a', payload(1), 'image/png')
+    cache.save_content('b', payload(2), 'image/png')
+    cache.save_content('c', payload(3), 'image/png')
+
+    assert not cache.has_content('a')
+    assert cache.has_content('b') and cache.has_content('c')
+    assert cache.stats()['bytes'] <= cache.max_bytes
+
+
+def test_staged_content_survives_eviction(cache):
+    cache.save_content('a', payload(1), 'image/png')
+    cache.save_content('b', payload(2), 'image/png')
+    cache.pin('staged', ['a'])
+
+    cache.save_content('c', payload(3), 'image/png')
+
+    assert cache.has_content('a')
+    assert not cache.has_content('b')
+    cache.unpin('staged')
+    cache.save_content('d', payload(4), 'image/png')
+    assert not cache.has_content('a')
+
+
+def test_prefetcher_pins_upcoming_window(cache):
+    requested = []
+
+    async def request_content(content_ids):
+        requested.extend(content_ids)
+
+    async def report_readiness(readiness):
+        pass
+
+    prefetcher = client.PlaylistPrefetcher(cache, request_content, report_readiness, max_items=2, max_seconds=0)
+    cache.save_content('a', payload(1), 'image/png')
+    items = [{'contentId': 'a'}, {'contentId': 'b'}, {'contentId': 'c'}]
+
+    asyncio.run(prefetcher.update(items, 0))
+
+    assert cache._pins['staged'] == {'a', 'b'}
+    assert requested == ['b']
+    asyncio.run(prefetcher.update([], 0))
+    assert 'staged' not in cache._pins
@@ -0,0 +1,48 @@
+"""TIME_SYNC round trips against a stand-in server that replies like SecureWebSocketServer"""
+
+import asyncio
+import time
+
+import websockets
+
+import client
+from conftest import client_message, run_session, server_frame
+
+SERVER_AHEAD_MS = 2500  # The stand-in server's clock runs this far ahead of the client's
+
+
+def test_time_sync_reply_converges_offset(make_client, monkeypatch):
+    monkeypatch.setattr(client, 'CLOCK_SYNC_SAMPLES', 4)
+    monkeypatch.setattr(client, 'CLOCK_SYNC_SPACING', 0.01)
+    requests = []
+
+    async def server(websocket):
+        await websocket.recv()
+        await websocket.send(server_frame('REGISTER', {'success': True, 'resumeToken': 'token-1'}))
+        while len(requests) < client.CLOCK_SYNC_SAMPLES:
+            message = client_message(await websocket.recv())
+            if message['type'] != 'TIME_SYNC':
+                continue
+            requests.append(message)
+            t1 = time.time() * 1000 + SERVER_AHEAD_MS
+            # Reply as HandleTimeSyncAsync does: unsequenced, PascalCase envelope, camelCase data
+            await websocket.send(server_frame('TIME_SYNC', {
+                't0': message['data']['t0'], 't1': t1, 't2': t1
+            }, client_id='c1'))
+        await asyncio.sleep(0.1)
+
+    async def scenario():
+        async with websockets.serve(server, '127.0.0.1', 0) as stand_in:
+            port = stand_in.sockets[0].getsockname()[1]
+            instance = make_client(f'ws://127.0.0.1:{port}')
+            await run_session(instance, instance.sync_clock)
+            return instance
+
+    instance = asyncio.run(scenario())
+
+    assert len(requests) == client.CLOCK_SYNC_SAMPLES
+    status = instance.clock_sync.status()
+    assert status['synced']
+    assert status['samples'] == client.CLOCK_SYNC_SAMPLES
+    # Local clock vs the anchored steady clock differ by at most scheduling noise
+    assert abs(status['offsetMs'] - SERVER_AHEAD_MS) < 50
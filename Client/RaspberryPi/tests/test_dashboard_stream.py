@@ -0,0 +1,58 @@
+"""Dashboard SSE stream: one producer, changed keys only"""
+
+import json
+import threading
+
+from web_ui import DashboardStream
+
+
+def frame_data(frame):
+    assert frame.startswith('data: ')
+    return json.loads(frame[len('data: '):])
+
+
+def test_subscriber_gets_only_changed_keys():
+    view = {'cpu': 10, 'memory': 40, 'item': 'a.png'}
+    builds = []
+
+    def build():
+        builds.append(threading.current_thread().name)
+        return dict(view)
+
+    stream = DashboardStream(build, interval=0.01)
+    frames = stream.subscribe()
+
+    assert frame_data(next(frames)) == {'cpu': 10, 'memory': 40, 'item': 'a.png'}
+    view['cpu'] = 12
+    assert frame_data(next(frames)) == {'cpu': 12}
+    view.update(item='b.png', memory=41)
+    assert frame_data(next(frames)) == {'memory': 41, 'item': 'b.png'}
+    frames.close()
+
+    assert set(builds) == {'dashboard-stream'}
+
+
+def test_producer_stops_when_the_last_subscriber_leaves():
+    stream = DashboardStream(lambda: {'cpu': 1}, interval=0.01)
+    first = stream.subscribe()
+    second = stream.subscribe()
+    next(first)
+    next(second)
+    producer = stream._thread
+    assert stream.subscribers == 2
+
+    first.close()
+    producer.join(0.2)
+    assert producer.is_alive()
+
+    second.close()
+    producer.join(2)
+    assert not producer.is_alive()
+    assert stream.subscribers == 0
+    assert stream._thread is None
+
+    # A new subscriber starts it again
+    again = stream.subscribe()
+    assert frame_data(next(again)) == {'cpu': 1}
+    assert stream._thread is not None and stream._thread is not producer
+    again.close()
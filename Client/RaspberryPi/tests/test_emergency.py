@@ -0,0 +1,58 @@
+"""Emergency display timing: server timestamps and when the first frame is painted"""
+
+import time
+from datetime import datetime, timezone
+
+import pytest
+from PyQt5.QtCore import QSize
+from PyQt5.QtWidgets import QApplication, QWidget
+
+from client import parse_server_time
+from display_engine import EmergencyOverlay
+
+NEW_YEAR = datetime(2026, 1, 1, tzinfo=timezone.utc).timestamp()
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('2026-01-01T00:00:00Z', NEW_YEAR),
+    ('2026-01-01T00:00:00.1234567Z', NEW_YEAR + 0.123456),  # .NET's 7 digits
+    ('2026-01-01T00:00:00.5', NEW_YEAR + 0.5),  # No offset means UTC
+    ('2026-01-01T02:00:00.25+02:00', NEW_YEAR + 0.25),
+    ('2025-12-31T19:00:00-05:00', NEW_YEAR),
+])
+def test_parse_server_time(value, expected):
+    assert parse_server_time(value) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize('value', [None, '', 'yesterday', '2026-13-01T00:00:00Z'])
+def test_parse_server_time_rejects_invalid(value):
+    assert parse_server_time(value) is None
+
+
+def test_painted_time_is_taken_when_the_frame_is_drawn():
+    app = QApplication.instance() or QApplication([])
+    window = QWidget()
+    window.resize(320, 240)
+    overlay = EmergencyOverlay(window)
+    overlay.prebuild(QSize(320, 240))
+    overlay.setGeometry(window.rect())
+    painted = []
+
+    overlay.show_emergency({'type': 'Alert', 'title': 'Fire', 'message': 'Leave'}, painted.append)
+    # The window is not on screen yet, so nothing has been painted
+    assert painted == []
+
+    shown = time.monotonic()
+    window.show()
+    deadline = time.monotonic() + 5
+    while not painted and time.monotonic() < deadline:
+        app.processEvents()
+    assert len(painted) == 1
+    assert painted[0] >= shown
+
+    # Flashing repaints do not report again
+    overlay._flash()
+    overlay.repaint()
+    assert len(painted) == 1
+    overlay.clear()
+    window.close()
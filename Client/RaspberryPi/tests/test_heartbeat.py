@@ -0,0 +1,53 @@
+"""Heartbeat metrics deltas against a stand-in server that acknowledges like SecureWebSocketServer"""
+
+import asyncio
+
+import websockets
+
+from conftest import client_message, run_session, server_frame
+from metrics import MetricsRegistry
+
+
+def test_heartbeat_sends_delta_after_ack(make_client):
+    heartbeats = []
+    counter = {'value': 0}
+
+    def playback():
+        counter['value'] += 1
+        return {'played': counter['value']}
+
+    async def server(websocket):
+        await websocket.recv()
+        await websocket.send(server_frame('REGISTER', {'success': True, 'resumeToken': 'token-1'}))
+        while len(heartbeats) < 3:
+            message = client_message(await websocket.recv())
+            if message['type'] != 'HEARTBEAT':
+                continue
+            metrics = message['data']['metrics']
+            heartbeats.append(metrics)
+            if len(heartbeats) == 1:
+                # Only the first snapshot is acknowledged, as HandleHeartbeatAsync does once applied
+                await websocket.send(server_frame('HEARTBEAT_ACK', {'metricsId': metrics['id']}, client_id='c1'))
+
+    async def scenario():
+        async with websockets.serve(server, '127.0.0.1', 0) as stand_in:
+            port = stand_in.sockets[0].getsockname()[1]
+            instance = make_client(f'ws://127.0.0.1:{port}')
+            instance.config['heartbeatInterval'] = 0.1
+            instance.metrics = MetricsRegistry()
+            instance.metrics.register('device', lambda: {'model': 'Pi 4', 'memory': 4096})
+            instance.metrics.register('playback', playback)
+            await run_session(instance, instance.send_heartbeat)
+            return instance
+
+    instance = asyncio.run(scenario())
+
+    full, first_delta, second_delta = heartbeats
+    assert full['base'] is None
+    assert set(full['values']) == {'device.model', 'device.memory', 'playback.played'}
+    # Both later heartbeats build on the acknowledged snapshot, not on each other
+    assert instance.metrics.acked_id == full['id']
+    assert first_delta['base'] == full['id']
+    assert first_delta['values'] == {'playback.played': 2}
+    assert second_delta['base'] == full['id']
+    assert second_delta['values'] == {'playback.played': 3}
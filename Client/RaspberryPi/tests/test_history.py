@@ -0,0 +1,88 @@
+"""Sampled metrics history and the cached JSON answers of the web UI"""
+
+import gzip
+import json
+
+import pytest
+
+import web_ui
+from sampler import HistoryRing
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(web_ui, '_response_cache', {})
+    return web_ui.app.test_client()
+
+
+def test_history_averages_buckets_and_skips_nan():
+    ring = HistoryRing(fields=('cpu', 'temp'), capacity=10)
+    ring.append(100, {'cpu': 10.0, 'temp': 40.0})
+    ring.append(105, {'cpu': 20.0, 'temp': None})
+    ring.append(110, {'cpu': 30.0, 'temp': None})
+    ring.append(125, {'cpu': float('nan'), 'temp': 50.0})
+
+    result = ring.query(since=100, until=130, step=10)
+
+    assert result['step'] == 10
+    assert result['timestamps'] == [100, 110, 120]
+    assert result['cpu'] == [15.0, 30.0, None]
+    assert result['temp'] == [40.0, None, 50.0]
+    assert ring.query(since=100, until=130, step=10, fields=['temp', 'unknown']) == \
+        {'step': 10, 'timestamps': [100, 110, 120], 'temp': [40.0, None, 50.0]}
+
+
+def test_history_wraps_around_keeping_the_newest():
+    ring = HistoryRing(fields=('cpu',), capacity=4)
+    for n in range(7):
+        ring.append(1000 + 5 * n, {'cpu': float(n)})
+
+    result = ring.query(since=0, until=2000, step=5)
+
+    assert ring.count == 4
+    assert result['timestamps'] == [1015, 1020, 1025, 1030]
+    assert result['cpu'] == [3.0, 4.0, 5.0, 6.0]
+    assert ring.query(since=1021, until=1029, step=5)['cpu'] == [5.0]
+
+
+def test_cached_json_answers_304_for_a_matching_etag(client):
+    first = client.get('/api/metrics/history?since=0&until=3600&step=60')
+    assert first.status_code == 200
+    etag = first.headers['ETag']
+
+    again = client.get('/api/metrics/history?since=0&until=3600&step=60', headers={'If-None-Match': etag})
+
+    assert again.status_code == 304
+    assert again.data == b''
+    assert again.headers['ETag'] == etag
+
+
+def test_cached_json_gzips_large_bodies_only(client):
+    small = {'ok': True}
+    large = {'values': list(range(web_ui.GZIP_MIN_BYTES))}
+
+    with web_ui.app.test_request_context(headers={'Accept-Encoding': 'gzip'}):
+        plain = web_ui.cached_json('small', lambda: small)
+        compressed = web_ui.cached_json('large', lambda: large)
+
+    assert 'Content-Encoding' not in plain.headers
+    assert json.loads(plain.get_data()) == small
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    assert json.loads(gzip.decompress(compressed.get_data())) == large
+    assert compressed.headers['Vary'] == 'Accept-Encoding'
+
+
+def test_default_history_query_reuses_the_cache(client, monkeypatch):
+    calls = []
+    monkeypatch.setattr(web_ui.sampler.history, 'query', lambda *args: calls.append(args) or {'timestamps': []})
+    clock = {'now': 1_000_000.0}
+    monkeypatch.setattr(web_ui.time, 'time', lambda: clock['now'])
+
+    assert client.get('/api/metrics/history').status_code == 200
+    clock['now'] += 1.3  # The next poll, with a different default since
+    assert client.get('/api/metrics/history').status_code == 200
+
+    assert len(calls) == 1
+    since, until, step, fields = calls[0]
+    assert since % step == 0
+    assert (until, fields) == (None, None)
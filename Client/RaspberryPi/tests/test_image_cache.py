@@ -0,0 +1,104 @@
+"""Decoded image cache: a preload still decoding never blocks the GUI thread"""
+
+import threading
+import time
+
+import pytest
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QImage
+from PyQt5.QtWidgets import QApplication
+
+from display_engine import ContentDisplay, ImageCache
+
+SIZE = (64, 48)
+
+
+@pytest.fixture
+def app():
+    return QApplication.instance() or QApplication([])
+
+
+@pytest.fixture
+def images(tmp_path):
+    paths = []
+    for name, color in (('red', Qt.red), ('blue', Qt.blue)):
+        image = QImage(32, 32, QImage.Format_RGB32)
+        image.fill(color)
+        path = str(tmp_path / f'{name}.png')
+        image.save(path)
+        paths.append(path)
+    return paths
+
+
+@pytest.fixture
+def slow_decode(monkeypatch):
+    """Hold every worker-thread decode until the returned event is set"""
+    release = threading.Event()
+    decode = ImageCache._decode
+
+    def held(path, size):
+        if threading.current_thread().name.startswith('decode'):
+            release.wait(5)
+        return decode(path, size)
+
+    monkeypatch.setattr(ImageCache, '_decode', staticmethod(held))
+    yield release
+    release.set()
+
+
+def test_pending_preload_is_not_a_hit_and_does_not_wait(images, slow_decode):
+    cache = ImageCache()
+    ready = []
+    done = threading.Event()
+    cache.preload(images[0], SIZE)
+
+    began = time.monotonic()
+    image = cache.get(images[0], SIZE, on_ready=lambda decoded: (ready.append(decoded), done.set()))
+    waited = time.monotonic() - began
+
+    assert image is None
+    assert waited < 0.5
+    slow_decode.set()
+    assert done.wait(5)
+    assert ready[0].size().width() == SIZE[0]
+
+    assert cache.get(images[0], SIZE) is not None
+    stats = cache.stats()
+    assert (stats['hits'], stats['pending'], stats['misses']) == (1, 1, 0)
+    assert stats['hitRate'] == 0.5
+
+
+def test_previous_frame_stays_until_preload_finishes(app, images, slow_decode):
+    display = ContentDisplay(ImageCache())
+    display.resize(*SIZE)
+    display.show_image(images[0])
+    first = display._frame
+    assert first is not None
+
+    display.preload_image(images[1])
+    display.show_image(images[1])
+    assert display._frame is first
+
+    slow_decode.set()
+    deadline = time.monotonic() + 5
+    while display._frame is first and time.monotonic() < deadline:
+        app.processEvents()
+        time.sleep(0.01)
+    assert display._frame is not first
+    assert display._frame.toImage().pixelColor(SIZE[0] // 2, SIZE[1] // 2) == Qt.blue
+
+
+def test_late_preload_is_ignored_after_something_else_is_shown(app, images, slow_decode):
+    display = ContentDisplay(ImageCache())
+    display.resize(*SIZE)
+    display.preload_image(images[1])
+    display.show_image(images[1])
+    display.show_message('Hello')
+
+    slow_decode.set()
+    deadline = time.monotonic() + 1
+    while time.monotonic() < deadline:
+        app.processEvents()
+        time.sleep(0.01)
+    assert display._frame is None
+    assert display.text() == 'Hello'
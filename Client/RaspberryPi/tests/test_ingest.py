@@ -0,0 +1,96 @@
+"""Ingest pipeline: the receive loop never waits on the ingest queue"""
+
+import asyncio
+import base64
+
+import websockets
+
+import client
+from conftest import client_message, run_session, server_frame
+
+
+def test_full_queue_drops_and_requests_again(tmp_path):
+    requested = []
+
+    async def request_again(content_ids):
+        requested.append(content_ids)
+
+    async def scenario():
+        pipeline = client.IngestPipeline(client.ContentCache(tmp_path / 'content', max_bytes=1024 * 1024),
+                                         request_again, workers=1, depth=1)
+        release = asyncio.Event()
+
+        async def blocked():
+            await release.wait()
+
+        async def noop():
+            pass
+
+        assert pipeline.submit(blocked, 'a')
+        await asyncio.sleep(0)  # The worker takes 'a', leaving the queue empty
+        assert pipeline.submit(noop, 'b')
+        assert not pipeline.submit(noop, 'c')
+        assert not pipeline.submit(noop, 'c')
+        release.set()
+        await asyncio.wait_for(pipeline.queue.join(), 1)
+        await asyncio.sleep(0)
+        return pipeline
+
+    pipeline = asyncio.run(scenario())
+
+    assert pipeline.stats()['dropped'] == 2
+    assert requested == [['c']]
+    assert pipeline.deferred == []
+
+
+def test_emergency_is_not_stuck_behind_content(make_client):
+    requests = []
+    release = asyncio.Event()
+
+    async def server(websocket):
+        await websocket.recv()  # REGISTER
+        for seq in range(1, 6):
+            await websocket.send(server_frame('CONTENT_UPDATE', {
+                'contentId': f'c{seq}', 'name': f'c{seq}.txt', 'type': 'Text',
+                'mimeType': 'text/plain', 'data': base64.b64encode(b'x').decode()
+            }, seq=seq))
+        await websocket.send(server_frame('EMERGENCY_BROADCAST', {
+            'id': 'e1', 'title': 'Fire', 'message': 'Leave the building'
+        }, seq=6))
+        while not requests:
+            message = client_message(await websocket.recv())
+            if message['type'] == 'CONTENT_REQUEST':
+                requests.extend(message['data']['contentIds'])
+
+    async def scenario():
+        async with websockets.serve(server, '127.0.0.1', 0) as stand_in:
+            port = stand_in.sockets[0].getsockname()[1]
+            instance = make_client(f'ws://127.0.0.1:{port}')
+            instance.ingest = client.IngestPipeline(instance.content_cache, instance.request_content,
+                                                    workers=1, depth=1)
+            submit = instance.ingest.submit
+
+            def held_submit(job, content_id=None):
+                # Every ingest job stalls until the emergency has been handled
+                async def held():
+                    await release.wait()
+                    await job()
+                return submit(held, content_id)
+
+            instance.ingest.submit = held_submit
+
+            async def release_after_emergency():
+                while not instance.active_emergency:
+                    await asyncio.sleep(0.01)
+                release.set()
+
+            await asyncio.wait_for(run_session(instance, release_after_emergency), 10)
+            return instance
+
+    instance = asyncio.run(scenario())
+
+    assert instance.active_emergency['id'] == 'e1'
+    # With one worker and one queue slot, at least three of the five updates overflowed
+    assert instance.ingest.dropped >= 3
+    assert len(requests) == instance.ingest.dropped
+    assert set(requests) <= {'c2', 'c3', 'c4', 'c5'}
@@ -0,0 +1,60 @@
+"""Live state shared with the web UI, in-process and over the Unix socket"""
+
+import asyncio
+import threading
+
+from live_state import LiveState, read_state
+
+
+def test_state_round_trips_over_the_socket(tmp_path):
+    path = str(tmp_path / 'state.sock')
+    state = LiveState()
+    calls = []
+
+    def playlist():
+        calls.append(threading.current_thread().name)
+        return {'items': 3, 'index': 1}
+
+    async def scenario():
+        state.attach(asyncio.get_running_loop())
+        state.publish(connected=True, currentItem={'contentId': 'a', 'type': 'image'})
+        state.provide('playlist', playlist)
+        state.provide('broken', lambda: 1 / 0)
+        server = await state.serve(path)
+        try:
+            # The web UI reads from its own process, i.e. a blocking socket off the loop
+            return await asyncio.get_running_loop().run_in_executor(None, read_state, path)
+        finally:
+            server.close()
+            await server.wait_closed()
+
+    snapshot = asyncio.run(scenario())
+
+    assert snapshot == {
+        'connected': True,
+        'currentItem': {'contentId': 'a', 'type': 'image'},
+        'stateVersion': 1,
+        'playlist': {'items': 3, 'index': 1},
+        'broken': None
+    }
+    assert calls == [threading.main_thread().name]
+
+
+def test_providers_run_only_when_read_and_on_the_client_loop(tmp_path):
+    state = LiveState()
+    calls = []
+    state.provide('metrics', lambda: calls.append(threading.current_thread().name) or len(calls))
+
+    async def scenario():
+        state.attach(asyncio.get_running_loop())
+        state.publish(connected=False)
+        state.publish(connected=True)
+        assert calls == []
+        # As a web UI request thread in the same process
+        return await asyncio.get_running_loop().run_in_executor(None, state.snapshot)
+
+    snapshot = asyncio.run(scenario())
+
+    assert snapshot == {'connected': True, 'stateVersion': 2, 'metrics': 1}
+    assert calls == [threading.main_thread().name]
+    assert read_state(str(tmp_path / 'missing.sock')) is None
@@ -0,0 +1,120 @@
+"""Client log records: ring queries, log file tails across rotation, and /api/logs"""
+
+import logging
+
+import pytest
+
+import log_store
+import web_ui
+from log_store import LOG_FORMAT, LogRing, read_log_file
+
+
+@pytest.fixture
+def ring():
+    handler = LogRing(capacity=5)
+    logger = logging.getLogger('test.ring')
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    logger.addHandler(handler)
+    yield handler, logger
+    logger.removeHandler(handler)
+
+
+def write_records(path, *records, mode='a'):
+    handler = logging.FileHandler(path, mode=mode)
+    handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    logger = logging.getLogger('test.file')
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    logger.addHandler(handler)
+    try:
+        for level, message in records:
+            logger.log(level, message)
+    finally:
+        logger.removeHandler(handler)
+        handler.close()
+
+
+def test_ring_query_by_cursor_level_and_text(ring):
+    handler, logger = ring
+    logger.info('player started')
+    logger.warning('Connection timeout')
+    entries, cursor = handler.query()
+    assert [entry['message'] for entry in entries] == ['player started', 'Connection timeout']
+    assert cursor == 2
+
+    logger.debug('tick')
+    logger.error('upload timeout')
+    entries, cursor = handler.query(since=cursor)
+    assert [entry['seq'] for entry in entries] == [3, 4]
+    assert cursor == 4
+
+    assert [entry['message'] for entry in handler.query(level='warning')[0]] == \
+        ['Connection timeout', 'upload timeout']
+    assert [entry['message'] for entry in handler.query(text='TIMEOUT', level='ERROR')[0]] == ['upload timeout']
+    # Logger names match too
+    assert len(handler.query(text='test.ring')[0]) == 4
+    assert [entry['seq'] for entry in handler.query(limit=1)[0]] == [4]
+
+
+def test_ring_wraps_around_and_keeps_numbering(ring):
+    handler, logger = ring
+    for n in range(8):
+        logger.info(f'record {n}')
+
+    entries, cursor = handler.query()
+    assert cursor == 8
+    assert [entry['message'] for entry in entries] == [f'record {n}' for n in range(3, 8)]
+    assert [entry['seq'] for entry in entries] == [4, 5, 6, 7, 8]
+    # A reader whose cursor fell off the end gets what is left
+    assert [entry['seq'] for entry in handler.query(since=2)[0]] == [4, 5, 6, 7, 8]
+    assert handler.query(since=8) == ([], 8)
+    assert not handler.wait(8, 0.01)
+
+
+def test_read_log_file_follows_offset_across_rotation(tmp_path):
+    path = str(tmp_path / 'client.log')
+    write_records(path, (logging.INFO, 'first'), (logging.WARNING, 'second'))
+
+    entries, offset = read_log_file(path)
+    assert [(entry['level'], entry['message']) for entry in entries] == [('INFO', 'first'), ('WARNING', 'second')]
+    assert entries[-1]['seq'] == offset
+
+    write_records(path, (logging.ERROR, 'third'))
+    entries, offset = read_log_file(path, since=offset)
+    assert [entry['message'] for entry in entries] == ['third']
+
+    # RotatingFileHandler renamed the file and started a new, shorter one
+    (tmp_path / 'client.log').rename(tmp_path / 'client.log.1')
+    write_records(path, (logging.INFO, 'after rotation'), mode='w')
+    entries, new_offset = read_log_file(path, since=offset)
+    assert [entry['message'] for entry in entries] == ['after rotation']
+    assert new_offset < offset
+    assert read_log_file(path, since=new_offset) == ([], new_offset)
+
+
+def test_read_log_file_joins_continuation_lines_and_skips_partial_line(tmp_path):
+    path = tmp_path / 'client.log'
+    write_records(str(path), (logging.ERROR, 'failed\nTraceback line'), (logging.INFO, 'ok'))
+    with open(path, 'a') as f:
+        f.write('2026-01-01 00:00:00,000 - client - INFO - half writ')
+
+    entries, offset = read_log_file(str(path), level='ERROR')
+    assert [entry['message'] for entry in entries] == ['failed\nTraceback line']
+    assert offset == path.stat().st_size - len('2026-01-01 00:00:00,000 - client - INFO - half writ')
+    assert read_log_file(str(tmp_path / 'missing.log')) == ([], 0)
+
+
+def test_api_logs_reads_the_file_without_a_ring(tmp_path, monkeypatch):
+    path = str(tmp_path / 'client.log')
+    monkeypatch.setattr(web_ui, 'LOG_FILE', path)
+    write_records(path, (logging.INFO, 'hello'), (logging.WARNING, 'disk low'))
+    # As when the web UI runs as its own service, without the client's logging
+    root = logging.getLogger()
+    monkeypatch.setattr(root, 'handlers', [h for h in root.handlers if h is not log_store.log_ring])
+
+    client = web_ui.app.test_client()
+    body = client.get('/api/logs?level=warning').get_json()
+    assert [entry['message'] for entry in body['entries']] == ['disk low']
+    assert client.get(f"/api/logs?since={body['cursor']}").get_json()['entries'] == []
+    assert client.get('/api/logs?since=abc').status_code == 400
@@ -0,0 +1,43 @@
+"""Outbound queue priorities and drop rules"""
+
+import asyncio
+
+import client
+from client import PRIORITY_CONTROL, OutboundQueue
+
+
+def test_ack_is_control_and_never_dropped_or_coalesced(make_client):
+    instance = make_client()
+    instance.outbound = OutboundQueue(control_depth=2, put_timeout=0.01)
+
+    async def scenario():
+        for seq in (16, 32):
+            instance.last_seq = seq
+            await instance.send_ack()
+        # The control queue is full; further control messages push out the oldest droppable one
+        for i in range(3):
+            await instance.send_message({'type': 'CONTENT_REQUEST', 'data': {'contentIds': [str(i)]}})
+        return [await instance.outbound.get() for _ in range(len(instance.outbound.queues[PRIORITY_CONTROL]))]
+
+    sent = asyncio.run(scenario())
+
+    assert [message['data']['seq'] for message in sent if message['type'] == 'ACK'] == [16, 32]
+    assert [message['type'] for message in sent[:2]] == ['ACK', 'ACK']
+    assert instance.outbound.stats()['control']['coalesced'] == 0
+    assert instance.outbound.stats()['telemetry']['sent'] == 0
+
+
+def test_control_overflow_drops_oldest_droppable_message():
+    queue = OutboundQueue(control_depth=2, put_timeout=0.01)
+
+    async def scenario():
+        await queue.put({'type': 'CONTENT_REQUEST', 'data': {'n': 1}})
+        await queue.put({'type': 'ACK', 'data': {'seq': 16}})
+        await queue.put({'type': 'CONTENT_REQUEST', 'data': {'n': 2}})
+        return [await queue.get() for _ in range(2)]
+
+    sent = asyncio.run(scenario())
+
+    assert sent == [{'type': 'ACK', 'data': {'seq': 16}}, {'type': 'CONTENT_REQUEST', 'data': {'n': 2}}]
+    assert queue.stats()['control']['dropped'] == 1
+    assert client.OutboundQueue.classify({'type': 'ACK'}) == (PRIORITY_CONTROL, None)
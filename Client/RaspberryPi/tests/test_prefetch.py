@@ -0,0 +1,70 @@
+"""Prefetch against a stand-in server that answers CONTENT_REQUEST like ContentService"""
+
+import asyncio
+import base64
+import hashlib
+import io
+
+import websockets
+from PIL import Image
+
+from conftest import client_message, run_session, server_frame
+
+
+
+def png(shade):
+    buffer = io.BytesIO()
+    Image.new('RGB', (8, 8), (shade, shade, shade)).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+LIBRARY = {f'clip-{i}': png(i * 80) for i in range(3)}
+
+
+def test_prefetch_requests_missing_content_until_ready(make_client):
+    requests = []
+    readiness = []
+
+    async def server(websocket):
+        await websocket.recv()
+        await websocket.send(server_frame('REGISTER', {'success': True, 'resumeToken': 'token-1'}))
+        await websocket.send(server_frame('PLAYLIST_UPDATE', {'playlist': {
+            'items': [{'contentId': content_id, 'duration': 10} for content_id in LIBRARY]
+        }}, seq=1))
+        seq = 1
+        try:
+            while True:
+                message = client_message(await asyncio.wait_for(websocket.recv(), 2))
+                data = message.get('data') or {}
+                if message['type'] == 'CONTENT_REQUEST':
+                    requests.append(data['contentIds'])
+                    for content_id in data['contentIds']:
+                        seq += 1
+                        await websocket.send(server_frame('CONTENT_UPDATE', {
+                            'contentId': content_id, 'name': f'{content_id}.png', 'type': 'Image',
+                            'mimeType': 'image/png', 'duration': 10,
+                            'sha256': hashlib.sha256(LIBRARY[content_id]).hexdigest(),
+                            'data': base64.b64encode(LIBRARY[content_id]).decode('ascii')
+                        }, seq=seq))
+                elif message['type'] == 'STATUS' and data.get('status') == 'playlist_readiness':
+                    readiness.append(data['state'])
+                    if data['state'] == 'ready':
+                        return
+        except asyncio.TimeoutError:
+            pass
+
+    async def scenario():
+        async with websockets.serve(server, '127.0.0.1', 0) as stand_in:
+            port = stand_in.sockets[0].getsockname()[1]
+            instance = make_client(f'ws://127.0.0.1:{port}')
+            instance.prefetcher.concurrency = 2
+            await run_session(instance)
+            return instance
+
+    instance = asyncio.run(scenario())
+
+    # At most ``concurrency`` requests in flight; the rest follow as content arrives
+    assert len(requests[0]) == 2
+    assert sorted(sum(requests, [])) == sorted(LIBRARY)
+    assert readiness[0] == 'loading' and readiness[-1] == 'ready'
+    assert all(instance.content_cache.has_content(content_id) for content_id in LIBRARY)
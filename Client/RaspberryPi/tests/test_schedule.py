@@ -0,0 +1,77 @@
+"""Schedule index: slot timing and campaign formats"""
+
+from datetime import datetime, timedelta
+
+from schedule import MIN_SLOT_SECONDS, ScheduleIndex, slot_duration
+
+
+def midnight(days=0):
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    return (today + timedelta(days=days)).timestamp()
+
+
+def test_zero_durations_still_advance():
+    index = ScheduleIndex([{'items': [
+        {'contentId': 'a', 'duration': 0},
+        {'contentId': 'b', 'duration': None}
+    ]}], midnight())
+
+    item, slot_start, slot_end = index.item_at(midnight() + 0.5)
+
+    assert item['contentId'] == 'a'
+    assert slot_end - slot_start == MIN_SLOT_SECONDS
+    # A missing duration is the default slot, not zero
+    assert index.item_at(midnight() + 1.5)[0]['contentId'] == 'b'
+
+
+def test_slot_duration_matches_scheduler_minimum():
+    assert slot_duration({'duration': 0}) == MIN_SLOT_SECONDS
+    assert slot_duration({'duration': 0.2}) == MIN_SLOT_SECONDS
+    assert slot_duration({'duration': 15}) == 15
+
+
+def test_weighted_items_are_spread_through_cycle():
+    index = ScheduleIndex([{'items': [
+        {'contentId': 'a', 'duration': 10, 'weight': 2},
+        {'contentId': 'b', 'duration': 10}
+    ]}], midnight())
+
+    played = [item['contentId'] for item in index.upcoming(midnight(), 6, 0)]
+
+    assert played == ['a', 'b', 'a', 'a', 'b', 'a']
+
+
+def test_higher_priority_daypart_wins_overlap():
+    index = ScheduleIndex([
+        {'id': 'all-day', 'items': [{'contentId': 'base'}]},
+        {'id': 'lunch', 'priority': 'High', 'startTime': '11:30', 'endTime': '13:30',
+         'items': [{'contentId': 'lunch-promo'}]}
+    ], midnight())
+
+    assert index.segment_at(midnight() + 11 * 3600).campaign.id == 'all-day'
+    assert index.segment_at(midnight() + 12 * 3600).campaign.id == 'lunch'
+    assert index.next_change(midnight() + 12 * 3600) == midnight() + 13.5 * 3600
+
+
+def test_server_playlist_schedule_names_are_understood():
+    weekday = datetime.fromtimestamp(midnight()).weekday()
+    # DayOfWeek numbering: Sunday = 0
+    tomorrow = (weekday + 2) % 7
+    playlist = {
+        'Id': 'evening',
+        'Items': [{'Order': 0, 'ContentId': 'evening-loop', 'Duration': 20}],
+        'Schedule': {
+            'StartTime': '18:00:00',
+            'EndTime': '22:00:00',
+            'ActiveDays': [tomorrow],
+            'Priority': 100
+        }
+    }
+    index = ScheduleIndex([{'id': 'base', 'items': [{'contentId': 'base'}]}, playlist], midnight())
+
+    assert index.segment_at(midnight() + 19 * 3600).campaign.id == 'base'
+    segment = index.segment_at(midnight(1) + 19 * 3600)
+    assert segment.campaign.id == 'evening'
+    assert segment.campaign.priority == 100
+    assert index.item_at(midnight(1) + 19 * 3600)[0]['contentId'] == 'evening-loop'
+    assert index.content_ids() == {'base', 'evening-loop'}
@@ -0,0 +1,95 @@
+"""Session resume against a stand-in server that replays like SecureWebSocketServer"""
+
+import asyncio
+import json
+
+import websockets
+
+import client
+from conftest import client_message, run_session, server_frame
+
+
+def test_resume_replays_missed_messages_once(make_client):
+    sent = {}  # seq -> frame, the server's replay buffer
+    registrations = []
+    acks = []
+
+    def numbered(seq):
+        frame = server_frame('OVERLAY_UPDATE', {'id': f'overlay-{seq}'}, seq=seq)
+        sent[seq] = frame
+        return frame
+
+    async def server(websocket):
+        registration = client_message(await websocket.recv())
+        registrations.append(registration)
+        resume = registration['data'].get('resume')
+        resumed = bool(resume and resume['token'] == 'token-1')
+        await websocket.send(server_frame('REGISTER', {
+            'success': True, 'clientId': 'c1', 'resumeToken': 'token-1', 'resumed': resumed, 'lastSeq': len(sent)
+        }))
+        if not resumed:
+            # 1-18 arrive, 19 and 20 are "lost" with the connection
+            for seq in range(1, 21):
+                frame = numbered(seq)
+                if seq <= 18:
+                    await websocket.send(frame)
+        else:
+            # Replay from a little before the client's lastSeq; the overlap must be ignored
+            for seq in range(resume['lastSeq'] - 1, 21):
+                await websocket.send(sent[seq])
+        try:
+            while True:
+                message = client_message(await asyncio.wait_for(websocket.recv(), 0.5))
+                if message['type'] == 'ACK':
+                    acks.append(message['data']['seq'])
+        except (asyncio.TimeoutError, websockets.ConnectionClosed):
+            pass
+
+    async def scenario():
+        async with websockets.serve(server, '127.0.0.1', 0) as stand_in:
+            port = stand_in.sockets[0].getsockname()[1]
+            instance = make_client(f'ws://127.0.0.1:{port}')
+            handled = []
+
+            async def handle_overlay_update(message):
+                handled.append(int(message['data']['id'].split('-')[1]))
+            instance.handle_overlay_update = handle_overlay_update
+
+            await run_session(instance)
+            assert instance.resume_token == 'token-1'
+            assert instance.last_seq == 18
+            await run_session(instance)
+            return instance, handled
+
+    instance, handled = asyncio.run(scenario())
+
+    assert registrations[0]['data'].get('resume') is None
+    assert registrations[1]['data']['resume'] == {'token': 'token-1', 'lastSeq': 18}
+    assert handled == list(range(1, 21))
+    assert instance.last_seq == 20
+    # Acknowledged after every SEQ_ACK_EVERY messages, in the server's envelope format
+    assert acks and acks[0] == client.SEQ_ACK_EVERY
+
+
+def test_new_session_resets_sequence(make_client):
+    async def server(websocket):
+        await websocket.recv()
+        await websocket.send(server_frame('REGISTER', {'success': True, 'resumeToken': 'token-2', 'resumed': False}))
+
+    async def scenario():
+        async with websockets.serve(server, '127.0.0.1', 0) as stand_in:
+            port = stand_in.sockets[0].getsockname()[1]
+            instance = make_client(f'ws://127.0.0.1:{port}')
+            instance.resume_token, instance.last_seq, instance.acked_seq = 'expired', 40, 32
+            await run_session(instance)
+            return instance
+
+    instance = asyncio.run(scenario())
+    assert instance.resume_token == 'token-2'
+    assert (instance.last_seq, instance.acked_seq) == (0, 0)
+
+
+def test_reconnect_delay_stays_within_cap_after_long_outage():
+    for attempt in (0, 5, 1023, 1024, 10_000):
+        delay = client.reconnect_delay(attempt, 5.0, 60)
+        assert 1 <= delay <= 60
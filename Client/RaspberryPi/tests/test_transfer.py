@@ -0,0 +1,84 @@
+"""Chunked content transfers: acknowledged offsets and resume"""
+
+import hashlib
+import uuid
+
+import pytest
+
+import client
+
+TRANSFER_ID = str(uuid.UUID(int=1))
+DATA = bytes(range(256)) * 64  # 16 KB
+
+
+def frame(offset, payload):
+    return client.TRANSFER_FRAME_HEADER.pack(uuid.UUID(TRANSFER_ID).bytes, offset) + payload
+
+
+@pytest.fixture
+def transfers(tmp_path):
+    return client.TransferManager(client.ContentCache(tmp_path / 'content', max_bytes=1024 * 1024))
+
+
+def start(transfers):
+    return transfers.start({
+        'transferId': TRANSFER_ID, 'contentId': 'clip', 'size': len(DATA),
+        'sha256': hashlib.sha256(DATA).hexdigest(), 'mimeType': 'video/mp4'
+    })
+
+
+def test_out_of_order_chunk_acks_contiguous_offset(transfers):
+    transfer = start(transfers)
+    transfers.write_frame(frame(0, DATA[:4096]))
+    transfers.write_frame(frame(4096, DATA[4096:8192]))
+
+    _, ack_due = transfers.write_frame(frame(12288, DATA[12288:]))
+
+    assert ack_due
+    assert transfer.acked == transfer.received == 8192
+    assert transfers.content_cache.manifest.get_transfer(TRANSFER_ID)[1] == 8192
+    # A repeated chunk is ignored without another ack
+    assert transfers.write_frame(frame(4096, DATA[4096:8192])) == (transfer, False)
+
+
+def test_resume_continues_from_acknowledged_offset(transfers):
+    transfer = start(transfers)
+    transfers.write_frame(frame(0, DATA[:8192]))
+    transfers.suspend()
+
+    transfer = start(transfers)
+    assert transfer.received == 8192
+    transfers.write_frame(frame(8192, DATA[8192:]))
+
+    assert transfer.complete
+    path = transfers.finish(transfer)
+    assert open(path, 'rb').read() == DATA
+
+
+def test_short_partial_file_restarts_from_disk_size(transfers):
+    start(transfers)
+    transfers.write_frame(frame(0, DATA[:8192]))
+    transfers.suspend()
+    partial = transfers.incoming_dir / f'{TRANSFER_ID}.partial'
+    with open(partial, 'r+b') as f:
+        f.truncate(5000)  # e.g. lost on power failure despite the manifest
+
+    transfer = start(transfers)
+
+    assert transfer.received == transfer.acked == 5000
+    assert partial.stat().st_size == 5000
+    assert transfers.content_cache.manifest.get_transfer(TRANSFER_ID)[1] == 5000
+    transfers.write_frame(frame(5000, DATA[5000:]))
+    assert transfer.hexdigest() == hashlib.sha256(DATA).hexdigest()
+
+
+def test_missing_partial_file_restarts_from_zero(transfers):
+    start(transfers)
+    transfers.write_frame(frame(0, DATA[:8192]))
+    transfers.suspend()
+    (transfers.incoming_dir / f'{TRANSFER_ID}.partial').unlink()
+
+    transfer = start(transfers)
+
+    assert transfer.received == 0
+    assert (transfers.incoming_dir / f'{TRANSFER_ID}.partial').stat().st_size == 0
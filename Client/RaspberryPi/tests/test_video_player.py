@@ -0,0 +1,95 @@
+"""VideoEngine must never block the GUI thread on mpv"""
+
+import threading
+import time
+
+import video_player
+from video_player import VideoEngine
+
+SLOW_START = 0.5  # Seconds the fake mpv takes to create its IPC socket
+
+
+class FakeMpv:
+    """Records IPC traffic; starting and every reply are slow, like a busy Pi"""
+
+    log = []
+
+    def __init__(self, window_id, on_event=None):
+        self.window_id = window_id
+
+    def start(self):
+        time.sleep(SLOW_START)
+
+    def send(self, *args):
+        self.log.append((self.window_id, threading.current_thread().name) + args)
+
+    def get_property(self, name, default=None):
+        raise AssertionError('VideoEngine must not wait on property reads')
+
+    def stop(self):
+        pass
+
+
+class FakeSurface:
+    def __init__(self, window_id):
+        self.window_id = window_id
+
+    def winId(self):
+        return self.window_id
+
+
+def test_play_and_preroll_return_without_waiting_for_mpv(monkeypatch):
+    monkeypatch.setattr(video_player, 'MpvProcess', FakeMpv)
+    FakeMpv.log = []
+    shown = []
+    engine = VideoEngine([FakeSurface(1), FakeSurface(2)], shown.append)
+    engine.available = True
+
+    began = time.monotonic()
+    engine.start()
+    assert engine.play('/content/a.mp4')
+    engine.preroll('/content/b.mp4')
+    assert engine.play('/content/b.mp4')
+    engine.stop()
+    elapsed = time.monotonic() - began
+    engine.shutdown()
+
+    assert elapsed < SLOW_START / 2
+    assert [surface.window_id for surface in shown] == [1, 2]
+    commands = [entry[2:] for entry in FakeMpv.log if entry[2] != 'observe_property']
+    assert commands == [
+        ('set_property', 'pause', True), ('loadfile', '/content/a.mp4', 'replace'),
+        ('set_property', 'pause', False),
+        ('set_property', 'pause', True), ('loadfile', '/content/b.mp4', 'replace'),
+        ('set_property', 'pause', False),
+        ('set_property', 'pause', True), ('stop',),
+        ('set_property', 'pause', True), ('stop',),
+    ]
+    assert all(entry[1].startswith('video') for entry in FakeMpv.log)
+    assert engine.stats()['prerollHits'] == 1
+
+
+def test_drop_counters_come_from_observed_properties(monkeypatch):
+    monkeypatch.setattr(video_player, 'MpvProcess', FakeMpv)
+    FakeMpv.log = []
+    engine = VideoEngine([FakeSurface(1), FakeSurface(2)], lambda surface: None)
+    engine.available = True
+    engine.start()
+    assert engine.play('/content/a.mp4')
+    engine._executor.submit(lambda: None).result()  # Players started
+
+    player = engine.players[0]
+    observed = [entry[2:] for entry in FakeMpv.log if entry[0] == 1 and entry[2] == 'observe_property']
+    assert observed == [('observe_property', 1, 'frame-drop-count'),
+                        ('observe_property', 2, 'decoder-frame-drop-count')]
+    # mpv pushes each change from its reader thread
+    for name, value in (('frame-drop-count', 2), ('frame-drop-count', 5), ('decoder-frame-drop-count', None),
+                        ('decoder-frame-drop-count', 1)):
+        engine._on_event(player, {'event': 'property-change', 'id': 1, 'name': name, 'data': value})
+
+    assert engine.play('/content/b.mp4')
+    engine.shutdown()
+
+    stats = engine.stats()
+    assert stats['droppedFrames'] == 5
+    assert stats['decoderDroppedFrames'] == 1
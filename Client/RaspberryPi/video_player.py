@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+"""
+MakerScreen Video Player
+Plays video playlist items through mpv subprocesses embedded in the display,
+prerolling the next clip so items switch without a gap
+"""
+
+import json
+import os
+import shutil
+import socket
+import subprocess
+import tempfile
+import threading
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger('VideoPlayer')
+
+MPV_BINARY = 'mpv'
+MPV_STARTUP_TIMEOUT = 5  # Seconds to wait for the IPC socket
+MPV_COMMAND_TIMEOUT = 2  # Seconds to wait for a command reply
+DROP_COUNTERS = ('frame-drop-count', 'decoder-frame-drop-count')  # Observed on every player
+
+
+class MpvProcess:
+    """One mpv instance rendering into a native window, driven over JSON IPC
+
+    Decoding is forced to software (``--hwdec=no``) so behaviour is the same
+    on every Pi model. A reader thread dispatches replies and events; no Qt
+    objects are touched from it.
+    """
+
+    def __init__(self, window_id, on_event=None):
+        self.window_id = window_id
+        self.on_event = on_event
+        self.socket_path = os.path.join(
+            tempfile.gettempdir(), f'makerscreen-mpv-{os.getpid()}-{window_id}.sock'
+        )
+        self.process = None
+        self._socket = None
+        self._reader = None
+        self._request_id = 0
+        self._replies = {}
+        self._lock = threading.Lock()
+
+    def start(self):
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+        self.process = subprocess.Popen([
+            MPV_BINARY,
+            '--idle=yes',
+            '--pause',
+            '--keep-open=yes',
+            '--loop-file=inf',
+            '--hwdec=no',
+            '--no-audio-display',
+            '--no-osc',
+            '--no-input-default-bindings',
+            '--no-terminal',
+            f'--wid={self.window_id}',
+            f'--input-ipc-server={self.socket_path}'
+        ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+        deadline = time.monotonic() + MPV_STARTUP_TIMEOUT
+        while not os.path.exists(self.socket_path):
+            if time.monotonic() > deadline or self.process.poll() is not None:
+                raise RuntimeError('mpv did not start')
+            time.sleep(0.05)
+
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._socket.connect(self.socket_path)
+        self._reader = threading.Thread(target=self._read_loop, daemon=True)
+        self._reader.start()
+
+    def _read_loop(self):
+        buffer = b''
+        while True:
+            try:
+                data = self._socket.recv(4096)
+            except OSError:
+                break
+            if not data:
+                break
+            buffer += data
+            while b'\n' in buffer:
+                line, buffer = buffer.split(b'\n', 1)
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    continue
+                self._dispatch(message)
+
+    def _dispatch(self, message):
+        if 'request_id' in message:
+            with self._lock:
+                waiter = self._replies.get(message['request_id'])
+            if waiter:
+                waiter['reply'] = message
+                waiter['event'].set()
+        elif 'event' in message and self.on_event:
+            try:
+                self.on_event(self, message)
+            except Exception as e:
+                logger.error(f"Error handling mpv event: {e}")
+
+    def command(self, *args):
+        """Send a command and return its ``data`` (None on error or timeout)"""
+        if self._socket is None:
+            return None
+        with self._lock:
+            self._request_id += 1
+            request_id = self._request_id
+            waiter = {'event': threading.Event(), 'reply': None}
+            self._replies[request_id] = waiter
+        try:
+            payload = json.dumps({'command': list(args), 'request_id': request_id}) + '\n'
+            self._socket.sendall(payload.encode('utf-8'))
+            if not waiter['event'].wait(MPV_COMMAND_TIMEOUT):
+                return None
+            reply = waiter['reply']
+            return reply.get('data') if reply.get('error') == 'success' else None
+        except OSError as e:
+            logger.error(f"mpv IPC error: {e}")
+            return None
+        finally:
+            with self._lock:
+                self._replies.pop(request_id, None)
+
+    def send(self, *args):
+        """Send a command without waiting for its reply"""
+        if self._socket is None:
+            return
+        try:
+            payload = json.dumps({'command': list(args)}) + '\n'
+            self._socket.sendall(payload.encode('utf-8'))
+        except OSError as e:
+            logger.error(f"mpv IPC error: {e}")
+
+    def get_property(self, name, default=None):
+        value = self.command('get_property', name)
+        return default if value is None else value
+
+    def set_property(self, name, value):
+        return self.command('set_property', name, value)
+
+    def stop(self):
+        if self._socket is not None:
+            try:
+                self.command('quit')
+                self._socket.close()
+            except OSError:
+                pass
+            self._socket = None
+        if self.process is not None:
+            try:
+                self.process.wait(timeout=2)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+            self.process = None
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+
+
+class VideoEngine:
+    """Two alternating mpv players for gapless playlist video
+
+    While one player is on screen the other loads the next clip paused, so
+    its first frame is already decoded when the slot starts; switching is
+    then an unpause plus raising its surface. The time from load to first
+    decoded frame (preroll) and mpv's dropped-frame counters are collected.
+    The counters are observed, so mpv pushes changes as events and retiring
+    a player needs no round trip. mpv does not report per-frame decode
+    times over IPC; preroll is the decode cost that is measured.
+
+    The public methods are called on the Qt GUI thread and never wait on
+    mpv: starting the players and every IPC exchange run, in call order, on
+    a single worker thread. Which player holds which clip is decided on the
+    GUI thread when the call is made.
+    """
+
+    def __init__(self, surfaces, show_surface):
+        self.surfaces = surfaces
+        self.show_surface = show_surface
+        self.players = []
+        self.loaded = {}  # player index -> {'path', 'loaded_at', 'ready'}
+        self.drops = {}  # player index -> latest observed drop counters
+        self.current = None
+        self._started = False
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='video')
+        self._stats = {
+            'played': 0,
+            'prerollHits': 0,
+            'prerolls': 0,
+            'prerollTotalMs': 0.0,
+            'prerollMaxMs': 0.0,
+            'droppedFrames': 0,
+            'decoderDroppedFrames': 0
+        }
+        self.available = shutil.which(MPV_BINARY) is not None
+        if not self.available:
+            logger.warning("mpv not found; video items will be skipped")
+
+    def start(self):
+        """Spawn both players in the background, e.g. when the window is shown"""
+        self._ensure_started()
+
+    def _ensure_started(self):
+        if self._started or not self.available:
+            return self.available
+        self._started = True
+        # Native window IDs must be read on the GUI thread
+        window_ids = [int(surface.winId()) for surface in self.surfaces]
+        self._submit(self._start_players, window_ids)
+        return True
+
+    def _submit(self, job, *args):
+        future = self._executor.submit(job, *args)
+        future.add_done_callback(self._job_done)
+
+    @staticmethod
+    def _job_done(future):
+        if future.exception() is not None:
+            logger.error(f"Video backend error: {future.exception()}")
+
+    def _start_players(self, window_ids):
+        try:
+            for window_id in window_ids:
+                player = MpvProcess(window_id, self._on_event)
+                player.start()
+                self.players.append(player)
+                for observe_id, name in enumerate(DROP_COUNTERS, 1):
+                    player.send('observe_property', observe_id, name)
+        except Exception as e:
+            logger.error(f"Could not start video backend: {e}")
+            self._stop_players()
+            self.available = False
+
+    def _on_event(self, player, message):
+        index = self.players.index(player)
+        if message.get('event') == 'property-change':
+            if message.get('name') in DROP_COUNTERS and message.get('data') is not None:
+                with self._lock:
+                    self.drops.setdefault(index, {})[message['name']] = message['data']
+            return
+        # 'playback-restart' fires once the first frame after a load is ready
+        if message.get('event') != 'playback-restart':
+            return
+        with self._lock:
+            state = self.loaded.get(index)
+            if state and not state['ready']:
+                state['ready'] = True
+                preroll_ms = (time.monotonic() - state['loaded_at']) * 1000
+                self._stats['prerolls'] += 1
+                self._stats['prerollTotalMs'] += preroll_ms
+                self._stats['prerollMaxMs'] = max(self._stats['prerollMaxMs'], preroll_ms)
+
+    def _load(self, index, path):
+        with self._lock:
+            self.loaded[index] = {'path': path, 'loaded_at': time.monotonic(), 'ready': False}
+        self._submit(self._send_load, index, path)
+
+    def _send_load(self, index, path):
+        if index >= len(self.players):
+            return
+        with self._lock:
+            state = self.loaded.get(index)
+            if state and state['path'] == path:
+                # Preroll time starts when mpv is asked, not when queued
+                state['loaded_at'] = time.monotonic()
+        player = self.players[index]
+        player.send('set_property', 'pause', True)
+        player.send('loadfile', path, 'replace')
+
+    def _idle_index(self):
+        return 1 if self.current == 0 else 0
+
+    def preroll(self, path):
+        """Load ``path`` paused on the player that is not on screen"""
+        if not self._ensure_started():
+            return
+        index = self._idle_index()
+        state = self.loaded.get(index)
+        if state and state['path'] == path:
+            return
+        self._load(index, path)
+
+    def play(self, path):
+        """Show ``path``, using the prerolled player when it matches"""
+        if not self._ensure_started():
+            return False
+        index = self._idle_index()
+        state = self.loaded.get(index)
+        if state and state['path'] == path:
+            with self._lock:
+                self._stats['prerollHits'] += 1
+        else:
+            self._load(index, path)
+
+        self._submit(self._send_play, index)
+        self.show_surface(self.surfaces[index])
+        self._retire(self.current)
+        self.current = index
+        with self._lock:
+            self._stats['played'] += 1
+        return True
+
+    def _send_play(self, index):
+        if index < len(self.players):
+            self.players[index].send('set_property', 'pause', False)
+
+    def _retire(self, index):
+        """Pause the outgoing player and fold its drop counters into the stats"""
+        if index is None:
+            return
+        with self._lock:
+            self.loaded.pop(index, None)
+        self._submit(self._send_retire, index)
+
+    def _send_retire(self, index):
+        if index >= len(self.players):
+            return
+        player = self.players[index]
+        player.send('set_property', 'pause', True)
+        with self._lock:
+            drops = self.drops.pop(index, {})
+            self._stats['droppedFrames'] += drops.get('frame-drop-count', 0)
+            self._stats['decoderDroppedFrames'] += drops.get('decoder-frame-drop-count', 0)
+        player.send('stop')
+
+    def stop(self):
+        """Stop video playback, e.g. when an image slot starts"""
+        if self.current is not None:
+            self._retire(self.current)
+            self.current = None
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        total = stats.pop('prerollTotalMs')
+        stats['avgPrerollMs'] = round(total / stats['prerolls'], 1) if stats['prerolls'] else 0.0
+        stats['prerollMaxMs'] = round(stats['prerollMaxMs'], 1)
+        return stats
+
+    def shutdown(self):
+        """Stop both players once queued commands have been sent"""
+        try:
+            self._executor.submit(self._stop_players).result()
+        except RuntimeError:
+            pass  # Already shut down
+        self._executor.shutdown(wait=False)
+        self.loaded = {}
+        self.drops = {}
+        self.current = None
+
+    def _stop_players(self):
+        for player in self.players:
+            player.stop()
+        self.players = []
@@ -4,16 +4,25 @@ MakerScreen Local Web UI
 Provides a local web interface for client configuration and status
 """
 
-from flask import Flask, render_template_string, jsonify, request, redirect, url_for
+from flask import Flask, render_template_string, jsonify, request, redirect, url_for, send_file
+import gzip
+import hashlib
 import json
 import os
 import platform
 import psutil
-import socket
 import subprocess
+import threading
+import time
+import uuid
 import logging
 from datetime import datetime
 
+from live_state import current_state
+from log_store import LOG_FILE, LOG_LEVELS, LOG_QUERY_LIMIT, LOG_RING_SIZE, log_ring, read_log_file
+from sampler import sampler, SAMPLE_INTERVAL
+from startup import timeline
+
 logger = logging.getLogger('WebUI')
 
 app = Flask(__name__)
@@ -22,6 +31,15 @@ app.secret_key = os.urandom(24)
 # Configuration - can be overridden by environment variables
 CONFIG_FILE = os.environ.get('MAKERSCREEN_CONFIG', '/opt/makerscreen/config.json')
 CONTENT_DIR = os.environ.get('MAKERSCREEN_CONTENT', '/opt/makerscreen/content')
+RESPONSE_CACHE_TTL = 5  # Seconds an /api/status answer is reused
+GZIP_MIN_BYTES = 512  # Smaller JSON bodies are sent uncompressed
+HISTORY_MAX_POINTS = 720  # Points per /api/metrics/history answer at most
+STREAM_INTERVAL = 2  # Seconds between dashboard view rebuilds while someone watches
+STREAM_KEEPALIVE = 15  # Seconds of silence before a keepalive comment
+LOG_POLL_INTERVAL = 2  # Seconds between log file reads when the client runs elsewhere
+
+_response_cache = {}  # key -> (expires, etag, body, gzipped body)
+_static_info = None
 
 # HTML Templates
 BASE_TEMPLATE = '''
@@ -225,21 +243,64 @@ DASHBOARD_TEMPLATE = BASE_TEMPLATE.replace('{% block content %}{% endblock %}',
     <div class="status-grid">
         <div class="status-item">
             <label>Connection</label>
-            <div class="value {{ 'status-online' if status.connected else 'status-offline' }}">
-                {{ 'Connected' if status.connected else 'Disconnected' }}
-            </div>
+            <div class="value {{ 'status-online' if view.connected else 'status-offline' }}"
+                 data-online="connected" data-bind="connection">{{ view.connection }}</div>
         </div>
         <div class="status-item">
             <label>Client ID</label>
-            <div class="value">{{ status.client_id[:12] }}...</div>
+            <div class="value" data-bind="client_id">{{ view.client_id }}</div>
         </div>
         <div class="status-item">
             <label>Server</label>
-            <div class="value">{{ status.server_url }}</div>
+            <div class="value" data-bind="server_url">{{ view.server_url }}</div>
         </div>
         <div class="status-item">
             <label>Uptime</label>
-            <div class="value">{{ status.uptime }}</div>
+            <div class="value" data-bind="uptime">{{ view.uptime }}</div>
+        </div>
+    </div>
+    <p data-show="connection_error" {{ 'style="display: none"'|safe if not view.connection_error }}>
+        Last connection error: <span data-bind="connection_error">{{ view.connection_error }}</span>
+    </p>
+</div>
+
+<div class="card" data-show="running" {{ 'style="display: none"'|safe if not view.running }}>
+    <h2>Now Playing</h2>
+    <p class="status-offline" data-show="emergency" {{ 'style="display: none"'|safe if not view.emergency }}>
+        Emergency broadcast on screen: <span data-bind="emergency">{{ view.emergency }}</span>
+    </p>
+    <div class="status-grid">
+        <div class="status-item">
+            <label>Content</label>
+            <div class="value" data-bind="content">{{ view.content }}</div>
+        </div>
+        <div class="status-item">
+            <label>Item</label>
+            <div class="value" data-bind="item">{{ view.item }}</div>
+        </div>
+        <div class="status-item">
+            <label>Playlist</label>
+            <div class="value" data-bind="playlist">{{ view.playlist }}</div>
+        </div>
+        <div class="status-item">
+            <label>Slot Timing Error</label>
+            <div class="value" data-bind="timing_error">{{ view.timing_error }}</div>
+        </div>
+        <div class="status-item">
+            <label>Cache</label>
+            <div class="value" data-bind="cache">{{ view.cache }}</div>
+        </div>
+        <div class="status-item">
+            <label>Cache Hit Rate</label>
+            <div class="value" data-bind="hit_rate">{{ view.hit_rate }}</div>
+        </div>
+        <div class="status-item">
+            <label>Clock Offset</label>
+            <div class="value" data-bind="clock">{{ view.clock }}</div>
+        </div>
+        <div class="status-item">
+            <label>First Frame</label>
+            <div class="value" data-bind="first_frame">{{ view.first_frame }}</div>
         </div>
     </div>
 </div>
@@ -249,22 +310,22 @@ DASHBOARD_TEMPLATE = BASE_TEMPLATE.replace('{% block content %}{% endblock %}',
     <div class="status-grid">
         <div class="status-item">
             <label>CPU Usage</label>
-            <div class="value">{{ system.cpu_percent }}%</div>
-            <div class="progress-bar"><div class="fill" style="width: {{ system.cpu_percent }}%"></div></div>
+            <div class="value"><span data-bind="cpu_percent">{{ view.cpu_percent }}</span>%</div>
+            <div class="progress-bar"><div class="fill" data-width="cpu_percent" style="width: {{ view.cpu_percent }}%"></div></div>
         </div>
         <div class="status-item">
             <label>Memory Usage</label>
-            <div class="value">{{ system.memory_percent }}%</div>
-            <div class="progress-bar"><div class="fill" style="width: {{ system.memory_percent }}%"></div></div>
+            <div class="value"><span data-bind="memory_percent">{{ view.memory_percent }}</span>%</div>
+            <div class="progress-bar"><div class="fill" data-width="memory_percent" style="width: {{ view.memory_percent }}%"></div></div>
         </div>
         <div class="status-item">
             <label>Disk Usage</label>
-            <div class="value">{{ system.disk_percent }}%</div>
-            <div class="progress-bar"><div class="fill" style="width: {{ system.disk_percent }}%"></div></div>
+            <div class="value"><span data-bind="disk_percent">{{ view.disk_percent }}</span>%</div>
+            <div class="progress-bar"><div class="fill" data-width="disk_percent" style="width: {{ view.disk_percent }}%"></div></div>
         </div>
         <div class="status-item">
             <label>Temperature</label>
-            <div class="value">{{ system.temperature }}°C</div>
+            <div class="value"><span data-bind="temperature">{{ view.temperature }}</span>°C</div>
         </div>
     </div>
 </div>
@@ -274,15 +335,15 @@ DASHBOARD_TEMPLATE = BASE_TEMPLATE.replace('{% block content %}{% endblock %}',
     <div class="status-grid">
         <div class="status-item">
             <label>IP Address</label>
-            <div class="value">{{ network.ip_address }}</div>
+            <div class="value" data-bind="ip_address">{{ view.ip_address }}</div>
         </div>
         <div class="status-item">
             <label>MAC Address</label>
-            <div class="value">{{ network.mac_address }}</div>
+            <div class="value" data-bind="mac_address">{{ view.mac_address }}</div>
         </div>
         <div class="status-item">
             <label>Hostname</label>
-            <div class="value">{{ network.hostname }}</div>
+            <div class="value" data-bind="hostname">{{ view.hostname }}</div>
         </div>
     </div>
 </div>
@@ -292,6 +353,24 @@ DASHBOARD_TEMPLATE = BASE_TEMPLATE.replace('{% block content %}{% endblock %}',
     <p>Scan to access this page from your phone</p>
     <img src="/api/qrcode" alt="QR Code">
 </div>
+
+<script>
+// Apply the changed values pushed by the server; EventSource reconnects on its own
+function applyView(changes) {
+    for (const [key, value] of Object.entries(changes)) {
+        document.querySelectorAll(`[data-bind="${key}"]`).forEach(el => { el.textContent = value; });
+        document.querySelectorAll(`[data-width="${key}"]`).forEach(el => { el.style.width = value + '%'; });
+        document.querySelectorAll(`[data-show="${key}"]`).forEach(el => { el.style.display = value ? '' : 'none'; });
+        document.querySelectorAll(`[data-online="${key}"]`).forEach(el => {
+            el.classList.toggle('status-online', !!value);
+            el.classList.toggle('status-offline', !value);
+        });
+    }
+}
+if (window.EventSource) {
+    new EventSource('/api/dashboard/stream').onmessage = event => applyView(JSON.parse(event.data));
+}
+</script>
 {% endblock %}
 ''')
 
@@ -389,7 +468,25 @@ LOGS_TEMPLATE = BASE_TEMPLATE.replace('{% block content %}{% endblock %}', '''
 {% block content %}
 <div class="card">
     <h2>Application Logs</h2>
-    <div class="log-output">{{ logs }}</div>
+    <form method="GET" action="/logs">
+        <div class="form-group">
+            <label>Level</label>
+            <select name="level">
+                {% for name in levels %}
+                <option value="{{ name }}" {{ 'selected' if name == level else '' }}>{{ name }} and above</option>
+                {% endfor %}
+            </select>
+        </div>
+        <div class="form-group">
+            <label>Contains</label>
+            <input type="text" name="q" value="{{ q }}" placeholder="Text or logger name">
+        </div>
+        <button type="submit" class="btn">Filter</button>
+        <label><input type="checkbox" id="follow" checked> Follow</label>
+    </form>
+    <div class="log-output" id="log-output" {{ 'data-empty="true"'|safe if not entries }}>{% for entry in entries %}{{ entry.time }} - {{ entry.logger }} - {{ entry.level }} - {{ entry.message }}
+{% else %}No logs available
+{% endfor %}</div>
 </div>
 
 <div class="card">
@@ -399,6 +496,48 @@ LOGS_TEMPLATE = BASE_TEMPLATE.replace('{% block content %}{% endblock %}', '''
     </form>
     <a href="/api/logs/download" class="btn">Download Logs</a>
 </div>
+
+<script>
+// Follow mode: append new matching records as the server streams them
+const output = document.getElementById('log-output');
+const follow = document.getElementById('follow');
+const maxLines = {{ max_lines }};
+let source = null;
+let cursor = {{ cursor }};
+output.scrollTop = output.scrollHeight;
+function startFollowing() {
+    const params = new URLSearchParams({since: cursor, level: '{{ level }}', q: {{ q|tojson }}});
+    source = new EventSource('/api/logs/stream?' + params);
+    source.onmessage = event => {
+        const batch = JSON.parse(event.data);
+        cursor = batch.cursor;
+        const atBottom = output.scrollTop + output.clientHeight >= output.scrollHeight - 20;
+        if (output.dataset.empty && batch.entries.length) {
+            output.textContent = '';
+            delete output.dataset.empty;
+        }
+        output.textContent += batch.entries
+            .map(entry => `${entry.time} - ${entry.logger} - ${entry.level} - ${entry.message}\n`).join('');
+        const lines = output.textContent.split('\n');
+        if (lines.length > maxLines) {
+            output.textContent = lines.slice(-maxLines).join('\n');
+        }
+        if (atBottom) {
+            output.scrollTop = output.scrollHeight;
+        }
+    };
+}
+follow.addEventListener('change', () => {
+    if (follow.checked) {
+        startFollowing();
+    } else if (source) {
+        source.close();
+    }
+});
+if (window.EventSource) {
+    startFollowing();
+}
+</script>
 {% endblock %}
 ''')
 
@@ -426,6 +565,44 @@ SYSTEM_TEMPLATE = BASE_TEMPLATE.replace('{% block content %}{% endblock %}', '''
     </div>
 </div>
 
+<div class="card">
+    <h2>Startup</h2>
+    <div class="status-grid">
+        <div class="status-item">
+            <label>Interpreter Ready</label>
+            <div class="value">{{ startup.interpreterMs }} ms</div>
+        </div>
+        {% for name, at in startup.marks.items() %}
+        <div class="status-item">
+            <label>{{ name }}</label>
+            <div class="value">{{ at }} ms</div>
+        </div>
+        {% endfor %}
+    </div>
+    {% if startup.phases %}
+    <table>
+        <thead>
+            <tr>
+                <th>Phase</th>
+                <th>Thread</th>
+                <th>Start (ms)</th>
+                <th>Duration (ms)</th>
+            </tr>
+        </thead>
+        <tbody>
+            {% for phase in startup.phases %}
+            <tr>
+                <td>{{ phase.name }}{% if phase.error %} ({{ phase.error }}){% endif %}</td>
+                <td>{{ phase.thread }}</td>
+                <td>{{ phase.startMs }}</td>
+                <td>{{ phase.durationMs }}</td>
+            </tr>
+            {% endfor %}
+        </tbody>
+    </table>
+    {% endif %}
+</div>
+
 <div class="card">
     <h2>Service Control</h2>
     <button class="btn btn-success" onclick="restartService()">Restart Service</button>
@@ -497,77 +674,275 @@ def save_config(config):
 
 
 def get_system_info():
-    """Get system information"""
-    try:
-        cpu_percent = psutil.cpu_percent(interval=0.1)
-        memory = psutil.virtual_memory()
-        disk = psutil.disk_usage('/')
-        
-        # Get temperature (Raspberry Pi specific)
-        temperature = 0
-        try:
-            if os.path.exists('/sys/class/thermal/thermal_zone0/temp'):
-                with open('/sys/class/thermal/thermal_zone0/temp', 'r') as f:
-                    temperature = int(f.read()) / 1000
-        except:
-            pass
-        
-        return {
-            'cpu_percent': round(cpu_percent, 1),
-            'memory_percent': round(memory.percent, 1),
-            'disk_percent': round(disk.percent, 1),
-            'temperature': round(temperature, 1),
+    """Latest background sample plus details that never change while running"""
+    global _static_info
+    sampler.start()
+    if _static_info is None:
+        _static_info = {
             'platform': platform.platform(),
             'python_version': platform.python_version(),
             'client_version': '1.0.0',
             'boot_time': datetime.fromtimestamp(psutil.boot_time()).strftime('%Y-%m-%d %H:%M:%S')
         }
-    except Exception as e:
-        logger.error(f"Error getting system info: {e}")
-        return {}
+    latest = sampler.latest
+    return {
+        'cpu_percent': latest.get('cpuPercent') or 0,
+        'memory_percent': latest.get('memoryPercent') or 0,
+        'disk_percent': latest.get('diskPercent') or 0,
+        'temperature': latest.get('temperatureC') or 0,
+        'load_average': latest.get('loadAvg1') or 0,
+        'sampled_at': latest.get('sampledAt'),
+        **_static_info
+    }
 
 
 def get_network_info():
-    """Get network information"""
-    try:
-        hostname = socket.gethostname()
-        ip_address = socket.gethostbyname(hostname)
-        
-        # Get MAC address
-        mac_address = 'Unknown'
-        try:
-            import netifaces
-            for iface in netifaces.interfaces():
-                addrs = netifaces.ifaddresses(iface)
-                if netifaces.AF_LINK in addrs:
-                    mac = addrs[netifaces.AF_LINK][0].get('addr', '')
-                    if mac and mac != '00:00:00:00:00:00':
-                        mac_address = mac
-                        break
-        except:
-            pass
-        
+    """Hostname, IP and MAC address as last looked up by the sampler"""
+    sampler.start()
+    return {'hostname': 'Unknown', 'ip_address': 'Unknown', 'mac_address': 'Unknown', **sampler.network}
+
+
+def cached_json(key, build, ttl=RESPONSE_CACHE_TTL):
+    """JSON response for ``build()``, rebuilt at most every ``ttl`` seconds
+
+    The encoded body, its gzip form and its ETag are kept with the entry,
+    so polling clients cost one dict lookup, and a client that sends the
+    ETag back gets a 304 with no body.
+    """
+    now = time.monotonic()
+    entry = _response_cache.get(key)
+    if entry is None or entry[0] <= now:
+        body = json.dumps(build(), default=str, separators=(',', ':')).encode('utf-8')
+        entry = (now + ttl, hashlib.sha1(body).hexdigest()[:20], body, gzip.compress(body, 6))
+        for stale in [k for k, v in _response_cache.items() if v[0] <= now]:
+            _response_cache.pop(stale, None)
+        _response_cache[key] = entry
+    _, etag, body, compressed = entry
+
+    if request.if_none_match.contains(etag):
+        response = app.response_class(status=304)
+    elif 'gzip' in request.accept_encodings and len(body) >= GZIP_MIN_BYTES:
+        response = app.response_class(compressed, mimetype='application/json')
+        response.headers['Content-Encoding'] = 'gzip'
+    else:
+        response = app.response_class(body, mimetype='application/json')
+    response.set_etag(etag)
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+def format_duration(seconds):
+    """'3d 4h 12m' style duration"""
+    seconds = int(seconds)
+    days, seconds = divmod(seconds, 86400)
+    hours, seconds = divmod(seconds, 3600)
+    minutes = seconds // 60
+    if days:
+        return f'{days}d {hours}h {minutes}m'
+    if hours:
+        return f'{hours}h {minutes}m'
+    return f'{minutes}m'
+
+
+def get_status():
+    """Get client status from the running client"""
+    state = current_state()
+    if not state:
+        config = load_config()
         return {
-            'hostname': hostname,
-            'ip_address': ip_address,
-            'mac_address': mac_address
+            'running': False,
+            'connected': False,
+            # Same derivation as MakerScreenClient.get_client_id
+            'client_id': f'{uuid.getnode():012x}',
+            'server_url': config.get('serverUrl', 'Not configured'),
+            'uptime': 'Client not running'
         }
-    except Exception as e:
-        logger.error(f"Error getting network info: {e}")
-        return {'hostname': 'Unknown', 'ip_address': 'Unknown', 'mac_address': 'Unknown'}
+    
+    now = time.time()
+    metrics = state.get('metrics') or {}
+    item = state.get('currentItem')
+    if item:
+        item = {**item, 'elapsed': round(now - item['startedAt'])}
+    return {
+        'running': True,
+        'connected': state.get('connected', False),
+        'connection_error': state.get('connectionError'),
+        'client_id': state.get('clientId', ''),
+        'client_name': state.get('clientName', ''),
+        'server_url': state.get('serverUrl', ''),
+        'uptime': format_duration(now - state['startedAt']) if state.get('startedAt') else 'N/A',
+        'current_item': item,
+        'playlist': state.get('playlist') or {},
+        'emergency': state.get('emergency'),
+        'cache': metrics.get('cache') or {},
+        'playback': metrics.get('playback') or {},
+        'clock': metrics.get('clock') or {},
+        'startup': metrics.get('startup') or {}
+    }
 
 
-def get_status():
-    """Get client status"""
-    config = load_config()
+def get_startup():
+    """The client's start-up timeline (this process's own if no client answers)"""
+    state = current_state() or {}
+    return (state.get('metrics') or {}).get('startup') or timeline.report()
+
+
+def dashboard_view():
+    """Every value the dashboard shows, formatted, as one flat dict
+
+    The page renders from it, and the stream sends the keys that change.
+    """
+    status = get_status()
+    system = get_system_info()
+    network = get_network_info()
+    item = status.get('current_item')
+    playlist = status.get('playlist') or {}
+    playback = status.get('playback') or {}
+    cache = status.get('cache') or {}
+    clock = status.get('clock') or {}
+    first_frame = (status.get('startup') or {}).get('firstFrame')
+    emergency = status.get('emergency')
     return {
-        'connected': False,  # Would be updated by actual client
-        'client_id': get_network_info().get('mac_address', 'Unknown').replace(':', ''),
-        'server_url': config.get('serverUrl', 'Not configured'),
-        'uptime': 'N/A'
+        'connected': status['connected'],
+        'connection': 'Connected' if status['connected'] else 'Disconnected',
+        'connection_error': '' if status['connected'] else status.get('connection_error') or '',
+        'client_id': f"{status['client_id'][:12]}...",
+        'server_url': status['server_url'],
+        'uptime': status['uptime'],
+        'running': status['running'],
+        'emergency': emergency.get('title') or emergency.get('id') if emergency else '',
+        'content': item['contentId'] if item else 'Nothing yet',
+        'item': f"{item['index'] + 1} of {item['count']} ({item['elapsed']}s / {round(item['duration'])}s)" if item else '-',
+        'playlist': f"{playlist.get('source') or 'none'}{', scheduled' if playlist.get('scheduled') else ''}",
+        'timing_error': f"{playback.get('meanErrorMs')} ms avg",
+        'cache': f"{(cache.get('bytes') or 0) // 1048576} / {(cache.get('maxBytes') or 0) // 1048576} MB",
+        'hit_rate': f"{round((cache.get('hitRate') or 0) * 100, 1)}%",
+        'clock': f"{clock.get('offsetMs')} ms" if clock.get('synced') else 'not synced',
+        'first_frame': f"{first_frame['timeToFirstFrameMs']} ms" if first_frame else '-',
+        'cpu_percent': system.get('cpu_percent', 0),
+        'memory_percent': system.get('memory_percent', 0),
+        'disk_percent': system.get('disk_percent', 0),
+        'temperature': system.get('temperature', 0),
+        'ip_address': network['ip_address'],
+        'mac_address': network['mac_address'],
+        'hostname': network['hostname']
     }
 
 
+class DashboardStream:
+    """One producer thread shared by every open dashboard
+
+    While anyone is subscribed, the producer rebuilds the view every
+    ``interval`` seconds and wakes the subscribers when it changed. Each
+    subscriber then sends only the keys that differ from what it sent last,
+    so a slow browser skips intermediate views instead of queueing them.
+    With no subscribers the producer stops.
+    """
+
+    def __init__(self, build, interval=STREAM_INTERVAL):
+        self._build = build
+        self.interval = interval
+        self._condition = threading.Condition()
+        self._thread = None
+        self.view = None
+        self.version = 0
+        self.subscribers = 0
+
+    def _run(self):
+        while True:
+            try:
+                view = self._build()
+            except Exception as e:
+                logger.error(f"Error building dashboard view: {e}")
+                view = None
+            with self._condition:
+                if view is not None and view != self.view:
+                    self.view = view
+                    self.version += 1
+                    self._condition.notify_all()
+                if not self.subscribers:
+                    self._thread = None
+                    return
+            time.sleep(self.interval)
+
+    def subscribe(self):
+        """Generator of SSE frames for one browser, ending when it disconnects"""
+        with self._condition:
+            self.subscribers += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='dashboard-stream', daemon=True)
+                self._thread.start()
+        sent = {}
+        seen = 0
+        try:
+            while True:
+                with self._condition:
+                    if self.version == seen:
+                        self._condition.wait(STREAM_KEEPALIVE)
+                    view, version = self.view, self.version
+                if version == seen:
+                    # Also how a closed connection is noticed
+                    yield ': keepalive\n\n'
+                    continue
+                seen = version
+                changes = {key: value for key, value in view.items()
+                           if key not in sent or sent[key] != value}
+                sent = view
+                if changes:
+                    yield f'data: {json.dumps(changes, default=str)}\n\n'
+        finally:
+            with self._condition:
+                self.subscribers -= 1
+
+
+dashboard_stream = DashboardStream(dashboard_view)
+
+
+def log_filters():
+    """Level and text filters from the query string; an unknown level means INFO"""
+    level = request.args.get('level', 'INFO').upper()
+    return (level if level in LOG_LEVELS else 'INFO'), request.args.get('q', '').strip()
+
+
+def get_logs(since=0, level=None, text=None, limit=LOG_QUERY_LIMIT):
+    """Matching log records after ``since`` and the cursor to continue from
+
+    From the in-memory ring when the client runs in this process, otherwise
+    from the tail of its log file.
+    """
+    if log_ring.installed:
+        return log_ring.query(since, level, text, limit)
+    return read_log_file(LOG_FILE, since, level, text, limit)
+
+
+def follow_logs(since, level, text):
+    """SSE frames with each batch of new matching records"""
+    cursor = since
+    quiet_since = time.monotonic()
+    while True:
+        if log_ring.installed:
+            log_ring.wait(cursor, STREAM_KEEPALIVE)
+        else:
+            time.sleep(LOG_POLL_INTERVAL)
+        entries, cursor = get_logs(cursor, level, text)
+        if entries:
+            quiet_since = time.monotonic()
+            yield f"id: {cursor}\ndata: {json.dumps({'entries': entries, 'cursor': cursor})}\n\n"
+        elif time.monotonic() - quiet_since >= STREAM_KEEPALIVE:
+            quiet_since = time.monotonic()
+            # Also how a closed connection is noticed
+            yield ': keepalive\n\n'
+
+
+def is_content_file(filepath):
+    """True for cached content, False for the cache index and partial writes"""
+    filename = os.path.basename(filepath)
+    return (os.path.isfile(filepath)
+            and not filename.startswith('manifest.')
+            and not filename.endswith('.part'))
+
+
 def get_content_files():
     """List cached content files"""
     files = []
@@ -575,7 +950,7 @@ def get_content_files():
         if os.path.exists(CONTENT_DIR):
             for filename in os.listdir(CONTENT_DIR):
                 filepath = os.path.join(CONTENT_DIR, filename)
-                if os.path.isfile(filepath):
+                if is_content_file(filepath):
                     stat = os.stat(filepath)
                     files.append({
                         'name': filename,
@@ -589,12 +964,16 @@ def get_content_files():
 
 @app.route('/')
 def dashboard():
-    return render_template_string(
-        DASHBOARD_TEMPLATE,
-        title='Dashboard',
-        status=get_status(),
-        system=get_system_info(),
-        network=get_network_info()
+    return render_template_string(DASHBOARD_TEMPLATE, title='Dashboard', view=dashboard_view())
+
+
+@app.route('/api/dashboard/stream')
+def api_dashboard_stream():
+    """Dashboard changes as Server-Sent Events, starting with the whole view"""
+    return app.response_class(
+        dashboard_stream.subscribe(),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
     )
 
 
@@ -636,7 +1015,7 @@ def clear_content():
         if os.path.exists(CONTENT_DIR):
             for filename in os.listdir(CONTENT_DIR):
                 filepath = os.path.join(CONTENT_DIR, filename)
-                if os.path.isfile(filepath):
+                if is_content_file(filepath):
                     os.remove(filepath)
     except Exception as e:
         logger.error(f"Error clearing content: {e}")
@@ -647,7 +1026,7 @@ def clear_content():
 def delete_content(filename):
     try:
         filepath = os.path.join(CONTENT_DIR, filename)
-        if os.path.exists(filepath):
+        if is_content_file(filepath):
             os.remove(filepath)
     except Exception as e:
         logger.error(f"Error deleting content: {e}")
@@ -656,18 +1035,65 @@ def delete_content(filename):
 
 @app.route('/logs')
 def logs():
-    log_content = "No logs available"
+    level, q = log_filters()
+    entries, cursor = get_logs(level=level, text=q)
+    return render_template_string(
+        LOGS_TEMPLATE,
+        title='Logs',
+        entries=entries,
+        cursor=cursor,
+        level=level,
+        q=q,
+        levels=LOG_LEVELS,
+        max_lines=LOG_RING_SIZE
+    )
+
+
+@app.route('/logs/clear', methods=['POST'])
+def clear_logs():
+    log_ring.clear()
     try:
-        result = subprocess.run(
-            ['journalctl', '-u', 'makerscreen', '-n', '100', '--no-pager'],
-            capture_output=True, text=True
-        )
-        if result.stdout:
-            log_content = result.stdout
+        if os.path.exists(LOG_FILE):
+            open(LOG_FILE, 'w').close()
     except Exception as e:
-        log_content = f"Error reading logs: {e}"
-    
-    return render_template_string(LOGS_TEMPLATE, title='Logs', logs=log_content)
+        logger.error(f"Error clearing log file: {e}")
+    return redirect(url_for('logs'))
+
+
+@app.route('/api/logs')
+def api_logs():
+    """Log records, e.g. ?since=<cursor>&level=WARNING&q=timeout&limit=100"""
+    level, q = log_filters()
+    try:
+        since = int(request.args.get('since', 0))
+        limit = min(int(request.args.get('limit', LOG_QUERY_LIMIT)), LOG_QUERY_LIMIT)
+    except ValueError:
+        return jsonify({'error': 'since and limit must be integers'}), 400
+    entries, cursor = get_logs(since, level, q, limit)
+    return jsonify({'entries': entries, 'cursor': cursor})
+
+
+@app.route('/api/logs/stream')
+def api_logs_stream():
+    """New matching log records as Server-Sent Events, resuming from Last-Event-ID"""
+    level, q = log_filters()
+    try:
+        since = int(request.headers.get('Last-Event-ID') or request.args.get('since', 0))
+    except ValueError:
+        since = 0
+    return app.response_class(
+        follow_logs(since, level, q),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+@app.route('/api/logs/download')
+def api_logs_download():
+    if not os.path.exists(LOG_FILE):
+        return "No log file", 404
+    return send_file(LOG_FILE, mimetype='text/plain', as_attachment=True,
+                     download_name='makerscreen-client.log')
 
 
 @app.route('/system')
@@ -676,19 +1102,50 @@ def system():
         SYSTEM_TEMPLATE,
         title='System',
         system=get_system_info(),
-        config=load_config()
+        config=load_config(),
+        startup=get_startup()
     )
 
 
 @app.route('/api/status')
 def api_status():
-    return jsonify({
+    return cached_json('status', lambda: {
         'status': get_status(),
         'system': get_system_info(),
         'network': get_network_info()
     })
 
 
+@app.route('/api/metrics/history')
+def api_metrics_history():
+    """Sampled history, e.g. ?since=<epoch>&until=<epoch>&step=60&fields=cpuPercent,temperatureC
+
+    ``since`` defaults to an hour ago and ``step`` to whatever keeps the
+    answer under HISTORY_MAX_POINTS points. Both ends are rounded down to a
+    multiple of ``step``, so repeated queries share a cache entry.
+    """
+    try:
+        until = float(request.args['until']) if 'until' in request.args else None
+        since = float(request.args.get('since', (until or time.time()) - 3600))
+        step = int(request.args.get('step', 0))
+    except ValueError:
+        return jsonify({'error': 'since, until and step must be numbers'}), 400
+    span = (until or time.time()) - since
+    step = max(step, -(-int(span) // HISTORY_MAX_POINTS), SAMPLE_INTERVAL)
+    since = int(since) - int(since) % step
+    if until is not None:
+        until = int(until) - int(until) % step
+    fields = [field for field in request.args.get('fields', '').split(',') if field] or None
+    key = ('history', since, until, step, tuple(fields or ()))
+    return cached_json(key, lambda: sampler.history.query(since, until, step, fields),
+                       ttl=SAMPLE_INTERVAL)
+
+
+@app.route('/api/startup')
+def api_startup():
+    return jsonify(get_startup())
+
+
 @app.route('/api/qrcode')
 def api_qrcode():
     try:
@@ -708,7 +1165,6 @@ def api_qrcode():
         img.save(buffer, format='PNG')
         buffer.seek(0)
         
-        from flask import send_file
         return send_file(buffer, mimetype='image/png')
     except Exception as e:
         logger.error(f"Error generating QR code: {e}")
@@ -741,6 +1197,7 @@ def api_reboot():
 
 def run_webui(port=5001):
     """Run the web UI server"""
+    sampler.start()
     app.run(host='0.0.0.0', port=port, debug=False, threaded=True)
 
 
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+MakerScreen Wire Codecs
+Message encodings the client can negotiate with the server, and a benchmark
+comparing them (run ``python3 wire.py`` on the device)
+"""
+
+import json
+import os
+import time
+import zlib
+import logging
+
+logger = logging.getLogger('Wire')
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import cbor2
+except ImportError:
+    cbor2 = None
+
+
+class JsonCodec:
+    """Compact JSON in text frames, understood by every server"""
+    name = 'json'
+    binary = False
+
+    @staticmethod
+    def encode(message):
+        return json.dumps(message, separators=(',', ':'))
+
+    @staticmethod
+    def decode(data):
+        return json.loads(data)
+
+
+class MsgpackCodec:
+    """MessagePack in binary frames"""
+    name = 'msgpack'
+    binary = True
+
+    @staticmethod
+    def encode(message):
+        return msgpack.packb(message, use_bin_type=True)
+
+    @staticmethod
+    def decode(data):
+        return msgpack.unpackb(data, raw=False)
+
+
+class CborCodec:
+    """CBOR (RFC 8949) in binary frames"""
+    name = 'cbor'
+    binary = True
+
+    @staticmethod
+    def encode(message):
+        return cbor2.dumps(message)
+
+    @staticmethod
+    def decode(data):
+        return cbor2.loads(data)
+
+
+# WebSocketMessage properties, as this client names them
+ENVELOPE_KEYS = ('type', 'clientId', 'data', 'seq', 'timestamp')
+
+# In order of preference; JSON is always last so older servers keep working
+CODECS = [
+    (MsgpackCodec, lambda: msgpack is not None),
+    (CborCodec, lambda: cbor2 is not None),
+    (JsonCodec, lambda: True)
+]
+
+
+def available_codecs():
+    """Names of the codecs this client can use, most preferred first"""
+    return [codec.name for codec, installed in CODECS if installed()]
+
+
+def get_codec(name):
+    """The codec called ``name`` if it is installed, otherwise JSON"""
+    for codec, installed in CODECS:
+        if codec.name == name and installed():
+            return codec
+    return JsonCodec
+
+
+def normalize_envelope(message):
+    """``message`` with its envelope keys in the casing the client uses
+
+    The server serializes WebSocketMessage with .NET's default names
+    (``Type``, ``Data``, ``Seq``, ...), which the iOS client relies on; this
+    client reads ``type``, ``data``, ``seq``. Only the envelope is renamed:
+    payloads are anonymous objects the server already writes in camelCase.
+    """
+    if not isinstance(message, dict):
+        return message
+    for name in ENVELOPE_KEYS:
+        pascal = name[0].upper() + name[1:]
+        if pascal in message:
+            value = message.pop(pascal)
+            message.setdefault(name, value)
+    return message
+
+
+def negotiated_extensions(websocket):
+    """Names of the WebSocket extensions agreed in the handshake"""
+    protocol = getattr(websocket, 'protocol', websocket)
+    extensions = getattr(protocol, 'extensions', None) or []
+    return [extension.name for extension in extensions]
+
+
+SAMPLE_MESSAGES = {
+    'REGISTER': {
+        'type': 'REGISTER', 'clientId': 'b827eb123456',
+        'data': {
+            'name': 'Display-01', 'macAddress': 'b827eb123456', 'version': '1.0.0',
+            'platform': 'Linux', 'platformVersion': '6.6.31+rpt-rpi-v8', 'machine': 'aarch64',
+            'cpuCount': 4, 'memoryMb': 3796,
+            'capabilities': {'binaryTransfer': {'chunkSize': 262144},
+                             'codecs': ['msgpack', 'cbor', 'json']},
+            'pendingTransfers': [],
+            'inventory': {'count': 2, 'digest': 'e3b0c442' * 8,
+                          'hashes': {'3f2a9c1e-0000-4000-8000-00000000000%d' % i: 'a1b2c3d4' * 8
+                                     for i in range(2)}}
+        },
+        'timestamp': '2024-01-01T12:00:00.000000'
+    },
+    'HEARTBEAT': {
+        'type': 'HEARTBEAT', 'clientId': 'b827eb123456',
+        'data': {
+            'status': 'online', 'uptime': 86400, 'interval': 30,
+            'metrics': {'id': 2881, 'base': 2880, 'removed': [], 'values': {
+                'system.cpuPercent': 23.5, 'system.temperatureC': 61.2,
+                'system.memoryAvailableMb': 212, 'playback.slots': 1441,
+                'playback.meanErrorMs': 1.1, 'outbound.telemetry.sent': 2880
+            }},
+            'ackSeq': 1056
+        },
+        'timestamp': '2024-01-01T12:00:00.000000'
+    },
+    'STATUS': {
+        'type': 'STATUS', 'clientId': 'b827eb123456',
+        'data': {'status': 'playlist_readiness', 'state': 'partial', 'ready': 7,
+                 'total': 9, 'missing': ['3f2a9c1e-0000-4000-8000-000000000001'], 'inFlight': 1},
+        'timestamp': '2024-01-01T12:00:00.000000'
+    },
+    'TIME_SYNC': {
+        'type': 'TIME_SYNC', 'clientId': 'b827eb123456',
+        'data': {'t0': 1704110400000.125}
+    },
+    'CONTENT_TRANSFER_ACK': {
+        'type': 'CONTENT_TRANSFER_ACK', 'clientId': 'b827eb123456',
+        'data': {'transferId': '3f2a9c1e-0000-4000-8000-000000000001',
+                 'offset': 41943040, 'complete': False},
+        'timestamp': '2024-01-01T12:00:00.000000'
+    },
+    'PLAYLIST_UPDATE': {
+        'type': 'PLAYLIST_UPDATE',
+        'data': {'playlist': {'items': [
+            {'contentId': '3f2a9c1e-0000-4000-8000-0000000000%02d' % i, 'duration': 10,
+             'transition': 'Fade', 'transitionDuration': 500}
+            for i in range(20)
+        ]}}
+    }
+}
+
+
+def benchmark(rounds=2000):
+    """Bytes on the wire and encode/decode time per message type and codec
+
+    ``deflate`` is the frame size after permessage-deflate with a fresh
+    context (the worst case; with context takeover repeated messages such
+    as heartbeats compress further).
+    """
+    results = []
+    for codec, installed in CODECS:
+        if not installed():
+            continue
+        for name, message in SAMPLE_MESSAGES.items():
+            encoded = codec.encode(message)
+            raw = encoded if isinstance(encoded, bytes) else encoded.encode('utf-8')
+
+            compressor = zlib.compressobj(6, zlib.DEFLATED, -12, 5)
+            # permessage-deflate strips the trailing empty block of a sync flush
+            deflated = len(compressor.compress(raw) + compressor.flush(zlib.Z_SYNC_FLUSH)) - 4
+
+            start = time.perf_counter()
+            for _ in range(rounds):
+                codec.encode(message)
+            encode_us = (time.perf_counter() - start) / rounds * 1e6
+
+            start = time.perf_counter()
+            for _ in range(rounds):
+                codec.decode(encoded)
+            decode_us = (time.perf_counter() - start) / rounds * 1e6
+
+            results.append({
+                'codec': codec.name,
+                'message': name,
+                'bytes': len(raw),
+                'deflate': deflated,
+                'encodeUs': round(encode_us, 1),
+                'decodeUs': round(decode_us, 1)
+            })
+    return results
+
+
+if __name__ == '__main__':
+    # Measure one core, as the client's event loop runs on one
+    if hasattr(os, 'sched_setaffinity'):
+        os.sched_setaffinity(0, {min(os.sched_getaffinity(0))})
+
+    print(f"{'message':<22}{'codec':<9}{'bytes':>7}{'deflate':>9}{'encode us':>11}{'decode us':>11}")
+    for row in sorted(benchmark(), key=lambda row: (row['message'], row['codec'])):
+        print(f"{row['message']:<22}{row['codec']:<9}{row['bytes']:>7}{row['deflate']:>9}"
+              f"{row['encodeUs']:>11}{row['decodeUs']:>11}")
@@ -57,6 +57,15 @@ sudo touch /mnt/raspi-boot/ssh
 # Copy MakerScreen client files
 sudo mkdir -p /mnt/raspi-root/opt/makerscreen
 sudo cp ../../Client/RaspberryPi/client.py /mnt/raspi-root/opt/makerscreen/
+sudo cp ../../Client/RaspberryPi/renditions.py /mnt/raspi-root/opt/makerscreen/
+sudo cp ../../Client/RaspberryPi/video_player.py /mnt/raspi-root/opt/makerscreen/
+sudo cp ../../Client/RaspberryPi/schedule.py /mnt/raspi-root/opt/makerscreen/
+sudo cp ../../Client/RaspberryPi/wire.py /mnt/raspi-root/opt/makerscreen/
+sudo cp ../../Client/RaspberryPi/startup.py /mnt/raspi-root/opt/makerscreen/
+sudo cp ../../Client/RaspberryPi/metrics.py /mnt/raspi-root/opt/makerscreen/
+sudo cp ../../Client/RaspberryPi/live_state.py /mnt/raspi-root/opt/makerscreen/
+sudo cp ../../Client/RaspberryPi/sampler.py /mnt/raspi-root/opt/makerscreen/
+sudo cp ../../Client/RaspberryPi/log_store.py /mnt/raspi-root/opt/makerscreen/
 sudo cp ../../Client/RaspberryPi/requirements.txt /mnt/raspi-root/opt/makerscreen/
 sudo cp ../../Client/RaspberryPi/makerscreen.service /mnt/raspi-root/etc/systemd/system/
 
@@ -78,7 +87,7 @@ if [ ! -f /opt/makerscreen/.setup_complete ]; then
     
     # Update and install dependencies
     apt-get update
-    apt-get install -y python3 python3-pip
+    apt-get install -y python3 python3-pip mpv
     
     # Install Python dependencies
     pip3 install -r /opt/makerscreen/requirements.txt
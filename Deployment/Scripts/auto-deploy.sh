@@ -49,6 +49,15 @@ for DEVICE in $DEVICES; do
         echo "Copying files..."
         sshpass -p "$SSH_PASS" scp -o StrictHostKeyChecking=no \
             ../../Client/RaspberryPi/client.py \
+            ../../Client/RaspberryPi/renditions.py \
+            ../../Client/RaspberryPi/video_player.py \
+            ../../Client/RaspberryPi/schedule.py \
+            ../../Client/RaspberryPi/wire.py \
+            ../../Client/RaspberryPi/startup.py \
+            ../../Client/RaspberryPi/metrics.py \
+            ../../Client/RaspberryPi/live_state.py \
+            ../../Client/RaspberryPi/sampler.py \
+            ../../Client/RaspberryPi/log_store.py \
             ../../Client/RaspberryPi/requirements.txt \
             ../../Client/RaspberryPi/makerscreen.service \
             ../../Client/RaspberryPi/install.sh \
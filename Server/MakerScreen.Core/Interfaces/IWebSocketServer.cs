@@ -12,4 +12,21 @@ public interface IWebSocketServer
     Task SendMessageAsync(string clientId, WebSocketMessage message, CancellationToken cancellationToken = default);
     Task BroadcastMessageAsync(WebSocketMessage message, CancellationToken cancellationToken = default);
     IReadOnlyCollection<SignageClient> GetConnectedClients();
+    /// <summary>
+    /// Raised after a client message has been handled by the server itself, so other services
+    /// can act on it (e.g. REGISTER inventories and CONTENT_REQUEST)
+    /// </summary>
+    event EventHandler<ClientMessageEventArgs>? MessageReceived;
+}
+
+public class ClientMessageEventArgs : EventArgs
+{
+    public string ClientId { get; }
+    public WebSocketMessage Message { get; }
+
+    public ClientMessageEventArgs(string clientId, WebSocketMessage message)
+    {
+        ClientId = clientId;
+        Message = message;
+    }
 }
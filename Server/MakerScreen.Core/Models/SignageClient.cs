@@ -13,6 +13,18 @@ public class SignageClient
     public DateTime LastSeen { get; set; }
     public string Version { get; set; } = string.Empty;
     public Dictionary<string, string> Metadata { get; set; } = new();
+    /// <summary>
+    /// Latest heartbeat metrics, keyed by dotted name (e.g. "system.cpuPercent")
+    /// </summary>
+    public Dictionary<string, object?> Metrics { get; set; } = new();
+    /// <summary>
+    /// Client snapshot that <see cref="Metrics"/> reflects; later heartbeats are deltas against it
+    /// </summary>
+    public long? MetricsSnapshotId { get; set; }
+    /// <summary>
+    /// Latest playlist readiness the client reported (state, ready, total, missing, inFlight)
+    /// </summary>
+    public object? PlaylistReadiness { get; set; }
 }
 
 public enum ClientStatus
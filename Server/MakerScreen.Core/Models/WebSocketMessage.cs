@@ -1,3 +1,5 @@
+using System.Text.Json;
+
 namespace MakerScreen.Core.Models;
 
 /// <summary>
@@ -8,13 +10,29 @@ public class WebSocketMessage
     public string Type { get; set; } = string.Empty;
     public string ClientId { get; set; } = string.Empty;
     public object? Data { get; set; }
+    /// <summary>
+    /// Per-session sequence number, set on messages the server can replay
+    /// </summary>
+    public long? Seq { get; set; }
     public DateTime Timestamp { get; set; } = DateTime.UtcNow;
+
+    // Clients write camelCase envelopes; replies keep the default names the iOS client reads
+    private static readonly JsonSerializerOptions ReadOptions = new() { PropertyNameCaseInsensitive = true };
+
+    /// <summary>
+    /// Reads a message sent by a client, whatever the casing of its property names
+    /// </summary>
+    public static WebSocketMessage? Parse(string json)
+    {
+        return JsonSerializer.Deserialize<WebSocketMessage>(json, ReadOptions);
+    }
 }
 
 public static class MessageTypes
 {
     public const string Register = "REGISTER";
     public const string Heartbeat = "HEARTBEAT";
+    public const string HeartbeatAck = "HEARTBEAT_ACK";
     public const string ContentUpdate = "CONTENT_UPDATE";
     public const string Command = "COMMAND";
     public const string InstallClient = "INSTALL_CLIENT";
@@ -24,4 +42,8 @@ public static class MessageTypes
     public const string OverlayUpdate = "OVERLAY_UPDATE";
     public const string EmergencyBroadcast = "EMERGENCY_BROADCAST";
     public const string EmergencyClear = "EMERGENCY_CLEAR";
+    public const string TimeSync = "TIME_SYNC";
+    public const string Ack = "ACK";
+    public const string ContentRequest = "CONTENT_REQUEST";
+    public const string SyncManifest = "SYNC_MANIFEST";
 }
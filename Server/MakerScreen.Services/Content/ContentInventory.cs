@@ -0,0 +1,83 @@
+using System.Buffers.Binary;
+using System.Security.Cryptography;
+using System.Text;
+using System.Text.Json;
+
+namespace MakerScreen.Services.Content;
+
+/// <summary>
+/// Compares the cache inventory a client sends with REGISTER against the content it should hold.
+/// The inventory lists content ID to SHA-256 for small caches and a Bloom filter over the
+/// digests for large ones; <c>digest</c> is a SHA-256 over the sorted digest set.
+/// </summary>
+public static class ContentInventory
+{
+    public static string Sha256(byte[] data)
+    {
+        return Convert.ToHexString(SHA256.HashData(data)).ToLowerInvariant();
+    }
+
+    /// <summary>
+    /// Digest over a set of content digests, computed as the client does
+    /// </summary>
+    public static string Digest(IEnumerable<string> digests)
+    {
+        var joined = string.Concat(digests.Distinct().OrderBy(digest => digest, StringComparer.Ordinal));
+        return Sha256(Encoding.ASCII.GetBytes(joined));
+    }
+
+    /// <summary>
+    /// Content IDs from <paramref name="expected"/> (content ID to SHA-256) the client does not hold
+    /// </summary>
+    public static IReadOnlyList<string> Missing(JsonElement? inventory, IReadOnlyDictionary<string, string> expected)
+    {
+        if (inventory is not { ValueKind: JsonValueKind.Object } summary)
+        {
+            return expected.Keys.ToList();
+        }
+
+        if (summary.TryGetProperty("digest", out var digest) && digest.GetString() == Digest(expected.Values))
+        {
+            return Array.Empty<string>();
+        }
+
+        if (summary.TryGetProperty("hashes", out var hashes) && hashes.ValueKind == JsonValueKind.Object)
+        {
+            return expected
+                .Where(item => !hashes.TryGetProperty(item.Key, out var held) || held.GetString() != item.Value)
+                .Select(item => item.Key)
+                .ToList();
+        }
+
+        if (summary.TryGetProperty("bloom", out var bloom) && bloom.ValueKind == JsonValueKind.Object)
+        {
+            var size = bloom.GetProperty("size").GetInt64();
+            var hashCount = bloom.GetProperty("hashCount").GetInt32();
+            var bits = Convert.FromBase64String(bloom.GetProperty("bits").GetString() ?? string.Empty);
+            // Content sharing a digest with something cached is linked on the client, not sent
+            return expected
+                .Where(item => !BloomContains(bits, size, hashCount, item.Value))
+                .Select(item => item.Key)
+                .ToList();
+        }
+
+        return expected.Keys.ToList();
+    }
+
+    /// <summary>
+    /// Probe positions are big-endian 32-bit slices of the digest, as the client sets them
+    /// </summary>
+    private static bool BloomContains(byte[] bits, long size, int hashCount, string digest)
+    {
+        var raw = Convert.FromHexString(digest);
+        for (var i = 0; i < hashCount; i++)
+        {
+            var position = BinaryPrimitives.ReadUInt32BigEndian(raw.AsSpan(i * 4, 4)) % size;
+            if (position / 8 >= bits.Length || (bits[position / 8] & (1 << (int)(position % 8))) == 0)
+            {
+                return false;
+            }
+        }
+        return true;
+    }
+}
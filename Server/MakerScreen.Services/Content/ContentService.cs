@@ -1,4 +1,5 @@
 using System.Collections.Concurrent;
+using System.Text.Json;
 using MakerScreen.Core.Interfaces;
 using MakerScreen.Core.Models;
 using Microsoft.Extensions.Logging;
@@ -6,13 +7,16 @@ using Microsoft.Extensions.Logging;
 namespace MakerScreen.Services.Content;
 
 /// <summary>
-/// Manages digital signage content
+/// Manages digital signage content. Clients are brought up to date incrementally: the
+/// inventory sent with REGISTER is compared with the content library, the difference is
+/// sent as SYNC_MANIFEST, and the client asks for what it lacks with CONTENT_REQUEST.
 /// </summary>
 public class ContentService : IContentService
 {
     private readonly ILogger<ContentService> _logger;
     private readonly IWebSocketServer _webSocketServer;
     private readonly ConcurrentDictionary<string, ContentItem> _contentStore = new();
+    private readonly ConcurrentDictionary<string, string> _digests = new(); // content ID -> SHA-256
     private readonly string _contentPath;
 
     public ContentService(
@@ -23,6 +27,7 @@ public class ContentService : IContentService
         _webSocketServer = webSocketServer;
         _contentPath = Path.Combine(AppDomain.CurrentDomain.BaseDirectory, "Content");
         Directory.CreateDirectory(_contentPath);
+        _webSocketServer.MessageReceived += OnClientMessage;
     }
 
     public async Task<ContentItem> AddContentAsync(ContentItem content, CancellationToken cancellationToken = default)
@@ -37,6 +42,7 @@ public class ContentService : IContentService
 
             // Store metadata
             _contentStore.TryAdd(content.Id, content);
+            _digests[content.Id] = ContentInventory.Sha256(content.Data);
 
             _logger.LogInformation("Content added successfully: {Id}", content.Id);
 
@@ -82,6 +88,7 @@ public class ContentService : IContentService
         {
             if (_contentStore.TryRemove(id, out var content))
             {
+                _digests.TryRemove(id, out _);
                 var filePath = Path.Combine(_contentPath, $"{content.Id}{GetFileExtension(content.MimeType)}");
                 if (File.Exists(filePath))
                 {
@@ -114,28 +121,111 @@ public class ContentService : IContentService
                 return;
             }
 
+            await _webSocketServer.BroadcastMessageAsync(BuildContentUpdate(content), cancellationToken);
+
+            _logger.LogInformation("Content pushed to clients successfully");
+        }
+        catch (Exception ex)
+        {
+            _logger.LogError(ex, "Error pushing content to clients");
+            throw;
+        }
+    }
+
+    private WebSocketMessage BuildContentUpdate(ContentItem content)
+    {
+        return new WebSocketMessage
+        {
+            Type = MessageTypes.ContentUpdate,
+            Data = new
+            {
+                contentId = content.Id,
+                name = content.Name,
+                type = content.Type.ToString(),
+                mimeType = content.MimeType,
+                duration = content.Duration,
+                sha256 = _digests.GetOrAdd(content.Id, _ => ContentInventory.Sha256(content.Data)),
+                data = Convert.ToBase64String(content.Data)
+            }
+        };
+    }
+
+    private void OnClientMessage(object? sender, ClientMessageEventArgs e)
+    {
+        switch (e.Message.Type)
+        {
+            case MessageTypes.Register:
+                _ = SyncClientAsync(e.ClientId, e.Message.Data);
+                break;
+            case MessageTypes.ContentRequest:
+                _ = SendRequestedContentAsync(e.ClientId, e.Message.Data);
+                break;
+        }
+    }
+
+    /// <summary>
+    /// Sends a newly registered client the part of the library its cache inventory lacks
+    /// </summary>
+    private async Task SyncClientAsync(string clientId, object? data)
+    {
+        try
+        {
+            JsonElement? inventory = data is JsonElement element && element.TryGetProperty("inventory", out var value)
+                ? value
+                : null;
+            var expected = new Dictionary<string, string>(_digests);
+            var missing = ContentInventory.Missing(inventory, expected);
+            if (missing.Count == 0)
+            {
+                _logger.LogDebug("Client {ClientId} content is in sync ({Count} items)", clientId, expected.Count);
+                return;
+            }
+
+            _logger.LogInformation("Client {ClientId} is missing {Missing} of {Count} content items",
+                clientId, missing.Count, expected.Count);
             var message = new WebSocketMessage
             {
-                Type = MessageTypes.ContentUpdate,
+                Type = MessageTypes.SyncManifest,
                 Data = new
                 {
-                    contentId = content.Id,
-                    name = content.Name,
-                    type = content.Type.ToString(),
-                    mimeType = content.MimeType,
-                    duration = content.Duration,
-                    data = Convert.ToBase64String(content.Data)
+                    items = missing.Select(id => new { contentId = id, sha256 = expected[id] }).ToList()
                 }
             };
+            await _webSocketServer.SendMessageAsync(clientId, message);
+        }
+        catch (Exception ex)
+        {
+            _logger.LogError(ex, "Error syncing content for client {ClientId}", clientId);
+        }
+    }
 
-            await _webSocketServer.BroadcastMessageAsync(message, cancellationToken);
+    /// <summary>
+    /// Answers a CONTENT_REQUEST with one CONTENT_UPDATE per known content ID
+    /// </summary>
+    private async Task SendRequestedContentAsync(string clientId, object? data)
+    {
+        try
+        {
+            if (data is not JsonElement element || !element.TryGetProperty("contentIds", out var contentIds)
+                || contentIds.ValueKind != JsonValueKind.Array)
+            {
+                return;
+            }
 
-            _logger.LogInformation("Content pushed to clients successfully");
+            foreach (var idElement in contentIds.EnumerateArray())
+            {
+                var content = await GetContentAsync(idElement.GetString() ?? string.Empty);
+                if (content == null)
+                {
+                    _logger.LogWarning("Client {ClientId} requested unknown content {ContentId}", clientId, idElement.GetString());
+                    continue;
+                }
+                await _webSocketServer.SendMessageAsync(clientId, BuildContentUpdate(content));
+            }
         }
         catch (Exception ex)
         {
-            _logger.LogError(ex, "Error pushing content to clients");
-            throw;
+            _logger.LogError(ex, "Error sending requested content to client {ClientId}", clientId);
         }
     }
 
@@ -0,0 +1,86 @@
+using System.Text.Json;
+using MakerScreen.Core.Models;
+
+namespace MakerScreen.Services.WebSocket;
+
+/// <summary>
+/// Applies heartbeat metrics snapshots to a client. Besides the snapshot the
+/// client's metrics reflect, the one before it is kept, so a delta built on
+/// a snapshot whose acknowledgement was still in flight applies instead of
+/// forcing a resync.
+/// Not thread-safe: heartbeats of one connection are handled in order.
+/// </summary>
+public class MetricsSnapshots
+{
+    private long? _previousId;
+    private Dictionary<string, object?> _previous = new();
+
+    /// <summary>
+    /// Applies a snapshot; false if it is a delta against a snapshot we do not hold
+    /// </summary>
+    public bool Apply(SignageClient client, JsonElement metrics)
+    {
+        if (!metrics.TryGetProperty("id", out var idElement)
+            || idElement.ValueKind != JsonValueKind.Number
+            || !idElement.TryGetInt64(out var snapshotId))
+        {
+            return false;
+        }
+
+        // A complete snapshot has "base": null
+        long? baseId = metrics.TryGetProperty("base", out var baseElement)
+                       && baseElement.ValueKind == JsonValueKind.Number
+                       && baseElement.TryGetInt64(out var value)
+            ? value
+            : null;
+        Dictionary<string, object?>? start;
+        if (baseId == null)
+        {
+            start = new Dictionary<string, object?>();
+        }
+        else if (baseId == client.MetricsSnapshotId)
+        {
+            start = null;
+        }
+        else if (baseId == _previousId)
+        {
+            start = new Dictionary<string, object?>(_previous);
+        }
+        else
+        {
+            return false;
+        }
+
+        if (client.MetricsSnapshotId != null)
+        {
+            _previousId = client.MetricsSnapshotId;
+            _previous = new Dictionary<string, object?>(client.Metrics);
+        }
+        if (start != null)
+        {
+            client.Metrics.Clear();
+            foreach (var (name, metric) in start)
+            {
+                client.Metrics[name] = metric;
+            }
+        }
+
+        if (metrics.TryGetProperty("values", out var values) && values.ValueKind == JsonValueKind.Object)
+        {
+            foreach (var metric in values.EnumerateObject())
+            {
+                client.Metrics[metric.Name] = metric.Value.Clone();
+            }
+        }
+        if (metrics.TryGetProperty("removed", out var removed) && removed.ValueKind == JsonValueKind.Array)
+        {
+            foreach (var name in removed.EnumerateArray())
+            {
+                client.Metrics.Remove(name.GetString() ?? string.Empty);
+            }
+        }
+
+        client.MetricsSnapshotId = snapshotId;
+        return true;
+    }
+}
@@ -0,0 +1,90 @@
+using System.Text;
+using System.Text.Json;
+using MakerScreen.Core.Models;
+
+namespace MakerScreen.Services.WebSocket;
+
+/// <summary>
+/// Numbers the messages of one client session and keeps the most recent ones
+/// until the client acknowledges them, so they can be replayed on resume.
+/// Bounded both by message count and by total payload bytes, so large
+/// content broadcasts cannot pile up in every idle session.
+/// Not thread-safe: the owning session serializes access.
+/// </summary>
+public class ReplayBuffer
+{
+    private readonly Queue<(long Seq, byte[] Payload)> _entries = new();
+    private readonly int _capacity;
+    private readonly long _maxBytes;
+
+    public ReplayBuffer(int capacity, long maxBytes = long.MaxValue)
+    {
+        _capacity = capacity;
+        _maxBytes = maxBytes;
+    }
+
+    /// <summary>
+    /// Sequence number of the last message added
+    /// </summary>
+    public long LastSeq { get; private set; }
+
+    public int Count => _entries.Count;
+
+    /// <summary>
+    /// Total size of the buffered payloads
+    /// </summary>
+    public long Bytes { get; private set; }
+
+    /// <summary>
+    /// Stamps the next sequence number on a copy of the message, keeps its serialized form and returns it
+    /// </summary>
+    public byte[] Add(WebSocketMessage message, string clientId)
+    {
+        var sequenced = new WebSocketMessage
+        {
+            Type = message.Type,
+            ClientId = clientId,
+            Data = message.Data,
+            Timestamp = message.Timestamp,
+            Seq = ++LastSeq
+        };
+        var payload = Encoding.UTF8.GetBytes(JsonSerializer.Serialize(sequenced));
+
+        _entries.Enqueue((LastSeq, payload));
+        Bytes += payload.Length;
+        while (_entries.Count > _capacity || Bytes > _maxBytes)
+        {
+            Bytes -= _entries.Dequeue().Payload.Length;
+        }
+        return payload;
+    }
+
+    /// <summary>
+    /// Drops every message up to and including <paramref name="seq"/>
+    /// </summary>
+    public void Acknowledge(long seq)
+    {
+        while (_entries.Count > 0 && _entries.Peek().Seq <= seq)
+        {
+            Bytes -= _entries.Dequeue().Payload.Length;
+        }
+    }
+
+    /// <summary>
+    /// True if a client that handled up to <paramref name="lastSeq"/> can be brought up to date,
+    /// i.e. nothing it missed has been dropped for capacity
+    /// </summary>
+    public bool CanResume(long lastSeq)
+    {
+        var oldest = _entries.Count > 0 ? _entries.Peek().Seq : LastSeq + 1;
+        return lastSeq <= LastSeq && lastSeq + 1 >= oldest;
+    }
+
+    /// <summary>
+    /// Serialized messages after <paramref name="seq"/>, oldest first
+    /// </summary>
+    public IEnumerable<byte[]> After(long seq)
+    {
+        return _entries.Where(entry => entry.Seq > seq).Select(entry => entry.Payload).ToList();
+    }
+}
@@ -1,6 +1,7 @@
 using System.Collections.Concurrent;
 using System.Net;
 using System.Net.WebSockets;
+using System.Security.Cryptography;
 using System.Security.Cryptography.X509Certificates;
 using System.Text;
 using System.Text.Json;
@@ -17,12 +18,19 @@ public class SecureWebSocketServer : IWebSocketServer
 {
     private readonly ILogger<SecureWebSocketServer> _logger;
     private readonly ConcurrentDictionary<string, ClientConnection> _clients = new();
+    private readonly ConcurrentDictionary<string, ClientSession> _sessions = new();
+    private readonly ConcurrentDictionary<string, ClientSession> _sessionsByClientId = new();
+    private const int ReplayBufferSize = 512; // Sequenced messages kept per session for replay
+    private const long ReplayBufferBytes = 4 * 1024 * 1024; // Payload bytes kept per session; a base64 CONTENT_UPDATE can be megabytes
+    private static readonly TimeSpan SessionRetention = TimeSpan.FromMinutes(10);
     private HttpListener? _listener;
     private CancellationTokenSource? _cancellationTokenSource;
     private readonly int _port;
     private readonly X509Certificate2? _certificate;
     private string? _actualBindingAddress;
 
+    public event EventHandler<ClientMessageEventArgs>? MessageReceived;
+
     public SecureWebSocketServer(ILogger<SecureWebSocketServer> logger, int port = 8443)
     {
         _logger = logger;
@@ -128,6 +136,11 @@ public class SecureWebSocketServer : IWebSocketServer
         {
             await SendMessageToClientAsync(client, message, cancellationToken);
         }
+        else if (_sessionsByClientId.TryGetValue(clientId, out var session))
+        {
+            // Disconnected but resumable: buffer the message for replay
+            await DeliverAsync(session, message, cancellationToken);
+        }
         else
         {
             _logger.LogWarning("Client {ClientId} not found", clientId);
@@ -136,8 +149,11 @@ public class SecureWebSocketServer : IWebSocketServer
 
     public async Task BroadcastMessageAsync(WebSocketMessage message, CancellationToken cancellationToken = default)
     {
-        var tasks = _clients.Values.Select(client => SendMessageToClientAsync(client, message, cancellationToken));
-        await Task.WhenAll(tasks);
+        var sessionTasks = _sessions.Values.Select(session => DeliverAsync(session, message, cancellationToken));
+        var unregisteredTasks = _clients.Values
+            .Where(client => client.Session == null)
+            .Select(client => SendMessageToClientAsync(client, message, cancellationToken));
+        await Task.WhenAll(sessionTasks.Concat(unregisteredTasks));
     }
 
     public IReadOnlyCollection<SignageClient> GetConnectedClients()
@@ -174,6 +190,7 @@ public class SecureWebSocketServer : IWebSocketServer
     {
         System.Net.WebSockets.WebSocket? webSocket = null;
         string? clientId = null;
+        ClientConnection? connection = null;
         
         try
         {
@@ -189,7 +206,7 @@ public class SecureWebSocketServer : IWebSocketServer
                 LastSeen = DateTime.UtcNow
             };
             
-            var connection = new ClientConnection(client, webSocket);
+            connection = new ClientConnection(client, webSocket);
             _clients.TryAdd(clientId, connection);
             
             _logger.LogInformation("Client {ClientId} connected from {IpAddress}", clientId, client.IpAddress);
@@ -202,10 +219,32 @@ public class SecureWebSocketServer : IWebSocketServer
         }
         finally
         {
-            if (clientId != null && _clients.TryRemove(clientId, out var removed))
+            if (connection != null)
             {
-                _logger.LogInformation("Client {ClientId} disconnected", clientId);
-                removed.Client.Status = ClientStatus.Offline;
+                // Registration may have re-keyed the connection to a resumed client ID
+                clientId = connection.Client.Id;
+                if (connection.Session != null)
+                {
+                    await connection.Session.SendLock.WaitAsync();
+                    try
+                    {
+                        if (connection.Session.Connection == connection)
+                        {
+                            connection.Session.Connection = null;
+                            connection.Session.DisconnectedAt = DateTime.UtcNow;
+                        }
+                    }
+                    finally
+                    {
+                        connection.Session.SendLock.Release();
+                    }
+                }
+                
+                if (_clients.TryRemove(new KeyValuePair<string, ClientConnection>(clientId, connection)))
+                {
+                    _logger.LogInformation("Client {ClientId} disconnected", clientId);
+                    connection.Client.Status = ClientStatus.Offline;
+                }
             }
             
             if (webSocket != null)
@@ -217,22 +256,24 @@ public class SecureWebSocketServer : IWebSocketServer
 
     private async Task HandleClientMessagesAsync(ClientConnection connection)
     {
-        var buffer = new byte[1024 * 4];
-        
         while (connection.WebSocket.State == WebSocketState.Open)
         {
             try
             {
-                var result = await connection.WebSocket.ReceiveAsync(new ArraySegment<byte>(buffer), CancellationToken.None);
+                // A REGISTER carrying the cache inventory spans several frames
+                var payload = await WebSocketMessageReader.ReceiveAsync(connection.WebSocket);
                 
-                if (result.MessageType == WebSocketMessageType.Close)
+                if (payload == null)
                 {
-                    await connection.WebSocket.CloseAsync(WebSocketCloseStatus.NormalClosure, "Closing", CancellationToken.None);
+                    if (connection.WebSocket.State == WebSocketState.CloseReceived)
+                    {
+                        await connection.WebSocket.CloseAsync(WebSocketCloseStatus.NormalClosure, "Closing", CancellationToken.None);
+                    }
                     break;
                 }
                 
-                var messageJson = Encoding.UTF8.GetString(buffer, 0, result.Count);
-                var message = JsonSerializer.Deserialize<WebSocketMessage>(messageJson);
+                var messageJson = Encoding.UTF8.GetString(payload);
+                var message = WebSocketMessage.Parse(messageJson);
                 
                 if (message != null)
                 {
@@ -249,6 +290,7 @@ public class SecureWebSocketServer : IWebSocketServer
 
     private async Task ProcessMessageAsync(ClientConnection connection, WebSocketMessage message)
     {
+        var receivedAt = UnixMilliseconds();
         _logger.LogDebug("Received message type {Type} from client {ClientId}", message.Type, connection.Client.Id);
         
         connection.Client.LastSeen = DateTime.UtcNow;
@@ -259,59 +301,286 @@ public class SecureWebSocketServer : IWebSocketServer
                 await HandleRegistrationAsync(connection, message);
                 break;
             case MessageTypes.Heartbeat:
-                await HandleHeartbeatAsync(connection);
+                await HandleHeartbeatAsync(connection, message);
                 break;
             case MessageTypes.Status:
                 await HandleStatusAsync(connection, message);
                 break;
+            case MessageTypes.TimeSync:
+                await HandleTimeSyncAsync(connection, message, receivedAt);
+                break;
+            case MessageTypes.Ack:
+                await HandleAckAsync(connection, message.Data);
+                break;
+            case MessageTypes.ContentRequest:
+                // Answered by the content service through MessageReceived
+                break;
             default:
                 _logger.LogWarning("Unknown message type: {Type}", message.Type);
                 break;
         }
+        
+        try
+        {
+            MessageReceived?.Invoke(this, new ClientMessageEventArgs(connection.Client.Id, message));
+        }
+        catch (Exception ex)
+        {
+            _logger.LogError(ex, "Error in message handler for {Type} from {ClientId}", message.Type, connection.Client.Id);
+        }
     }
 
     private async Task HandleRegistrationAsync(ClientConnection connection, WebSocketMessage message)
     {
+        string? resumeToken = null;
+        long lastSeq = 0;
         if (message.Data is JsonElement data)
         {
             connection.Client.Name = data.GetProperty("name").GetString() ?? "Unknown";
             connection.Client.MacAddress = data.GetProperty("macAddress").GetString() ?? "Unknown";
             connection.Client.Version = data.GetProperty("version").GetString() ?? "1.0.0";
+            
+            if (data.TryGetProperty("resume", out var resume) && resume.ValueKind == JsonValueKind.Object)
+            {
+                resumeToken = resume.TryGetProperty("token", out var token) ? token.GetString() : null;
+                lastSeq = resume.TryGetProperty("lastSeq", out var seq) && seq.TryGetInt64(out var value) ? value : 0;
+            }
+        }
+        
+        PruneSessions();
+        
+        var resumed = false;
+        ClientSession? session = null;
+        if (resumeToken != null && _sessions.TryGetValue(resumeToken, out session))
+        {
+            await session.SendLock.WaitAsync();
+            try
+            {
+                // Resumable only if nothing the client missed has been dropped from the buffer
+                resumed = session.Replay.CanResume(lastSeq);
+            }
+            finally
+            {
+                session.SendLock.Release();
+            }
+            
+            if (!resumed)
+            {
+                DropSession(session);
+                session = null;
+            }
+        }
+        
+        if (session != null)
+        {
+            // Take over the previous connection's client ID
+            var previousId = connection.Client.Id;
+            connection.Client.Id = session.ClientId;
+            _clients.TryRemove(new KeyValuePair<string, ClientConnection>(previousId, connection));
+            _clients[session.ClientId] = connection;
+        }
+        else
+        {
+            session = new ClientSession(connection.Client.Id);
+            _sessions[session.Token] = session;
+            _sessionsByClientId[session.ClientId] = session;
         }
+        connection.Session = session;
         
-        _logger.LogInformation("Client {Name} registered with ID {ClientId}", connection.Client.Name, connection.Client.Id);
+        _logger.LogInformation("Client {Name} registered with ID {ClientId} ({Mode})",
+            connection.Client.Name, connection.Client.Id, resumed ? $"resumed after seq {lastSeq}" : "new session");
         
         var response = new WebSocketMessage
         {
             Type = MessageTypes.Register,
             ClientId = connection.Client.Id,
-            Data = new { success = true, clientId = connection.Client.Id }
+            Data = new
+            {
+                success = true,
+                clientId = connection.Client.Id,
+                resumeToken = session.Token,
+                resumed,
+                lastSeq = session.Replay.LastSeq
+            }
         };
         
-        await SendMessageToClientAsync(connection, response, CancellationToken.None);
+        await session.SendLock.WaitAsync();
+        try
+        {
+            // The reply goes first and unsequenced; then everything the client missed, in order
+            await SendFrameAsync(connection, Encoding.UTF8.GetBytes(JsonSerializer.Serialize(response)), CancellationToken.None);
+            // A new session replays anything queued for it while this reply was being built
+            var replayAfter = resumed ? lastSeq : 0;
+            foreach (var payload in session.Replay.After(replayAfter))
+            {
+                await SendFrameAsync(connection, payload, CancellationToken.None);
+            }
+            session.Connection = connection;
+            session.DisconnectedAt = null;
+        }
+        finally
+        {
+            session.SendLock.Release();
+        }
     }
 
-    private Task HandleHeartbeatAsync(ClientConnection connection)
+    private async Task HandleHeartbeatAsync(ClientConnection connection, WebSocketMessage message)
     {
         connection.Client.Status = ClientStatus.Online;
-        return Task.CompletedTask;
+        if (message.Data is not JsonElement data)
+        {
+            return;
+        }
+        
+        if (data.TryGetProperty("ackSeq", out var ackSeq))
+        {
+            await TrimReplayBufferAsync(connection, ackSeq, CancellationToken.None);
+        }
+        
+        if (data.TryGetProperty("metrics", out var metrics) && metrics.ValueKind == JsonValueKind.Object)
+        {
+            var applied = connection.Metrics.Apply(connection.Client, metrics);
+            var response = new WebSocketMessage
+            {
+                Type = MessageTypes.HeartbeatAck,
+                ClientId = connection.Client.Id,
+                Data = applied ? new { metricsId = connection.Client.MetricsSnapshotId } : (object)new { resync = true }
+            };
+            await SendMessageToClientAsync(connection, response, CancellationToken.None, sequenced: false);
+        }
     }
 
+    private async Task HandleAckAsync(ClientConnection connection, object? data)
+    {
+        if (data is JsonElement element && element.TryGetProperty("seq", out var seq))
+        {
+            await TrimReplayBufferAsync(connection, seq, CancellationToken.None);
+        }
+    }
+
+    private async Task TrimReplayBufferAsync(ClientConnection connection, JsonElement seq, CancellationToken cancellationToken)
+    {
+        var session = connection.Session;
+        if (session == null || !seq.TryGetInt64(out var acked))
+        {
+            return;
+        }
+        
+        // DeliverAsync holds the lock across sends, so never block a pool thread on it
+        await session.SendLock.WaitAsync(cancellationToken);
+        try
+        {
+            session.Replay.Acknowledge(acked);
+        }
+        finally
+        {
+            session.SendLock.Release();
+        }
+    }
+
+    private void PruneSessions()
+    {
+        var cutoff = DateTime.UtcNow - SessionRetention;
+        foreach (var session in _sessions.Values)
+        {
+            if (session.Connection == null && session.DisconnectedAt < cutoff)
+            {
+                DropSession(session);
+            }
+        }
+    }
+
+    private void DropSession(ClientSession session)
+    {
+        _sessions.TryRemove(session.Token, out _);
+        _sessionsByClientId.TryRemove(new KeyValuePair<string, ClientSession>(session.ClientId, session));
+    }
+
+    private async Task HandleTimeSyncAsync(ClientConnection connection, WebSocketMessage message, double receivedAt)
+    {
+        // NTP-style exchange: echo the client's send time with our receive and send times
+        if (message.Data is not JsonElement data || !data.TryGetProperty("t0", out var t0))
+        {
+            return;
+        }
+        
+        var response = new WebSocketMessage
+        {
+            Type = MessageTypes.TimeSync,
+            ClientId = connection.Client.Id,
+            Data = new { t0 = t0.GetDouble(), t1 = receivedAt, t2 = UnixMilliseconds() }
+        };
+        
+        // Timing replies are useless once stale, so they are never replayed
+        await SendMessageToClientAsync(connection, response, CancellationToken.None, sequenced: false);
+    }
+
+    private static double UnixMilliseconds() => (DateTime.UtcNow - DateTime.UnixEpoch).TotalMilliseconds;
+
     private Task HandleStatusAsync(ClientConnection connection, WebSocketMessage message)
     {
         _logger.LogDebug("Status update from {ClientId}: {Status}", connection.Client.Id, message.Data);
+        if (message.Data is JsonElement data && data.TryGetProperty("status", out var status)
+            && status.GetString() == "playlist_readiness")
+        {
+            // Missing items are requested by the client itself with CONTENT_REQUEST
+            connection.Client.PlaylistReadiness = data.Clone();
+        }
         return Task.CompletedTask;
     }
 
-    private async Task SendMessageToClientAsync(ClientConnection connection, WebSocketMessage message, CancellationToken cancellationToken)
+    private async Task SendMessageToClientAsync(ClientConnection connection, WebSocketMessage message, CancellationToken cancellationToken, bool sequenced = true)
+    {
+        if (sequenced && connection.Session != null)
+        {
+            await DeliverAsync(connection.Session, message, cancellationToken);
+            return;
+        }
+        
+        var bytes = Encoding.UTF8.GetBytes(JsonSerializer.Serialize(message));
+        if (connection.Session == null)
+        {
+            await SendFrameAsync(connection, bytes, cancellationToken);
+            return;
+        }
+        
+        await connection.Session.SendLock.WaitAsync(cancellationToken);
+        try
+        {
+            await SendFrameAsync(connection, bytes, cancellationToken);
+        }
+        finally
+        {
+            connection.Session.SendLock.Release();
+        }
+    }
+
+    /// <summary>
+    /// Numbers a message in its session, keeps it for replay and sends it if the client is connected
+    /// </summary>
+    private async Task DeliverAsync(ClientSession session, WebSocketMessage message, CancellationToken cancellationToken)
+    {
+        await session.SendLock.WaitAsync(cancellationToken);
+        try
+        {
+            var payload = session.Replay.Add(message, session.ClientId);
+            if (session.Connection != null)
+            {
+                await SendFrameAsync(session.Connection, payload, cancellationToken);
+            }
+        }
+        finally
+        {
+            session.SendLock.Release();
+        }
+    }
+
+    private async Task SendFrameAsync(ClientConnection connection, byte[] payload, CancellationToken cancellationToken)
     {
         try
         {
-            var json = JsonSerializer.Serialize(message);
-            var bytes = Encoding.UTF8.GetBytes(json);
-            
             await connection.WebSocket.SendAsync(
-                new ArraySegment<byte>(bytes),
+                new ArraySegment<byte>(payload),
                 WebSocketMessageType.Text,
                 true,
                 cancellationToken);
@@ -343,6 +612,8 @@ public class SecureWebSocketServer : IWebSocketServer
     {
         public SignageClient Client { get; }
         public System.Net.WebSockets.WebSocket WebSocket { get; }
+        public ClientSession? Session { get; set; }
+        public MetricsSnapshots Metrics { get; } = new();
 
         public ClientConnection(SignageClient client, System.Net.WebSockets.WebSocket webSocket)
         {
@@ -350,6 +621,24 @@ public class SecureWebSocketServer : IWebSocketServer
             WebSocket = webSocket;
         }
     }
+
+    /// <summary>
+    /// Delivery state that outlives a connection so a reconnecting client can resume
+    /// </summary>
+    private class ClientSession
+    {
+        public string Token { get; } = Convert.ToHexString(RandomNumberGenerator.GetBytes(16)).ToLowerInvariant();
+        public string ClientId { get; }
+        public ReplayBuffer Replay { get; } = new(ReplayBufferSize, ReplayBufferBytes);
+        public ClientConnection? Connection { get; set; }
+        public DateTime? DisconnectedAt { get; set; }
+        public SemaphoreSlim SendLock { get; } = new(1, 1);
+
+        public ClientSession(string clientId)
+        {
+            ClientId = clientId;
+        }
+    }
 }
 
 /// <summary>
@@ -0,0 +1,49 @@
+using System.Net.WebSockets;
+
+namespace MakerScreen.Services.WebSocket;
+
+/// <summary>
+/// Reads whole WebSocket messages, however many frames they arrive in
+/// </summary>
+public static class WebSocketMessageReader
+{
+    /// <summary>
+    /// Largest message accepted from a client; a REGISTER with a full cache inventory is well below it
+    /// </summary>
+    public const int MaxMessageBytes = 1024 * 1024;
+
+    /// <summary>
+    /// Receives frames until the end of the message. Returns null when the peer closes,
+    /// and closes the socket with MessageTooBig if the message exceeds <paramref name="maxBytes"/>.
+    /// </summary>
+    public static async Task<byte[]?> ReceiveAsync(
+        System.Net.WebSockets.WebSocket socket,
+        int maxBytes = MaxMessageBytes,
+        CancellationToken cancellationToken = default)
+    {
+        var buffer = new byte[1024 * 4];
+        using var message = new MemoryStream();
+
+        while (true)
+        {
+            var result = await socket.ReceiveAsync(new ArraySegment<byte>(buffer), cancellationToken);
+            if (result.MessageType == WebSocketMessageType.Close)
+            {
+                return null;
+            }
+
+            if (message.Length + result.Count > maxBytes)
+            {
+                await socket.CloseAsync(WebSocketCloseStatus.MessageTooBig,
+                    $"Messages are limited to {maxBytes} bytes", cancellationToken);
+                return null;
+            }
+            message.Write(buffer, 0, result.Count);
+
+            if (result.EndOfMessage)
+            {
+                return message.ToArray();
+            }
+        }
+    }
+}
@@ -0,0 +1,132 @@
+using System.Text;
+using System.Text.Json;
+using Xunit;
+using FluentAssertions;
+using MakerScreen.Core.Interfaces;
+using MakerScreen.Core.Models;
+using MakerScreen.Services.Content;
+using Microsoft.Extensions.Logging.Abstractions;
+
+namespace MakerScreen.Tests;
+
+public class ContentInventoryTests
+{
+    // SHA-256 of "a", "b", "c" and "d"
+    private const string DigestA = "ca978112ca1bbdcafac231b39a23dc4da786eff8147c4e72b9807785afee48bb";
+    private const string DigestB = "3e23e8160039594a33894f6564e1b1348bbd7a0088d42c4acb73eeaed59c009d";
+    private const string DigestC = "2e7d2c03a9507ae265ecf5b5356885a53393a2029d241394997265a1a25aefc6";
+    private const string DigestD = "18ac3e7343f016890c510e93f935261169d9e3f565436429830faf0934f4f8e4";
+
+    /// <summary>
+    /// Records what the content service sends and lets a test deliver client messages
+    /// </summary>
+    private class FakeWebSocketServer : IWebSocketServer
+    {
+        public List<(string ClientId, WebSocketMessage Message)> Sent { get; } = new();
+        public event EventHandler<ClientMessageEventArgs>? MessageReceived;
+
+        public void Receive(string clientId, string json) =>
+            MessageReceived?.Invoke(this, new ClientMessageEventArgs(clientId, WebSocketMessage.Parse(json)!));
+
+        public Task SendMessageAsync(string clientId, WebSocketMessage message, CancellationToken cancellationToken = default)
+        {
+            Sent.Add((clientId, message));
+            return Task.CompletedTask;
+        }
+
+        public Task StartAsync(CancellationToken cancellationToken = default) => Task.CompletedTask;
+        public Task StopAsync(CancellationToken cancellationToken = default) => Task.CompletedTask;
+        public Task BroadcastMessageAsync(WebSocketMessage message, CancellationToken cancellationToken = default) => Task.CompletedTask;
+        public IReadOnlyCollection<SignageClient> GetConnectedClients() => Array.Empty<SignageClient>();
+    }
+
+    private static JsonElement Json(string json) => JsonDocument.Parse(json).RootElement;
+
+    private static JsonElement Payload(WebSocketMessage message) =>
+        JsonDocument.Parse(JsonSerializer.Serialize(message.Data)).RootElement;
+
+    [Fact]
+    public void Digest_ShouldMatchClientDigestOverSortedSet()
+    {
+        // Act
+        var digest = ContentInventory.Digest(new[] { DigestA, DigestB, DigestC, DigestA });
+
+        // Assert: as computed by the Raspberry Pi client's ContentCache.inventory()
+        digest.Should().Be("f71b5a2b8d2b4ed795489a9044d19848db2a60b76691961c6e16d89d4867c0d3");
+    }
+
+    [Fact]
+    public void Missing_ShouldBeEmptyWhenDigestMatches()
+    {
+        // Arrange
+        var expected = new Dictionary<string, string> { ["a"] = DigestA, ["b"] = DigestB };
+        var inventory = Json($"{{\"count\":2,\"digest\":\"{ContentInventory.Digest(expected.Values)}\"}}");
+
+        // Act & Assert
+        ContentInventory.Missing(inventory, expected).Should().BeEmpty();
+    }
+
+    [Fact]
+    public void Missing_ShouldCompareHashesPerContentId()
+    {
+        // Arrange: "b" is cached with an outdated payload
+        var expected = new Dictionary<string, string> { ["a"] = DigestA, ["b"] = DigestB, ["c"] = DigestC };
+        var inventory = Json($"{{\"count\":2,\"digest\":\"x\",\"hashes\":{{\"a\":\"{DigestA}\",\"b\":\"{DigestD}\"}}}}");
+
+        // Act
+        var missing = ContentInventory.Missing(inventory, expected);
+
+        // Assert
+        missing.Should().Equal("b", "c");
+    }
+
+    [Fact]
+    public void Missing_ShouldProbeClientBloomFilter()
+    {
+        // Arrange: the client's BloomFilter(3) holding the digests of "a", "b" and "c"
+        var expected = new Dictionary<string, string> { ["a"] = DigestA, ["c"] = DigestC, ["d"] = DigestD };
+        var inventory = Json("{\"count\":3,\"digest\":\"x\",\"bloom\":{\"size\":29,\"hashCount\":7,\"bits\":\"e41QGg==\"}}");
+
+        // Act
+        var missing = ContentInventory.Missing(inventory, expected);
+
+        // Assert
+        missing.Should().Equal("d");
+    }
+
+    [Fact]
+    public void Missing_ShouldListEverythingWithoutInventory()
+    {
+        // Arrange
+        var expected = new Dictionary<string, string> { ["a"] = DigestA };
+
+        // Act & Assert
+        ContentInventory.Missing(null, expected).Should().Equal("a");
+    }
+
+    [Fact]
+    public async Task ContentService_ShouldSendManifestAndAnswerContentRequest()
+    {
+        // Arrange
+        var server = new FakeWebSocketServer();
+        var service = new ContentService(NullLogger<ContentService>.Instance, server);
+        var held = await service.AddContentAsync(new ContentItem { Name = "held", MimeType = "image/png", Data = Encoding.ASCII.GetBytes("a") });
+        var needed = await service.AddContentAsync(new ContentItem { Name = "needed", MimeType = "image/png", Data = Encoding.ASCII.GetBytes("d") });
+
+        // Act: register with only the first item cached, then request what the manifest lists
+        server.Receive("client-001", $"{{\"type\":\"REGISTER\",\"data\":{{\"inventory\":{{\"count\":1,\"digest\":\"x\",\"hashes\":{{\"{held.Id}\":\"{DigestA}\"}}}}}}}}");
+        server.Receive("client-001", $"{{\"type\":\"CONTENT_REQUEST\",\"data\":{{\"contentIds\":[\"{needed.Id}\"]}}}}");
+        await Task.Delay(100);
+
+        // Assert
+        server.Sent.Should().HaveCount(2);
+        server.Sent[0].Message.Type.Should().Be(MessageTypes.SyncManifest);
+        var items = Payload(server.Sent[0].Message).GetProperty("items");
+        items.GetArrayLength().Should().Be(1);
+        items[0].GetProperty("contentId").GetString().Should().Be(needed.Id);
+        items[0].GetProperty("sha256").GetString().Should().Be(DigestD);
+        server.Sent[1].ClientId.Should().Be("client-001");
+        server.Sent[1].Message.Type.Should().Be(MessageTypes.ContentUpdate);
+        Payload(server.Sent[1].Message).GetProperty("data").GetString().Should().Be(Convert.ToBase64String(Encoding.ASCII.GetBytes("d")));
+    }
+}
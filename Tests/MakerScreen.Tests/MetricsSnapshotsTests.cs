@@ -0,0 +1,98 @@
+using System.Text.Json;
+using Xunit;
+using FluentAssertions;
+using MakerScreen.Core.Models;
+using MakerScreen.Services.WebSocket;
+
+namespace MakerScreen.Tests;
+
+public class MetricsSnapshotsTests
+{
+    private static JsonElement Snapshot(long id, long? baseId, object values, params string[] removed)
+    {
+        return JsonSerializer.SerializeToElement(new { id, @base = baseId, values, removed });
+    }
+
+    private static long Played(SignageClient client)
+    {
+        return ((JsonElement)client.Metrics["playback.played"]!).GetInt64();
+    }
+
+    [Fact]
+    public void MetricsSnapshots_ShouldApplyFullSnapshotThenDelta()
+    {
+        // Arrange
+        var client = new SignageClient();
+        var snapshots = new MetricsSnapshots();
+        client.Metrics["stale"] = 1;
+
+        // Act
+        var full = snapshots.Apply(client, Snapshot(1, null, new Dictionary<string, object> { ["playback.played"] = 1, ["device.model"] = "Pi 4" }));
+        var delta = snapshots.Apply(client, Snapshot(2, 1, new Dictionary<string, object> { ["playback.played"] = 2 }, "device.model"));
+
+        // Assert
+        full.Should().BeTrue();
+        delta.Should().BeTrue();
+        client.MetricsSnapshotId.Should().Be(2);
+        client.Metrics.Should().HaveCount(1);
+        client.Metrics.Should().NotContainKey("stale");
+        client.Metrics.Should().NotContainKey("device.model");
+        Played(client).Should().Be(2);
+    }
+
+    [Fact]
+    public void MetricsSnapshots_ShouldAcceptDeltaAgainstPreviousSnapshot()
+    {
+        // Arrange: the client has not yet seen the acknowledgement of snapshot 2
+        var client = new SignageClient();
+        var snapshots = new MetricsSnapshots();
+        snapshots.Apply(client, Snapshot(1, null, new Dictionary<string, object> { ["playback.played"] = 1, ["device.model"] = "Pi 4" }));
+        snapshots.Apply(client, Snapshot(2, 1, new Dictionary<string, object> { ["playback.played"] = 2 }, "device.model"));
+
+        // Act
+        var applied = snapshots.Apply(client, Snapshot(3, 1, new Dictionary<string, object> { ["playback.played"] = 3 }));
+
+        // Assert: rebuilt from snapshot 1, so the removal in snapshot 2 is not carried over
+        applied.Should().BeTrue();
+        client.MetricsSnapshotId.Should().Be(3);
+        Played(client).Should().Be(3);
+        client.Metrics.Should().ContainKey("device.model");
+    }
+
+    [Fact]
+    public void MetricsSnapshots_ShouldKeepLastTwoSnapshots()
+    {
+        // Arrange
+        var client = new SignageClient();
+        var snapshots = new MetricsSnapshots();
+        snapshots.Apply(client, Snapshot(1, null, new Dictionary<string, object> { ["playback.played"] = 1 }));
+        snapshots.Apply(client, Snapshot(2, 1, new Dictionary<string, object> { ["playback.played"] = 2 }));
+        snapshots.Apply(client, Snapshot(3, 1, new Dictionary<string, object> { ["playback.played"] = 3 }));
+
+        // Act
+        var fromSecond = snapshots.Apply(client, Snapshot(4, 2, new Dictionary<string, object> { ["playback.played"] = 4 }));
+        var fromFirst = snapshots.Apply(client, Snapshot(5, 1, new Dictionary<string, object> { ["playback.played"] = 5 }));
+
+        // Assert
+        fromSecond.Should().BeTrue();
+        fromFirst.Should().BeFalse();
+        client.MetricsSnapshotId.Should().Be(4);
+        Played(client).Should().Be(4);
+    }
+
+    [Fact]
+    public void MetricsSnapshots_ShouldRejectUnknownBaseWithoutChanges()
+    {
+        // Arrange
+        var client = new SignageClient();
+        var snapshots = new MetricsSnapshots();
+
+        // Act
+        var applied = snapshots.Apply(client, Snapshot(7, 6, new Dictionary<string, object> { ["playback.played"] = 7 }));
+
+        // Assert
+        applied.Should().BeFalse();
+        client.MetricsSnapshotId.Should().BeNull();
+        client.Metrics.Should().BeEmpty();
+    }
+}
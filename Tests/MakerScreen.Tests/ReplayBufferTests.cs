@@ -0,0 +1,198 @@
+using System.Text;
+using System.Text.Json;
+using Xunit;
+using FluentAssertions;
+using MakerScreen.Core.Models;
+using MakerScreen.Services.WebSocket;
+
+namespace MakerScreen.Tests;
+
+public class ReplayBufferTests
+{
+    private static WebSocketMessage Message(string type = MessageTypes.PlaylistUpdate)
+    {
+        return new WebSocketMessage { Type = type, Data = new { value = 1 } };
+    }
+
+    private static JsonElement Decode(byte[] payload)
+    {
+        return JsonDocument.Parse(Encoding.UTF8.GetString(payload)).RootElement;
+    }
+
+    [Fact]
+    public void ReplayBuffer_ShouldNumberMessagesInOrder()
+    {
+        // Arrange
+        var buffer = new ReplayBuffer(8);
+
+        // Act
+        var first = Decode(buffer.Add(Message(), "client-001"));
+        var second = Decode(buffer.Add(Message(), "client-001"));
+
+        // Assert
+        first.GetProperty("Seq").GetInt64().Should().Be(1);
+        second.GetProperty("Seq").GetInt64().Should().Be(2);
+        second.GetProperty("ClientId").GetString().Should().Be("client-001");
+        buffer.LastSeq.Should().Be(2);
+        buffer.Count.Should().Be(2);
+    }
+
+    [Fact]
+    public void ReplayBuffer_ShouldReplayOnlyMessagesAfterLastSeq()
+    {
+        // Arrange
+        var buffer = new ReplayBuffer(8);
+        for (var i = 0; i < 5; i++)
+        {
+            buffer.Add(Message(), "client-001");
+        }
+
+        // Act
+        var replayed = buffer.After(3).Select(payload => Decode(payload).GetProperty("Seq").GetInt64());
+
+        // Assert
+        replayed.Should().Equal(4, 5);
+    }
+
+    [Fact]
+    public void ReplayBuffer_AcknowledgeShouldTrimUpToSeq()
+    {
+        // Arrange
+        var buffer = new ReplayBuffer(8);
+        for (var i = 0; i < 5; i++)
+        {
+            buffer.Add(Message(), "client-001");
+        }
+
+        // Act
+        buffer.Acknowledge(3);
+
+        // Assert
+        buffer.Count.Should().Be(2);
+        buffer.After(0).Should().HaveCount(2);
+        buffer.CanResume(3).Should().BeTrue();
+        buffer.CanResume(2).Should().BeFalse();
+    }
+
+    [Fact]
+    public void ReplayBuffer_ShouldDropOldestBeyondCapacity()
+    {
+        // Arrange
+        var buffer = new ReplayBuffer(4);
+
+        // Act
+        for (var i = 0; i < 10; i++)
+        {
+            buffer.Add(Message(), "client-001");
+        }
+
+        // Assert
+        buffer.Count.Should().Be(4);
+        buffer.CanResume(6).Should().BeTrue();
+        buffer.CanResume(5).Should().BeFalse();
+    }
+
+    [Fact]
+    public void ReplayBuffer_ShouldDropOldestBeyondByteBudget()
+    {
+        // Arrange: room for about two large messages
+        var large = new WebSocketMessage { Type = MessageTypes.ContentUpdate, Data = new { data = new string('A', 1000) } };
+        var buffer = new ReplayBuffer(512, maxBytes: 2500);
+
+        // Act
+        for (var i = 0; i < 5; i++)
+        {
+            buffer.Add(large, "client-001");
+        }
+
+        // Assert
+        buffer.Count.Should().Be(2);
+        buffer.Bytes.Should().BeLessThanOrEqualTo(2500);
+        buffer.CanResume(3).Should().BeTrue();
+        buffer.CanResume(2).Should().BeFalse();
+    }
+
+    [Fact]
+    public void ReplayBuffer_AcknowledgeShouldReleaseBytes()
+    {
+        // Arrange
+        var buffer = new ReplayBuffer(8);
+        buffer.Add(Message(), "client-001");
+        buffer.Add(Message(), "client-001");
+
+        // Act
+        buffer.Acknowledge(2);
+
+        // Assert
+        buffer.Bytes.Should().Be(0);
+    }
+
+    [Fact]
+    public void ReplayBuffer_ShouldResumeWhenNothingWasMissed()
+    {
+        // Arrange
+        var buffer = new ReplayBuffer(4);
+        buffer.Add(Message(), "client-001");
+        buffer.Acknowledge(1);
+
+        // Act & Assert
+        buffer.CanResume(1).Should().BeTrue();
+        buffer.CanResume(2).Should().BeFalse();
+        buffer.After(1).Should().BeEmpty();
+    }
+
+    [Fact]
+    public void ReplayBuffer_StaleAcknowledgeShouldKeepNewerMessages()
+    {
+        // Arrange
+        var buffer = new ReplayBuffer(8);
+        for (var i = 0; i < 4; i++)
+        {
+            buffer.Add(Message(), "client-001");
+        }
+        buffer.Acknowledge(3);
+
+        // Act: an ACK overtaken by a later heartbeat ackSeq arrives late
+        buffer.Acknowledge(1);
+
+        // Assert
+        buffer.Count.Should().Be(1);
+        buffer.After(0).Select(payload => Decode(payload).GetProperty("Seq").GetInt64()).Should().Equal(4);
+    }
+
+    [Fact]
+    public void ReplayBuffer_ClientAckShouldTrimDeliveredMessages()
+    {
+        // Arrange: messages delivered while the client was away, then its ACK as sent on the wire
+        var buffer = new ReplayBuffer(32);
+        for (var i = 0; i < 20; i++)
+        {
+            buffer.Add(Message(), "client-001");
+        }
+        var ack = WebSocketMessage.Parse("{\"type\":\"ACK\",\"clientId\":\"client-001\",\"data\":{\"seq\":16}}");
+
+        // Act
+        buffer.Acknowledge(((JsonElement)ack!.Data!).GetProperty("seq").GetInt64());
+
+        // Assert
+        buffer.Count.Should().Be(4);
+        buffer.CanResume(16).Should().BeTrue();
+        buffer.After(18).Should().HaveCount(2);
+    }
+
+    [Fact]
+    public void WebSocketMessage_ShouldParseCamelCaseClientAck()
+    {
+        // Arrange
+        var json = "{\"type\":\"ACK\",\"clientId\":\"b827eb123456\",\"data\":{\"seq\":16}}";
+
+        // Act
+        var message = WebSocketMessage.Parse(json);
+
+        // Assert
+        message.Should().NotBeNull();
+        message!.Type.Should().Be(MessageTypes.Ack);
+        message.ClientId.Should().Be("b827eb123456");
+        ((JsonElement)message.Data!).GetProperty("seq").GetInt64().Should().Be(16);
+    }
+}
@@ -0,0 +1,127 @@
+using System.Net.WebSockets;
+using System.Text;
+using Xunit;
+using FluentAssertions;
+using MakerScreen.Services.WebSocket;
+
+namespace MakerScreen.Tests;
+
+public class WebSocketMessageReaderTests
+{
+    /// <summary>
+    /// Hands out scripted frames, splitting each into reads of at most the caller's buffer size
+    /// </summary>
+    private class ScriptedWebSocket : System.Net.WebSockets.WebSocket
+    {
+        private readonly Queue<(byte[] Data, bool EndOfMessage)> _frames = new();
+        private WebSocketState _state = WebSocketState.Open;
+        private int _offset; // Bytes of the first queued frame already read
+
+        public WebSocketCloseStatus? ClosedWith { get; private set; }
+
+        public void Frame(string text, bool endOfMessage = true) => _frames.Enqueue((Encoding.UTF8.GetBytes(text), endOfMessage));
+
+        public override WebSocketCloseStatus? CloseStatus => ClosedWith;
+        public override string? CloseStatusDescription => null;
+        public override WebSocketState State => _state;
+        public override string? SubProtocol => null;
+
+        public override Task<WebSocketReceiveResult> ReceiveAsync(ArraySegment<byte> buffer, CancellationToken cancellationToken)
+        {
+            if (_frames.Count == 0)
+            {
+                _state = WebSocketState.CloseReceived;
+                return Task.FromResult(new WebSocketReceiveResult(0, WebSocketMessageType.Close, true));
+            }
+
+            var (data, endOfMessage) = _frames.Peek();
+            var count = Math.Min(data.Length - _offset, buffer.Count);
+            Array.Copy(data, _offset, buffer.Array!, buffer.Offset, count);
+            _offset += count;
+            var frameDone = _offset == data.Length;
+            if (frameDone)
+            {
+                _frames.Dequeue();
+                _offset = 0;
+            }
+            return Task.FromResult(new WebSocketReceiveResult(count, WebSocketMessageType.Text, frameDone && endOfMessage));
+        }
+
+        public override Task CloseAsync(WebSocketCloseStatus closeStatus, string? statusDescription, CancellationToken cancellationToken)
+        {
+            ClosedWith = closeStatus;
+            _state = WebSocketState.Closed;
+            return Task.CompletedTask;
+        }
+
+        public override Task CloseOutputAsync(WebSocketCloseStatus closeStatus, string? statusDescription, CancellationToken cancellationToken)
+            => CloseAsync(closeStatus, statusDescription, cancellationToken);
+        public override Task SendAsync(ArraySegment<byte> buffer, WebSocketMessageType messageType, bool endOfMessage, CancellationToken cancellationToken)
+            => Task.CompletedTask;
+        public override void Abort() => _state = WebSocketState.Aborted;
+        public override void Dispose() { }
+    }
+
+    [Fact]
+    public async Task ReceiveAsync_ShouldAssembleMessageLargerThanOneRead()
+    {
+        // Arrange: a REGISTER with 256 inventory entries is about 28 KB
+        var json = "{\"type\":\"REGISTER\",\"data\":{\"inventory\":\"" + new string('a', 28 * 1024) + "\"}}";
+        var socket = new ScriptedWebSocket();
+        socket.Frame(json);
+
+        // Act
+        var payload = await WebSocketMessageReader.ReceiveAsync(socket);
+
+        // Assert
+        payload.Should().NotBeNull();
+        Encoding.UTF8.GetString(payload!).Should().Be(json);
+    }
+
+    [Fact]
+    public async Task ReceiveAsync_ShouldJoinContinuationFrames()
+    {
+        // Arrange
+        var socket = new ScriptedWebSocket();
+        socket.Frame("{\"type\":", endOfMessage: false);
+        socket.Frame("\"ACK\"}");
+        socket.Frame("{\"type\":\"HEARTBEAT\"}");
+
+        // Act
+        var first = await WebSocketMessageReader.ReceiveAsync(socket);
+        var second = await WebSocketMessageReader.ReceiveAsync(socket);
+
+        // Assert
+        Encoding.UTF8.GetString(first!).Should().Be("{\"type\":\"ACK\"}");
+        Encoding.UTF8.GetString(second!).Should().Be("{\"type\":\"HEARTBEAT\"}");
+    }
+
+    [Fact]
+    public async Task ReceiveAsync_ShouldReturnNullWhenPeerCloses()
+    {
+        // Arrange
+        var socket = new ScriptedWebSocket();
+
+        // Act
+        var payload = await WebSocketMessageReader.ReceiveAsync(socket);
+
+        // Assert
+        payload.Should().BeNull();
+        socket.State.Should().Be(WebSocketState.CloseReceived);
+    }
+
+    [Fact]
+    public async Task ReceiveAsync_ShouldCloseOnOversizedMessage()
+    {
+        // Arrange
+        var socket = new ScriptedWebSocket();
+        socket.Frame(new string('x', 10 * 1024));
+
+        // Act
+        var payload = await WebSocketMessageReader.ReceiveAsync(socket, maxBytes: 8 * 1024);
+
+        // Assert
+        payload.Should().BeNull();
+        socket.ClosedWith.Should().Be(WebSocketCloseStatus.MessageTooBig);
+    }
+}